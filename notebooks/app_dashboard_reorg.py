@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import os
+import os, sys, threading
 import plotly.express as px
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -22,8 +22,33 @@ sim = load_csv("semantic_similarity_forbes.csv")
 lex = load_csv("lexical_coverage_forbes.csv")
 sent = load_csv("document_sentiment.csv")
 fr = load_csv("framing_forbes.csv")
-ents = load_csv("forbes_entities.csv")
-ents_oms = load_csv("oms_entities.csv")
+
+# Entités ramenées à leur forme canonique ("l'OMS", "WHO"... -> "OMS") : comptes sur les identifiants
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from entity_aliases import AliasIndex, entity_counts
+
+@st.cache_resource
+def get_aliases():
+    """Table d'alias ouverte une fois par processus (et non à chaque interaction), partagée par les sessions."""
+    return AliasIndex(check_same_thread=False), threading.Lock()
+
+@st.cache_data
+def load_canonical_entities(name, mtime, version):
+    """CSV d'entités canonicalisé ; recalculé seulement si le fichier (mtime) ou la table d'alias (version) change."""
+    df = load_csv(name)
+    if df is None:
+        return None
+    aliases, lock = get_aliases()
+    with lock:
+        return aliases.canonicalize_frame(df)
+
+def entities(name):
+    p = os.path.join(RES_DIR, name)
+    mtime = os.path.getmtime(p) if os.path.exists(p) else None
+    return load_canonical_entities(name, mtime, get_aliases()[0].version)
+
+ents = entities("forbes_entities.csv")
+ents_oms = entities("oms_entities.csv")
 
 # Load main articles file optionally
 main_df = pd.read_csv("../data/all_articles_processed.csv")
@@ -106,7 +131,7 @@ if page == "Accueil":
     st.markdown("---")
     st.markdown("### Entités — aperçu rapide")
     if ents is not None:
-        df_top = ents['entity'].value_counts().head(8).reset_index()
+        df_top = entity_counts(ents).head(8).reset_index()
         df_top.columns = ['entity','count']
         figE = px.bar(df_top, x='count', y='entity', orientation='h', title='Top entités — Forbes (aperçu)')
         st.plotly_chart(figE, use_container_width=True)
@@ -201,7 +226,7 @@ if page == "Entités & Acteurs":
     with col1:
         st.subheader("Top entités — OMS")
         if ents_oms is not None:
-            top_oms = ents_oms['entity'].value_counts().head(50)
+            top_oms = entity_counts(ents_oms).head(50)
             if have_wc:
                 wc = WordCloud(width=400, height=300).generate_from_frequencies(top_oms.to_dict())
                 plt.imshow(wc, interpolation='bilinear'); plt.axis('off')
@@ -213,7 +238,7 @@ if page == "Entités & Acteurs":
     with col2:
         st.subheader("Top entités — Forbes")
         if ents is not None:
-            top_forbes = ents['entity'].value_counts().head(50)
+            top_forbes = entity_counts(ents).head(50)
             if have_wc:
                 wc = WordCloud(width=400, height=300).generate_from_frequencies(top_forbes.to_dict())
                 plt.imshow(wc, interpolation='bilinear'); plt.axis('off')
@@ -224,12 +249,12 @@ if page == "Entités & Acteurs":
             st.info("Fichier d'entités Forbes non disponible.")
     st.subheader("Graphiques — Top entités (barplots)")
     if ents is not None:
-        df_top = ents['entity'].value_counts().head(20).reset_index()
+        df_top = entity_counts(ents).head(20).reset_index()
         df_top.columns = ['entity','count']
         fig = px.bar(df_top, x='count', y='entity', orientation='h', title='Top entités — Forbes', height=600)
         st.plotly_chart(fig, use_container_width=True)
     if ents_oms is not None:
-        df_top2 = ents_oms['entity'].value_counts().head(20).reset_index()
+        df_top2 = entity_counts(ents_oms).head(20).reset_index()
         df_top2.columns = ['entity','count']
         fig2 = px.bar(df_top2, x='count', y='entity', orientation='h', title='Top entités — OMS', height=600)
         st.plotly_chart(fig2, use_container_width=True)
@@ -237,6 +262,19 @@ if page == "Entités & Acteurs":
     st.markdown("Distribution des types d'entités (ORG / PER / GPE / etc.)")
     if ents is not None and 'label' in ents.columns:
         st.write(ents['label'].value_counts())
+    # Réseau de co-occurrence (GraphML exporté par le notebook d'analyse)
+    graph_path = os.path.join(RES_DIR, "entity_graph.graphml")
+    if os.path.exists(graph_path):
+        import networkx as nx
+        st.subheader("Réseau de co-occurrence — voisins d'une entité")
+        G = nx.read_graphml(graph_path)
+        nodes = sorted(G.nodes, key=lambda n: -G.nodes[n].get("count", 0))
+        chosen = st.selectbox("Entité", nodes)
+        if chosen:
+            nbrs = pd.DataFrame([{"entity": n, "count": d.get("count", 0), "pmi": d.get("pmi", 0.0)}
+                                 for n, d in G[chosen].items()])
+            if not nbrs.empty:
+                st.dataframe(nbrs.sort_values("pmi", ascending=False).head(15), use_container_width=True)
 
 # PAGE: Sentiment & Framing
 if page == "Sentiment & Framing":
@@ -283,11 +321,11 @@ if page == "Export graphiques":
                 fig2 = px.bar(cover_counts.sort_values('count',ascending=False), x='topic', y='count', title="Nombre d’articles Forbes couvrant chaque thème de l’OMS")
                 out2 = os.path.join(RES_DIR, 'coverage_bar.png'); fig2.write_image(out2); exported.append(out2)
             if ents is not None:
-                df_top = ents['entity'].value_counts().head(50).reset_index(); df_top.columns=['entity','count']
+                df_top = entity_counts(ents).head(50).reset_index(); df_top.columns=['entity','count']
                 fig3 = px.bar(df_top, x='count', y='entity', orientation='h', title='Top entités — Forbes')
                 out3 = os.path.join(RES_DIR, 'top_entities_forbes.png'); fig3.write_image(out3); exported.append(out3)
             if ents_oms is not None:
-                df_top2 = ents_oms['entity'].value_counts().head(50).reset_index(); df_top2.columns=['entity','count']
+                df_top2 = entity_counts(ents_oms).head(50).reset_index(); df_top2.columns=['entity','count']
                 fig4 = px.bar(df_top2, x='count', y='entity', orientation='h', title='Top entités — OMS')
                 out4 = os.path.join(RES_DIR, 'top_entities_oms.png'); fig4.write_image(out4); exported.append(out4)
             if sent is not None:
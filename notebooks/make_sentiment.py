@@ -1,51 +1,82 @@
 # make_sentiment.py
-import os, pandas as pd, numpy as np
+import os, sys, time, pandas as pd, numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
 OUT_DIR = "outputs"
 ARTS = os.path.join("../data/all_articles_processed.csv")
 
+BATCH_SIZE = 32        # fenêtres par lot (triées par longueur, padding dynamique)
+NUM_THREADS = None     # threads intra-op torch (None = valeur par défaut de torch)
+WINDOW_STRIDE = 64     # recouvrement (tokens) entre fenêtres glissantes des documents longs
+CACHE_BATCH = 256      # documents manquants envoyés au modèle puis écrits dans le cache par lot
+
 df = pd.read_csv(ARTS)
 texts = df.get("texte_clean_bert", df.get("texte_clean_tfidf", df.get("texte",""))).fillna("").astype(str)
 
-# Use transformers pipeline (downloads model if needed)
+# Moteur batché (télécharge le modèle si nécessaire)
 try:
-    from transformers import pipeline
+    from sentiment_engine import SentimentEngine
+    from inference_cache import InferenceCache, model_revision
     model_name = "nlptown/bert-base-multilingual-uncased-sentiment"  # general multilingual sentiment
     print("Chargement du modèle de sentiment:", model_name)
-    pipe = pipeline("sentiment-analysis", model=model_name, device=-1)  # CPU
+    engine = SentimentEngine(model_name, batch_size=BATCH_SIZE, num_threads=NUM_THREADS, device="cpu")
 except Exception as e:
-    print("Impossible de charger transformers pipeline:", e)
+    print("Impossible de charger le modèle transformers:", e)
     print("Retour: fallback simple (label NEU pour textes vides).")
-    pipe = None
-
-records = []
-for i, t in enumerate(texts):
-    txt = str(t)[:1000]  # tronquer si très long
-    if not txt.strip():
-        records.append({"global_index": int(i), "label": "NEU", "score": 0.0})
-        continue
-    if pipe is None:
-        records.append({"global_index": int(i), "label": "NEU", "score": 0.0})
-    else:
+    engine = None
+
+def map_label(label):
+    """normalize some model labels to POS/NEG/NEU if needed"""
+    if label.lower().startswith("very positive") or "5" in label or "POS" in label.upper():
+        return "POS"
+    if label.lower().startswith("very negative") or "1" in label or "NEG" in label.upper():
+        return "NEG"
+    # some models yield stars or neutral labels; map roughly
+    if "negative" in label.lower():
+        return "NEG"
+    if "positive" in label.lower():
+        return "POS"
+    return "NEU"
+
+# documents entiers : fenêtres glissantes de la taille du modèle, agrégées par document
+docs = [str(t) for t in texts]
+to_score = [i for i, txt in enumerate(docs) if txt.strip()]
+
+def predict_batch(xs):
+    """predict_long sur un lot ; en cas d'erreur, document par document (None si le document échoue)."""
+    try:
+        return engine.predict_long(xs, stride=WINDOW_STRIDE)
+    except Exception as e:
+        print(f"Erreur d'inférence sur un lot de {len(xs)} documents, reprise un par un:", e)
+    out = []
+    for x in xs:
         try:
-            out = pipe(txt)[0]
-            label = out.get("label", "")
-            score = float(out.get("score", 0.0))
-            # normalize some model labels to POS/NEG/NEU if needed
-            if label.lower().startswith("very positive") or "5" in label or "POS" in label.upper():
-                lab = "POS"
-            elif label.lower().startswith("very negative") or "1" in label or "NEG" in label.upper():
-                lab = "NEG"
-            else:
-                # some models yield stars or neutral labels; map roughly
-                if "negative" in label.lower():
-                    lab = "NEG"
-                elif "positive" in label.lower():
-                    lab = "POS"
-                else:
-                    lab = "NEU"
-            records.append({"global_index": int(i), "label": lab, "score": score})
-        except Exception as e:
-            records.append({"global_index": int(i), "label": "NEU", "score": 0.0})
+            out.append(engine.predict_long([x], stride=WINDOW_STRIDE)[0])
+        except Exception:
+            out.append(None)   # None n'est pas une valeur en cache : document retenté au prochain lancement
+    return out
+
+records = [{"global_index": int(i), "label": "NEU", "score": 0.0} for i in range(len(docs))]
+if engine is not None and to_score:
+    t0 = time.perf_counter()
+    # seuls les textes jamais vus (ou modèle / paramètres changés) passent dans le modèle
+    cache = InferenceCache()
+    preds = cache.cached_map(predict_batch, [docs[i] for i in to_score], model=model_name,
+                             revision=model_revision(engine.model), task="sentiment-long",
+                             params={"stride": WINDOW_STRIDE, "max_length": engine.max_length},
+                             batch_size=CACHE_BATCH)
+    cache.print_stats()
+    n_failed = 0
+    for i, out in zip(to_score, preds):
+        if out is None:   # échec isolé : label NEU pour ce document seulement
+            n_failed += 1
+            continue
+        records[i] = {"global_index": int(i), "label": map_label(out.get("label", "")),
+                      "score": float(out.get("score", 0.0))}
+    if n_failed:
+        print(f"{n_failed} document(s) en erreur (labels NEU)")
+    elapsed = time.perf_counter() - t0
+    print(f"Inférence: {len(to_score)} documents en {elapsed:.1f}s "
+          f"({len(to_score) / max(elapsed, 1e-9):.1f} docs/s, batch_size={BATCH_SIZE})")
 
 sent_df = pd.DataFrame(records)
 os.makedirs(os.path.join(OUT_DIR,"analysis_results"), exist_ok=True)
@@ -0,0 +1,34 @@
+# make_summaries.py
+import os, sys, time, pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+ARTS = os.path.join("../data/all_articles_processed.csv")
+
+MODEL_NAME = "facebook/bart-large-cnn"
+BATCH_SIZE = 8          # blocs par lot (triés par longueur, padding dynamique)
+NUM_THREADS = None      # threads intra-op torch (None = valeur par défaut de torch)
+PREFILTER_WORDS = 400   # au-delà, pré-filtre extractif TextRank avant le modèle
+CHUNK_SIZE = 64         # articles résumés puis écrits dans le cache par tranche
+TIME_BUDGET = None      # secondes max pour ce lancement (None = tout) ; relancer reprend la suite
+
+from summarization_engine import SummarizationEngine, cached_summaries
+from inference_cache import InferenceCache
+
+df = pd.read_csv(ARTS)
+texts = df["texte"].fillna("").astype(str).tolist()
+
+print("Chargement du modèle de résumé:", MODEL_NAME)
+engine = SummarizationEngine(MODEL_NAME, batch_size=BATCH_SIZE, max_length=60, min_length=20,
+                             prefilter_words=PREFILTER_WORDS, num_threads=NUM_THREADS)
+cache = InferenceCache()
+
+t0 = time.perf_counter()
+summaries = cached_summaries(engine, texts, cache, chunk_size=CHUNK_SIZE, time_budget=TIME_BUDGET)
+elapsed = time.perf_counter() - t0
+cache.print_stats()
+
+# les articles non traités (budget atteint) gardent leur résumé précédent
+new = pd.Series(summaries, index=df.index, dtype=object)
+df["summary"] = new.where(new.notna(), df.get("summary"))
+df.to_csv(ARTS, index=False)
+done = int(new.notna().sum())
+print(f"Résumés: {done}/{len(df)} articles en {elapsed:.1f}s -> {ARTS}")
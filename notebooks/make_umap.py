@@ -1,6 +1,7 @@
-import os
+import os, sys
 import numpy as np
 import pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
 
 OUT_DIR = "outputs"
 ARTS = os.path.join("../data/all_articles_processed.csv")
@@ -9,24 +10,35 @@ ARTS = os.path.join("../data/all_articles_processed.csv")
 df = pd.read_csv(ARTS).reset_index()  # keep original index as global_index
 print("Loaded articles:", df.shape)
 
-# 1) Try to load embeddings.npy
+# 1) Embeddings depuis le magasin incrémental (seuls les articles nouveaux / modifiés sont encodés)
+from embedding_store import EmbeddingStore, DEFAULT_ROOT
+EMB_MODEL = "all-mpnet-base-v2"   # bon compromis
+store = EmbeddingStore(os.path.join(DEFAULT_ROOT, EMB_MODEL))
+texts = df.get("texte_clean_bert", df.get("texte_clean_tfidf", df.get("texte",""))).fillna("").astype(str).tolist()
+urls = df["lien"].astype(str).tolist() if "lien" in df.columns else None
+
+# reprise de l'ancien embeddings.npy (calculé sur ce même ordre de lignes) au premier passage
 emb_path = os.path.join("outputs","analysis_results","embeddings.npy")
-if not os.path.exists(emb_path):
-    emb_path = os.path.join("embeddings.npy")  # fallback top-level
-if os.path.exists(emb_path):
-    emb = np.load(emb_path)
-    print("Loaded embeddings from", emb_path, "shape=", emb.shape)
-else:
-    # Fallback: compute SBERT embeddings
-    print("embeddings.npy not trouvé. Calcul des embeddings SBERT (peut prendre du temps)...")
-    from sentence_transformers import SentenceTransformer
-    model = SentenceTransformer("all-mpnet-base-v2")   # bon compromis
-    texts = df.get("texte_clean_bert", df.get("texte_clean_tfidf", df.get("texte",""))).fillna("").astype(str).tolist()
-    emb = model.encode(texts, show_progress_bar=True, convert_to_numpy=True)
-    # optional: save embeddings for réemploi
-    os.makedirs(os.path.join(OUT_DIR,"analysis_results"), exist_ok=True)
-    np.save(os.path.join(OUT_DIR,"analysis_results","embeddings.npy"), emb)
-    print("Saved embeddings to outputs/analysis_results/embeddings.npy")
+if len(store) == 0 and os.path.exists(emb_path):
+    legacy = np.load(emb_path)
+    if legacy.shape[0] == len(texts):
+        store.import_array(texts, legacy, urls)
+        print("Imported", emb_path, "into the embedding store, shape=", legacy.shape)
+    else:
+        print("Not imported:", emb_path, "has", legacy.shape[0], "rows for", len(texts), "articles")
+
+_sbert = None
+def encode(batch):
+    global _sbert
+    if _sbert is None:
+        print("Calcul des embeddings SBERT pour les articles absents du magasin...")
+        from sentence_transformers import SentenceTransformer
+        _sbert = SentenceTransformer(EMB_MODEL)
+    return _sbert.encode(batch, show_progress_bar=True, convert_to_numpy=True)
+
+ids = store.encode_missing(texts, encode, urls=urls)
+emb = store.get(ids)   # lignes alignées sur df, quel que soit l'ordre de calcul
+print("Embeddings:", emb.shape, "| store rows:", len(store))
 
 # 2) Compute UMAP
 print("Calcul UMAP...")
@@ -37,8 +49,7 @@ print("UMAP shape:", umap2.shape)
 
 # 3) Save coords + meta
 coords = pd.DataFrame(umap2, columns=["umap_x","umap_y"])
-# attach article fields (make sure same ordering: embeddings were computed on df)
-# if embeddings were computed from a different order, adapt accordingly
+# attach article fields (emb est aligné sur df via les identifiants du magasin)
 meta_cols = []
 for c in ["source","titre","preview","date","texte_clean_bert"]:
     if c in df.columns:
@@ -0,0 +1,115 @@
+"""
+Extracteur d'articles unifié (OMS / Forbes) : une seule analyse lxml par page,
+puis des sélecteurs XPath compilés une fois par source.
+
+Les règles d'extraction sont décrites par source dans EXTRACTION_RULES :
+  title       : XPath du titre (premier nœud trouvé, ordre du document)
+  date        : liste ordonnée de (XPath, attribut ou None pour le texte)
+  paragraphs  : XPath des paragraphes
+  min_words   : nombre minimal de mots d'un paragraphe retenu
+
+Sortie identique à l'ancien chemin BeautifulSoup :
+  {"source", "url", "title", "date", "text"}
+
+Benchmark : python bench_article_parser.py --fixtures <dossier de pages .html>
+"""
+
+import re
+from dateutil import parser as dateparser
+from lxml import etree, html as lxml_html
+
+_WS = re.compile(r"\s+")
+# lxml refuse une chaîne unicode qui porte une déclaration d'encodage (ValueError) : on la retire
+_XML_DECL = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+# texte visible d'un nœud (comme get_text de BeautifulSoup : scripts/styles exclus)
+_TEXT_NODES = etree.XPath(
+    "descendant-or-self::text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]"
+)
+
+
+def clean_text(s: str) -> str:
+    """Nettoyage léger : trim et espaces multiples."""
+    return _WS.sub(" ", (s or "")).strip()
+
+def node_text(node, sep=" "):
+    """Équivalent de `tag.get_text(sep, strip=True)`."""
+    return sep.join(t.strip() for t in _TEXT_NODES(node) if t.strip())
+
+# --------- Règles par source ----------
+
+EXTRACTION_RULES = {
+    "OMS": {
+        # premier <h1> ou <title> dans l'ordre du document
+        "title": "(//h1 | //title)[1]",
+        "date": [
+            ("(//time)[1]", "datetime"),
+            ("//meta[@property='article:published_time'][1]", "content"),
+        ],
+        "paragraphs": "//p",
+        "min_words": 5,
+    },
+    "Forbes": {
+        "title": "(//h1)[1] | (//title)[1][not(//h1)]",
+        "date": [
+            ("(//time)[1]", "datetime"),
+            ("(//time)[1]", None),
+            ("//meta[@property='article:published_time'][1]", "content"),
+        ],
+        "paragraphs": "//p",
+        "min_words": 5,
+    },
+}
+
+
+class ArticleExtractor:
+    """Règles d'une source, avec les XPath compilés une seule fois."""
+
+    def __init__(self, source, rules):
+        self.source = source
+        self.title = etree.XPath(rules["title"])
+        self.date = [(etree.XPath(xp), attr) for xp, attr in rules["date"]]
+        self.paragraphs = etree.XPath(rules["paragraphs"])
+        self.min_words = rules.get("min_words", 5)
+
+    def _date(self, tree):
+        for xp, attr in self.date:
+            nodes = xp(tree)
+            if not nodes:
+                continue
+            value = nodes[0].get(attr) if attr else node_text(nodes[0], sep="")
+            if value:
+                return value
+        return None
+
+    def extract(self, html_text, url):
+        if not html_text:
+            return None
+        if isinstance(html_text, str):
+            html_text = _XML_DECL.sub("", html_text, count=1)
+        try:
+            tree = lxml_html.document_fromstring(html_text)
+        except (etree.ParserError, ValueError):
+            return None
+
+        nodes = self.title(tree)
+        title = clean_text(node_text(nodes[0])) if nodes else ""
+
+        date_iso = self._date(tree)
+        try:
+            date_str = dateparser.parse(date_iso).isoformat() if date_iso else None
+        except Exception:
+            date_str = None
+
+        # texte (concat des <p> non trop courts)
+        paragraphs = (node_text(p) for p in self.paragraphs(tree))
+        text = "\n".join(clean_text(p) for p in paragraphs if len(p.split()) >= self.min_words)
+
+        return {"source": self.source, "url": url, "title": title, "date": date_str, "text": text}
+
+
+EXTRACTORS = {src: ArticleExtractor(src, rules) for src, rules in EXTRACTION_RULES.items()}
+
+def parse_article(html_text, url, source):
+    """Extrait (title, date, text) d'une page déjà téléchargée, selon les règles de `source`."""
+    return EXTRACTORS[source].extract(html_text, url)
@@ -0,0 +1,92 @@
+"""
+Sentiment par aspect (topic OMS) des articles Forbes, en un flux de lots.
+
+Par rapport à la boucle d'origine du notebook (iterrows x topics x phrases x mots-clés) :
+  - chaque article est découpé en phrases une seule fois ;
+  - tous les mots-clés de tous les topics sont cherchés en un passage par phrase avec
+    une seule expression régulière compilée (alternative en lookahead : les mots-clés
+    qui se chevauchent ou s'emboîtent sont tous retrouvés) ;
+  - les phrases retenues sont dédupliquées (entre topics et entre articles), puis
+    envoyées au modèle en un seul appel par lots (SentimentEngine.predict ou pipeline).
+
+Même table que le notebook : global_index, topic, aspect_sentiment, n_sentences,
+avec la même règle (phrases contenant un mot-clé du topic, sinon les 3 premières phrases ;
+score = moyenne de polarité x score du modèle).
+"""
+
+import re
+import numpy as np
+import pandas as pd
+
+POLARITY = {"POSITIVE": 1, "NEGATIVE": -1}
+MAX_CHARS = 1000     # phrases tronquées avant le modèle (comme s[:1000])
+FALLBACK_SENTS = 3   # phrases prises en tête d'article si aucun mot-clé n'apparaît
+
+
+class KeywordMatcher:
+    """Topics dont au moins un mot-clé apparaît (mot entier, sans casse) dans un texte."""
+
+    def __init__(self, topic_keywords):
+        self.topics_of = {}
+        for t, kws in topic_keywords.items():
+            for k in kws:
+                if isinstance(k, str) and k:
+                    self.topics_of.setdefault(k.lower(), set()).add(t)
+        # le plus long d'abord : à une position donnée, l'alternative la plus longue l'emporte ;
+        # les mots-clés contenus dans celle-ci sont retrouvés par `implied`
+        words = sorted(self.topics_of, key=len, reverse=True)
+        self.pattern = re.compile(r"(?=\b(" + "|".join(map(re.escape, words)) + r")\b)", flags=re.I) if words else None
+        self.implied = {}
+        for k in words:
+            topics = set()
+            for k2 in words:
+                if len(k2) <= len(k) and re.search(r"\b" + re.escape(k2) + r"\b", k, flags=re.I):
+                    topics |= self.topics_of[k2]
+            self.implied[k] = topics
+
+    def topics(self, text):
+        if self.pattern is None:
+            return set()
+        found = set()
+        for m in self.pattern.finditer(text):
+            found |= self.implied.get(m.group(1).lower(), set())
+        return found
+
+
+def _polarity(out):
+    return POLARITY.get(str(out.get("label", "")).upper(), 0) * float(out.get("score", 0.0))
+
+def aspect_sentiment_frame(cov, texts, topic_keywords, predict, sent_tokenize, batch_size=256):
+    """Sentiment par (article couvert, topic).
+
+    `cov` : table de couverture (global_index, covered_topic_{t}) ; `texts[global_index]` : texte ;
+    `predict(liste de phrases) -> [{"label", "score"}, ...]` est appelé par lots de `batch_size`
+    phrases uniques.
+    """
+    matcher = KeywordMatcher(topic_keywords)
+    topics = list(topic_keywords)
+    covered_cols = [f"covered_topic_{t}" for t in topics]
+    flags = cov.reindex(columns=covered_cols).fillna(0).to_numpy() == 1
+
+    tasks = []                    # (global_index, topic, [ids de phrases])
+    sent_id = {}                  # phrase (tronquée) -> id unique
+    for gidx, row_flags in zip(cov["global_index"].astype(int), flags):
+        if not row_flags.any():
+            continue
+        sents = sent_tokenize(str(texts[gidx]))
+        hits = [matcher.topics(s) for s in sents]
+        for t, covered in zip(topics, row_flags):
+            if not covered:
+                continue
+            chosen = [s for s, h in zip(sents, hits) if t in h] or sents[:FALLBACK_SENTS]
+            tasks.append((gidx, t, [sent_id.setdefault(s[:MAX_CHARS], len(sent_id)) for s in chosen]))
+
+    unique = list(sent_id)
+    values = np.zeros(len(unique), dtype=np.float64)
+    for start in range(0, len(unique), batch_size):
+        outs = predict(unique[start:start + batch_size])
+        values[start:start + len(outs)] = [_polarity(o) for o in outs]
+
+    records = [{"global_index": gidx, "topic": t, "aspect_sentiment": float(values[ids].mean()),
+                "n_sentences": len(ids)} for gidx, t, ids in tasks if ids]
+    return pd.DataFrame(records, columns=["global_index", "topic", "aspect_sentiment", "n_sentences"])
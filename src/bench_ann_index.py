@@ -0,0 +1,72 @@
+"""
+Micro-benchmark : index ANN (ann_index) vs recherche exacte.
+
+Mesure le temps de construction, le débit des requêtes top-k et le rappel@k
+de chaque moteur par rapport à la recherche exacte (cosinus).
+
+Données : soit le magasin d'embeddings (--store), dont une fraction sert de requêtes,
+soit des vecteurs synthétiques regroupés en amas (--n, --dim).
+
+Usage :
+  python bench_ann_index.py --store ../outputs/embeddings/all-mpnet-base-v2 --k 5
+  python bench_ann_index.py --n 100000 --dim 384 --queries 2000 --backends ivf nndescent
+"""
+
+import argparse, time
+import numpy as np
+from ann_index import AnnIndex, exact_topk, normalize_rows
+
+
+def synthetic(n, dim, n_clusters=200, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, size=n)
+    return centers[labels] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+
+def recall_at_k(approx, exact):
+    hits = sum(len(set(a[a >= 0]) & set(e)) for a, e in zip(approx, exact))
+    return hits / exact.size
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--store", default=None, help="dossier d'un EmbeddingStore")
+    ap.add_argument("--n", type=int, default=50_000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=1000)
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--backends", nargs="+", default=["flat", "ivf", "nndescent"])
+    args = ap.parse_args()
+
+    if args.store:
+        from embedding_store import EmbeddingStore
+        data = np.asarray(EmbeddingStore(args.store).matrix(), dtype=np.float32)
+    else:
+        data = synthetic(args.n, args.dim)
+    rng = np.random.default_rng(1)
+    is_query = np.zeros(len(data), dtype=bool)
+    is_query[rng.choice(len(data), min(args.queries, len(data) // 2), replace=False)] = True
+    X, Q = data[~is_query], data[is_query]
+    print(f"Base : {len(X)} vecteurs (dim {X.shape[1]}), {len(Q)} requêtes, k={args.k}")
+
+    t0 = time.perf_counter()
+    exact, _ = exact_topk(normalize_rows(Q), normalize_rows(X), args.k)
+    t_exact = time.perf_counter() - t0
+    print(f"{'exact':>10} : requêtes {len(Q) / t_exact:9.0f} q/s")
+
+    for backend in args.backends:
+        try:
+            t0 = time.perf_counter()
+            index = AnnIndex(backend).build(X)
+            t_build = time.perf_counter() - t0
+            index.query(Q[:10], k=args.k)   # compilation numba (nndescent) hors mesure
+            t0 = time.perf_counter()
+            approx, _ = index.query(Q, k=args.k)
+            t_query = time.perf_counter() - t0
+        except Exception as e:
+            print(f"{backend:>10} : indisponible ({e})")
+            continue
+        print(f"{index.backend:>10} : construction {t_build:7.2f}s | requêtes {len(Q) / t_query:9.0f} q/s"
+              f" | rappel@{args.k} {recall_at_k(approx, exact):.3f}")
+
+if __name__ == "__main__":
+    main()
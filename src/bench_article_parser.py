@@ -0,0 +1,94 @@
+"""
+Micro-benchmark : extracteur lxml (article_parser) vs ancien chemin BeautifulSoup.
+
+Mesure le débit (pages/s) des deux extracteurs sur des pages HTML sauvegardées
+et vérifie que les sorties sont identiques.
+
+Usage :
+  python bench_article_parser.py --fixtures outputs/http_cache --source OMS --repeat 3
+"""
+
+import argparse, glob, os, re, time
+from bs4 import BeautifulSoup
+from dateutil import parser as dateparser
+from article_parser import parse_article
+
+
+def clean_text(s: str) -> str:
+    return re.sub(r"\s+", " ", (s or "")).strip()
+
+# --------- Référence : extraction BeautifulSoup d'origine (phase1_scrape) ----------
+
+def parse_bs4(html, url, source):
+    soup = BeautifulSoup(html, "lxml")
+
+    if source == "OMS":
+        title_tag = soup.find(["h1", "title"])
+    else:
+        title_tag = soup.find("h1") or soup.find("title")
+    title = clean_text(title_tag.get_text(" ", strip=True)) if title_tag else ""
+
+    date_iso = None
+    t = soup.find("time")
+    if source == "OMS":
+        if t and t.get("datetime"):
+            date_iso = t.get("datetime")
+    elif t and (t.get("datetime") or t.get_text(strip=True)):
+        date_iso = t.get("datetime") or t.get_text(strip=True)
+    if not date_iso:
+        meta = soup.find("meta", {"property": "article:published_time"})
+        if meta and meta.get("content"):
+            date_iso = meta.get("content")
+    try:
+        date_str = dateparser.parse(date_iso).isoformat() if date_iso else None
+    except Exception:
+        date_str = None
+
+    paragraphs = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
+    paragraphs = [clean_text(p) for p in paragraphs if len(p.split()) >= 5]
+    text = "\n".join(paragraphs)
+
+    return {"source": source, "url": url, "title": title, "date": date_str, "text": text}
+
+# --------- Mesure ----------
+
+def load_fixtures(folder):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(folder, "**", "*.html"), recursive=True)):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append((path, f.read()))
+    return pages
+
+def bench(fn, pages, source, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [fn(html, url, source) for url, html in pages]
+        best = min(best, time.perf_counter() - t0)
+    return out, len(pages) / best
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--fixtures", default=os.path.join("outputs", "http_cache"))
+    ap.add_argument("--source", default="OMS", choices=["OMS", "Forbes"])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    if not pages:
+        print(f"Aucune page .html trouvée dans {args.fixtures}")
+        return
+
+    ref, bs4_rate = bench(parse_bs4, pages, args.source, args.repeat)
+    new, lxml_rate = bench(parse_article, pages, args.source, args.repeat)
+    diffs = [url for (url, _), a, b in zip(pages, ref, new) if a != b]
+
+    print(f"{len(pages)} pages ({args.source})")
+    print(f"BeautifulSoup : {bs4_rate:8.1f} pages/s")
+    print(f"lxml + XPath  : {lxml_rate:8.1f} pages/s  (x{lxml_rate / bs4_rate:.1f})")
+    print(f"Sorties identiques : {len(pages) - len(diffs)}/{len(pages)}")
+    for url in diffs[:10]:
+        print("  différence :", url)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Scores de couverture des topics OMS par les articles Forbes, calculés en bloc.
+
+  - couverture lexicale : part des tokens d'un article appartenant au vocabulaire d'un topic,
+    = (matrice creuse documents x mots-clés) @ (matrice binaire mots-clés x topics) / nb de tokens ;
+    le comptage des mots-clés se fait en un passage par document (par blocs, en parallèle si n_jobs) ;
+  - similarité sémantique : cosinus article / centroïde, = un seul produit matriciel
+    entre embeddings normalisés et centroïdes empilés ;
+  - couverture combinée : lexical > seuil OU sémantique > seuil, par topic.
+
+Résultats identiques aux boucles d'origine du notebook (lexical_coverage, cosine_similarity
+ligne à ligne) ; mêmes colonnes : global_index, lex_topic_{t}, sim_topic_{t}, covered_topic_{t}.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from parallel_preprocess import _map_chunks
+
+LEX_THRESHOLD = 0.08   # part minimale de tokens du topic pour une couverture lexicale
+SIM_THRESHOLD = 0.55   # cosinus minimal article / centroïde pour une couverture sémantique
+
+
+class _KeywordHits:
+    """Tâche picklable : (nb de tokens, ids des mots-clés rencontrés) pour chaque texte d'un bloc."""
+
+    def __init__(self, vocab):
+        self.pos = {w: j for j, w in enumerate(vocab)}
+
+    def __call__(self, texts):
+        pos = self.pos
+        out = []
+        for text in texts:
+            toks = text.split()
+            out.append((len(toks), [pos[w] for w in toks if w in pos]))
+        return out
+
+def keyword_counts(texts, vocab, n_jobs=1):
+    """Matrice creuse (n_docs, len(vocab)) des occurrences de mots-clés + nombre de tokens par document.
+
+    Seuls les mots-clés sont indexés : la matrice reste petite quel que soit le vocabulaire du corpus.
+    """
+    texts = [str(t) for t in texts]
+    hits = _map_chunks(_KeywordHits(vocab), texts, n_jobs, None)
+    n_tokens = np.fromiter((n for n, _ in hits), dtype=np.float64, count=len(hits))
+    indptr = np.zeros(len(hits) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(c) for _, c in hits])
+    indices = np.fromiter((j for _, c in hits for j in c), dtype=np.int64, count=int(indptr[-1]))
+    counts = sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(hits), len(vocab)))
+    counts.sum_duplicates()
+    return counts, n_tokens
+
+def lexical_coverage_matrix(texts, topic_words, n_jobs=1):
+    """(n_docs, n_topics) : part des tokens (séparés par espaces) présents dans chaque liste de mots-clés."""
+    topics = list(topic_words)
+    vocab = list(dict.fromkeys(w for t in topics for w in topic_words[t] if isinstance(w, str) and w))
+    counts, n_tokens = keyword_counts(texts, vocab, n_jobs)
+    pos = {w: j for j, w in enumerate(vocab)}
+    rows, cols = [], []
+    for k, t in enumerate(topics):
+        idx = {pos[w] for w in topic_words[t] if isinstance(w, str) and w in pos}
+        rows.extend(idx)
+        cols.extend([k] * len(idx))
+    membership = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(vocab), len(topics)))
+    hits = (counts @ membership).toarray()
+    return np.divide(hits, n_tokens[:, None], out=np.zeros_like(hits), where=n_tokens[:, None] > 0)
+
+def _unit_rows(X):
+    return X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+
+def semantic_similarity_matrix(embeddings, centroids, batch_size=65536):
+    """(n_docs, n_topics) : cosinus entre chaque embedding et chaque centroïde (vecteur nul -> 0).
+
+    Les embeddings sont normalisés par blocs : pas de copie complète de la matrice (memmap possible).
+    """
+    C = _unit_rows(np.asarray(centroids, dtype=np.float32).reshape(len(centroids), -1))
+    out = np.empty((len(embeddings), len(C)), dtype=np.float64)
+    for start in range(0, len(embeddings), batch_size):
+        block = np.asarray(embeddings[start:start + batch_size], dtype=np.float32)
+        out[start:start + len(block)] = _unit_rows(block) @ C.T
+    return out
+
+# --------- Tables (mêmes colonnes que les CSV du notebook) ----------
+
+def lexical_coverage_frame(global_index, texts, topic_words, n_jobs=1):
+    scores = lexical_coverage_matrix(texts, topic_words, n_jobs)
+    df = pd.DataFrame(scores, columns=[f"lex_topic_{t}" for t in topic_words])
+    df.insert(0, "global_index", np.asarray(global_index, dtype=int))
+    return df
+
+def semantic_similarity_frame(global_index, embeddings, topic_centroids):
+    topics = list(topic_centroids)
+    scores = semantic_similarity_matrix(embeddings, np.vstack([topic_centroids[t] for t in topics]))
+    df = pd.DataFrame(scores, columns=[f"sim_topic_{t}" for t in topics])
+    df.insert(0, "global_index", np.asarray(global_index, dtype=int))
+    return df
+
+def combined_coverage_frame(lex, sim, topics, lex_threshold=LEX_THRESHOLD, sim_threshold=SIM_THRESHOLD):
+    """Fusionne les deux tables et ajoute covered_topic_{t} (lexical OU sémantique au-dessus du seuil)."""
+    cov = lex.copy()
+    if sim is not None and not sim.empty:
+        cov = cov.merge(sim, on="global_index", how="left")
+    flags = {}
+    for t in topics:
+        lex_t = cov[f"lex_topic_{t}"] if f"lex_topic_{t}" in cov else 0
+        sim_t = cov[f"sim_topic_{t}"] if f"sim_topic_{t}" in cov else 0
+        flags[f"covered_topic_{t}"] = ((lex_t > lex_threshold) | (sim_t > sim_threshold)).astype(int)
+    return pd.concat([cov, pd.DataFrame(flags, index=cov.index)], axis=1)
@@ -0,0 +1,103 @@
+"""
+État de crawl persistant (SQLite) : frontière d'URLs + index des URLs vues / hash de contenu.
+
+Tables :
+  urls(url, source, status, attempts, first_seen, fetched_at, content_hash)
+      status ∈ {pending, done, failed}
+  contents(content_hash, url)   -> détecte les textes identiques publiés sous plusieurs URLs
+
+Un rafraîchissement quotidien ne traite ainsi que les URLs jamais vues
+(ou en échec, dans la limite de MAX_ATTEMPTS).
+"""
+
+import os, sqlite3, hashlib, time
+
+MAX_ATTEMPTS = 3
+
+
+def content_hash(text):
+    """Empreinte stable d'un texte (espaces normalisés)."""
+    norm = " ".join(str(text or "").split())
+    return hashlib.sha1(norm.encode("utf-8")).hexdigest()
+
+
+class CrawlState:
+    """Frontière + ensemble des URLs vues, persistés dans un fichier SQLite."""
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url          TEXT PRIMARY KEY,
+                source       TEXT,
+                status       TEXT NOT NULL DEFAULT 'pending',
+                attempts     INTEGER NOT NULL DEFAULT 0,
+                first_seen   REAL,
+                fetched_at   REAL,
+                content_hash TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_urls_status ON urls(status, source);
+            CREATE TABLE IF NOT EXISTS contents (
+                content_hash TEXT PRIMARY KEY,
+                url          TEXT
+            );
+        """)
+        self.conn.commit()
+
+    # --------- Frontière ----------
+
+    def known(self, url):
+        return self.conn.execute("SELECT 1 FROM urls WHERE url = ?", (url,)).fetchone() is not None
+
+    def enqueue(self, urls, source):
+        """Ajoute les URLs jamais vues à la frontière ; renvoie uniquement les nouvelles."""
+        now = time.time()
+        new = []
+        with self.conn:
+            for u in urls:
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO urls(url, source, status, first_seen) VALUES (?, ?, 'pending', ?)",
+                    (u, source, now))
+                if cur.rowcount:
+                    new.append(u)
+        return new
+
+    def pending(self, source=None, limit=None):
+        """URLs à (re)traiter : en attente ou en échec avec encore des tentatives."""
+        q = "SELECT url FROM urls WHERE status IN ('pending', 'failed') AND attempts < ?"
+        args = [MAX_ATTEMPTS]
+        if source is not None:
+            q += " AND source = ?"
+            args.append(source)
+        q += " ORDER BY first_seen"
+        if limit is not None:
+            q += " LIMIT ?"
+            args.append(int(limit))
+        return [r[0] for r in self.conn.execute(q, args)]
+
+    # --------- Résultats ----------
+
+    def seen_content(self, h):
+        return self.conn.execute("SELECT 1 FROM contents WHERE content_hash = ?", (h,)).fetchone() is not None
+
+    def mark_done(self, url, h=None):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE urls SET status = 'done', attempts = attempts + 1, fetched_at = ?, content_hash = ? WHERE url = ?",
+                (time.time(), h, url))
+            if h:
+                self.conn.execute("INSERT OR IGNORE INTO contents(content_hash, url) VALUES (?, ?)", (h, url))
+
+    def mark_failed(self, url):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE urls SET status = 'failed', attempts = attempts + 1, fetched_at = ? WHERE url = ?",
+                (time.time(), url))
+
+    def counts(self):
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status").fetchall())
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,177 @@
+"""
+Magasin d'embeddings incrémental : matrice brute mappée en mémoire + index SQLite des identifiants.
+
+  outputs/embeddings/<modèle>/vectors.bin     lignes float16 (ou float32) ajoutées en fin de fichier
+  outputs/embeddings/<modèle>/index.sqlite    ids(id, row, url)  +  meta(key, value)
+
+L'identifiant d'une ligne est le hash du texte encodé (text_hash) : un article inchangé
+n'est jamais ré-encodé, un article modifié obtient une nouvelle ligne, et les lignes
+restent liées à l'identité des documents quel que soit l'ordre du DataFrame.
+L'URL de l'article est conservée à titre indicatif (lookup_urls).
+Tous les scripts et notebooks ouvrent le magasin d'un modèle sous DEFAULT_ROOT
+(outputs/ à la racine du dépôt) : un texte encodé par une étape est réutilisé par les autres.
+
+L'écriture se fait en ajout seul ; le nombre de lignes valides est enregistré dans l'index
+après l'écriture des vecteurs, de sorte qu'une interruption ne laisse au pire que des
+octets orphelins en fin de fichier (tronqués à la réouverture).
+
+Usage :
+  store = EmbeddingStore(os.path.join(DEFAULT_ROOT, "all-mpnet-base-v2"))
+  ids = store.encode_missing(texts, lambda xs: sbert.encode(xs, convert_to_numpy=True))
+  emb = store.get(ids)          # (n, dim) float32, aligné sur texts
+  mat = store.matrix()          # np.memmap (n_rows, dim), sans copie
+"""
+
+import os, sqlite3
+import numpy as np
+from inference_cache import text_hash
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs", "embeddings")
+_BATCH = 500   # taille des requêtes IN (...)
+
+
+class EmbeddingStore:
+    """Vecteurs indexés par identifiant de contenu, stockés dans un np.memmap en ajout seul."""
+
+    def __init__(self, root, dtype="float16"):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.vec_path = os.path.join(root, "vectors.bin")
+        self.conn = sqlite3.connect(os.path.join(root, "index.sqlite"))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ids (
+                id   TEXT PRIMARY KEY,
+                row  INTEGER NOT NULL,
+                url  TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_ids_url ON ids(url);
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.conn.commit()
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        # le type et la dimension sont fixés par le premier ajout
+        self.dtype = np.dtype(meta.get("dtype", dtype))
+        self.dim = int(meta["dim"]) if "dim" in meta else None
+        self.n_rows = int(meta.get("n_rows", 0))
+        self._mmap = None
+        self._truncate_tail()
+
+    def _truncate_tail(self):
+        """Supprime les octets écrits après la dernière ligne validée (écriture interrompue)."""
+        if self.dim is None or not os.path.exists(self.vec_path):
+            return
+        expected = self.n_rows * self.dim * self.dtype.itemsize
+        if os.path.getsize(self.vec_path) > expected:
+            with open(self.vec_path, "r+b") as f:
+                f.truncate(expected)
+
+    def _set_meta(self, **kw):
+        self.conn.executemany("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+                              [(k, str(v)) for k, v in kw.items()])
+
+    def __len__(self):
+        return self.n_rows
+
+    # --------- Lecture ----------
+
+    def matrix(self):
+        """Toutes les lignes, en np.memmap lecture seule (aucune copie)."""
+        if self.n_rows == 0:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+        if self._mmap is None or self._mmap.shape[0] != self.n_rows:
+            self._mmap = np.memmap(self.vec_path, dtype=self.dtype, mode="r", shape=(self.n_rows, self.dim))
+        return self._mmap
+
+    def _lookup(self, column, keys):
+        found = {}
+        uniq = list(dict.fromkeys(keys))
+        for i in range(0, len(uniq), _BATCH):
+            part = uniq[i:i + _BATCH]
+            q = f"SELECT {column}, row FROM ids WHERE {column} IN ({','.join('?' * len(part))})"
+            found.update(self.conn.execute(q, part))
+        return np.fromiter((found.get(k, -1) for k in keys), dtype=np.int64, count=len(keys))
+
+    def rows(self, ids):
+        """Numéros de ligne alignés sur `ids` (-1 si absent)."""
+        return self._lookup("id", list(ids))
+
+    def lookup_urls(self, urls):
+        """Numéros de ligne de la dernière version encodée de chaque URL (-1 si absente)."""
+        return self._lookup("url", list(urls))
+
+    def missing(self, ids):
+        ids = list(ids)
+        return [ids[k] for k in self._new_positions(ids)]
+
+    def _new_positions(self, ids):
+        """Positions (première occurrence) des identifiants absents du magasin."""
+        out, seen = [], set()
+        for k, (i, r) in enumerate(zip(ids, self.rows(ids))):
+            if r < 0 and i not in seen:
+                seen.add(i)
+                out.append(k)
+        return out
+
+    def get(self, ids, dtype=np.float32):
+        """Vecteurs alignés sur `ids` ; KeyError si un identifiant est absent."""
+        rows = self.rows(ids)
+        if (rows < 0).any():
+            raise KeyError(f"{int((rows < 0).sum())} identifiant(s) absent(s) du magasin")
+        return np.asarray(self.matrix()[rows], dtype=dtype)
+
+    # --------- Écriture ----------
+
+    def add(self, ids, vectors, urls=None):
+        """Ajoute les vecteurs des identifiants encore inconnus ; renvoie le nombre de lignes ajoutées."""
+        ids = list(ids)
+        vectors = np.asarray(vectors)
+        urls = list(urls) if urls is not None else [None] * len(ids)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("vectors doit être une matrice (len(ids), dim)")
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            with self.conn:
+                self._set_meta(dim=self.dim, dtype=self.dtype.name)
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"dimension {vectors.shape[1]} != {self.dim} du magasin")
+
+        keep = self._new_positions(ids)
+        if not keep:
+            return 0
+        block = np.ascontiguousarray(vectors[keep], dtype=self.dtype)
+        with open(self.vec_path, "ab") as f:
+            f.write(block.tobytes())
+        start = self.n_rows
+        with self.conn:
+            self.conn.executemany("INSERT INTO ids(id, row, url) VALUES (?, ?, ?)",
+                                  [(ids[k], start + n, urls[k]) for n, k in enumerate(keep)])
+            self._set_meta(n_rows=start + len(keep))
+        self.n_rows = start + len(keep)
+        return len(keep)
+
+    def encode_missing(self, texts, encode, urls=None, batch_size=256):
+        """Encode uniquement les textes absents du magasin ; renvoie les identifiants alignés sur `texts`.
+
+        `encode(liste de textes) -> array (n, dim)` ; les lots sont ajoutés au fil de l'eau.
+        """
+        texts = [str(t) for t in texts]
+        ids = [text_hash(t) for t in texts]
+        urls = list(urls) if urls is not None else [None] * len(texts)
+        todo = self._new_positions(ids)
+        for start in range(0, len(todo), batch_size):
+            part = todo[start:start + batch_size]
+            self.add([ids[k] for k in part], encode([texts[k] for k in part]), [urls[k] for k in part])
+        return ids
+
+    def import_array(self, texts, vectors, urls=None):
+        """Reprise d'un ancien embeddings.npy aligné sur `texts` ; renvoie les identifiants."""
+        ids = [text_hash(str(t)) for t in texts]
+        self.add(ids, vectors, urls)
+        return ids
+
+    def close(self):
+        self._mmap = None
+        self.conn.close()
@@ -0,0 +1,307 @@
+"""
+Normalisation des entités : chaque forme de surface ("OMS", "l'OMS", "WHO",
+"Organisation mondiale de la Santé"...) est rattachée à un identifiant canonique.
+
+  1. clé normalisée : casefold, accents retirés, élisions / articles de tête retirés
+     ("l'OMS" -> "oms", "La Banque mondiale" -> "banque mondiale"), ponctuation -> espaces ;
+  2. alias connus (SEED_ALIASES, multilingues) et sigles : un sigle d'organisation (ORG / MISC,
+     en capitales, au moins 3 lettres) est rattaché à la forme longue d'organisation dont il
+     reprend les initiales ("OMS" <- "Organisation mondiale de la Santé"), seulement si cette
+     forme longue est la seule connue avec ces initiales (pas de "PM" <- "Pierre Martin") ;
+  3. variantes approchées : même clé sans espaces, ou Jaccard des trigrammes de caractères
+     >= `threshold` ; le bloquage (filtrage par préfixe sur un index inversé de trigrammes)
+     ne compare que les couples qui peuvent atteindre le seuil -> pas de comparaison O(n²) ;
+  4. table d'alias persistée (SQLite) : une forme déjà vue garde son identifiant d'un lancement
+     à l'autre, seules les nouvelles formes sont résolues.
+
+  outputs/entity_aliases.sqlite   entities(id, name)   aliases(surface, key, entity_id, label)
+                                  meta(key, value)
+
+`version` change quand la table est reconstruite (fichier recréé, ou ALIAS_RULES modifié :
+formes résolues avec d'anciennes règles effacées) ; les résultats calculés sur les noms
+canoniques (graphe d'entités) l'enregistrent pour savoir quand se recalculer.
+
+Usage :
+  aliases = AliasIndex()
+  ents = aliases.canonicalize_frame(pd.read_csv("forbes_entities.csv"))   # + entity_id, entity_canonical
+  entity_counts(ents).head(20)        # comptes sur les identifiants canoniques
+"""
+
+import os, re, math, sqlite3, unicodedata, uuid
+from collections import Counter, defaultdict
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs", "entity_aliases.sqlite")
+ALIAS_RULES = 2        # version des règles de résolution (à incrémenter quand elles changent)
+THRESHOLD = 0.8        # Jaccard minimal des trigrammes pour fusionner deux variantes
+MIN_FUZZY_LEN = 6      # clés plus courtes : correspondance exacte uniquement (sigles, noms courts)
+MIN_ACRONYM = 3        # sigles plus courts ("PM", "MS") : jamais rattachés à une forme longue
+ACRONYM_LABELS = ("ORG", "MISC")   # labels NER pour lesquels les sigles sont résolus
+
+SEED_ALIASES = {
+    "OMS": ["WHO", "Organisation mondiale de la Santé", "World Health Organization"],
+    "ONU": ["Nations unies", "Organisation des Nations unies", "United Nations"],
+    "FMI": ["IMF", "Fonds monétaire international", "International Monetary Fund"],
+    "Banque mondiale": ["World Bank", "Groupe de la Banque mondiale"],
+    "UNICEF": ["Fonds des Nations unies pour l'enfance"],
+    "Union africaine": ["UA", "African Union"],
+    "RDC": ["République démocratique du Congo", "DRC", "Democratic Republic of the Congo", "RD Congo"],
+    "BAD": ["Banque africaine de développement", "AfDB", "African Development Bank"],
+}
+
+_ELISION = re.compile(r"^(?:l|d|qu|j|n|s|c)['’]\s*")
+_ARTICLE = re.compile(r"^(?:le|la|les|the)\s+")
+_NON_WORD = re.compile(r"[^\w]+")
+_ACRONYM_SKIP = {"de", "du", "des", "la", "le", "les", "l", "d", "et", "pour", "of", "the", "and", "for"}
+
+
+def entity_key(surface):
+    """Clé de comparaison d'une forme de surface (vide si rien ne reste)."""
+    s = unicodedata.normalize("NFKD", str(surface).casefold())
+    s = "".join(ch for ch in s if not unicodedata.combining(ch)).strip()
+    s = _ELISION.sub("", s)
+    s = _ARTICLE.sub("", s)
+    return " ".join(_NON_WORD.sub(" ", s).split())
+
+def acronym(key):
+    """Initiales des mots significatifs d'une clé de plusieurs mots ("" sinon)."""
+    words = [w for w in key.split() if w not in _ACRONYM_SKIP]
+    return "".join(w[0] for w in words) if len(words) >= 2 else ""
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+class AliasIndex:
+    """Table d'alias persistée : forme de surface -> identifiant d'entité canonique."""
+
+    def __init__(self, db_path=DEFAULT_PATH, threshold=THRESHOLD, seeds=SEED_ALIASES, check_same_thread=True):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.threshold = threshold
+        # check_same_thread=False : index partagé entre threads (ex. tableau de bord), accès sérialisés par l'appelant
+        self.conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entities (
+                id   INTEGER PRIMARY KEY,
+                name TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS aliases (
+                surface   TEXT PRIMARY KEY,
+                key       TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                label     TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_aliases_key ON aliases(key);
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        if "label" not in [r[1] for r in self.conn.execute("PRAGMA table_info(aliases)")]:
+            self.conn.execute("ALTER TABLE aliases ADD COLUMN label TEXT")   # table d'avant les labels
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if meta.get("rules") != str(ALIAS_RULES):
+            # table vide ou construite avec d'autres règles : les formes seront résolues de nouveau
+            self.conn.execute("DELETE FROM aliases")
+            self.conn.execute("DELETE FROM entities")
+            meta = {"rules": str(ALIAS_RULES), "created": uuid.uuid4().hex}
+            self.conn.executemany("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", meta.items())
+        self.version = f"{meta['rules']}-{meta['created']}"
+        self.conn.commit()
+        self.names = dict(self.conn.execute("SELECT id, name FROM entities"))
+        self._next_id = max(self.names, default=0) + 1
+        self.surface_id = {}
+        self.key_id = {}
+        self.org_keys = set()      # clés vues avec un label ACRONYM_LABELS
+        for surface, key, eid, label in self.conn.execute("SELECT surface, key, entity_id, label FROM aliases"):
+            self.surface_id[surface] = eid
+            self.key_id.setdefault(key, eid)
+            if label in ACRONYM_LABELS:
+                self.org_keys.add(key)
+        if seeds:
+            for canonical, variants in seeds.items():
+                self.add_aliases(canonical, variants)
+
+    # --------- Alias explicites ----------
+
+    def _new_entity(self, name):
+        eid = self._next_id
+        self._next_id += 1
+        self.names[eid] = name
+        self.conn.execute("INSERT INTO entities(id, name) VALUES (?, ?)", (eid, name))
+        return eid
+
+    def _store(self, rows):
+        """rows = [(surface, key, entity_id, label)] ; met aussi à jour les index en mémoire."""
+        for surface, key, eid, label in rows:
+            self.surface_id[surface] = eid
+            self.key_id.setdefault(key, eid)
+            if label in ACRONYM_LABELS:
+                self.org_keys.add(key)
+        self.conn.executemany("INSERT OR REPLACE INTO aliases(surface, key, entity_id, label) VALUES (?, ?, ?, ?)", rows)
+
+    def add_aliases(self, canonical, variants=()):
+        """Rattache explicitement `variants` à `canonical` (créé si besoin) ; renvoie son identifiant."""
+        key = entity_key(canonical)
+        eid = self.key_id.get(key)
+        with self.conn:
+            if eid is None:
+                eid = self._new_entity(canonical)
+            todo = [(s, entity_key(s), eid, None) for s in [canonical, *variants]
+                    if self.surface_id.get(s) != eid and entity_key(s)]
+            self._store(todo)
+            for _, k, _, _ in todo:
+                self.key_id[k] = eid
+        return eid
+
+    # --------- Résolution ----------
+
+    def resolve(self, surfaces, counts=None, labels=None):
+        """Identifiant canonique de chaque forme (None pour une forme vide), dans l'ordre d'entrée.
+
+        Les formes inconnues sont regroupées (clé, sigle, trigrammes) entre elles et avec les
+        entités existantes, puis enregistrées. `counts` (forme -> fréquence) choisit le nom
+        canonique d'une nouvelle entité : la forme la plus fréquente de son groupe. `labels`
+        (label NER de chaque forme, aligné sur `surfaces`) : sans label ORG / MISC, une forme
+        n'est jamais résolue par sigle.
+        """
+        surfaces = [s if isinstance(s, str) else "" for s in surfaces]
+        new = [s for s in dict.fromkeys(surfaces) if s not in self.surface_id and entity_key(s)]
+        if new:
+            label_of = {}
+            for s, label in zip(surfaces, labels if labels is not None else ()):
+                if label in ACRONYM_LABELS or s not in label_of:
+                    label_of[s] = label
+            self._resolve_new(new, counts or Counter(surfaces), label_of)
+        return [self.surface_id.get(s) for s in surfaces]
+
+    def _resolve_new(self, new, counts, label_of):
+        keys = {s: entity_key(s) for s in new}
+        uf = _UnionFind()
+        new_keys = [k for k in dict.fromkeys(keys.values()) if k not in self.key_id]
+        is_new = set(new_keys)
+
+        # sigles : "OMS" (organisation, écrit en capitales) <-> l'unique forme longue dont les
+        # initiales donnent "oms" ; plusieurs formes longues candidates (quel que soit leur label)
+        # -> sigle ambigu, aucun rattachement (jamais deux formes longues reliées par un sigle)
+        org = self.org_keys | {keys[s] for s in new if label_of.get(s) in ACRONYM_LABELS}
+        upper_keys = {entity_key(s) for s in [*new, *self.surface_id] if s.isupper() and " " not in s}
+        upper_keys = {a for a in upper_keys & org if len(a) >= MIN_ACRONYM}
+        all_keys = list(self.key_id) + new_keys
+        long_forms = defaultdict(list)
+        for k in all_keys:
+            a = acronym(k)
+            if a in upper_keys:
+                long_forms[a].append(k)
+        for a, ks in long_forms.items():
+            k = ks[0]
+            if len(ks) == 1 and k in org and (k in is_new or a in is_new):
+                uf.union(k, a)
+
+        # même clé sans espaces ("BGFI Bank" / "BGFIBank")
+        compact = {}
+        for k in all_keys:
+            c = k.replace(" ", "")
+            if c in compact and (k in is_new or compact[c] in is_new):
+                uf.union(k, compact[c])
+            compact.setdefault(c, k)
+
+        # variantes approchées : filtrage par préfixe sur les trigrammes (ordre global par
+        # rareté) -> seuls les couples partageant un trigramme rare sont comparés, sans perte
+        # pour le seuil de Jaccard
+        long_keys = [k for k in all_keys if len(k) >= MIN_FUZZY_LEN]
+        grams = {k: trigrams(k) for k in long_keys}
+        freq = Counter(g for k in long_keys for g in grams[k])
+        postings = defaultdict(list)
+        prefix = {}
+        for k in long_keys:
+            ordered = sorted(grams[k], key=lambda g: (freq[g], g))
+            prefix[k] = ordered[:len(ordered) - math.ceil(self.threshold * len(ordered)) + 1]
+            for g in prefix[k]:
+                postings[g].append(k)
+        for k in new_keys:
+            if k not in grams:
+                continue
+            gk = grams[k]
+            for other in {o for g in prefix[k] for o in postings[g]}:
+                if other == k or uf.find(other) == uf.find(k):
+                    continue
+                go = grams[other]
+                if not self.threshold * len(gk) <= len(go) <= len(gk) / self.threshold:
+                    continue
+                if len(gk & go) / len(gk | go) >= self.threshold:
+                    uf.union(k, other)
+
+        # un identifiant par groupe : celui d'une clé existante si le groupe en contient une
+        groups = defaultdict(list)
+        for k in new_keys:
+            groups[uf.find(k)].append(k)
+        known_of_root = {}
+        for k in self.key_id:
+            if k in uf.parent:
+                known_of_root.setdefault(uf.find(k), self.key_id[k])
+        surfaces_of = defaultdict(list)
+        for s in new:
+            surfaces_of[keys[s]].append(s)
+
+        rows = []
+        with self.conn:
+            for root, ks in groups.items():
+                eid = known_of_root.get(root)
+                if eid is None:
+                    members = [s for k in ks for s in surfaces_of[k]]
+                    eid = self._new_entity(max(members, key=lambda s: counts.get(s, 0)))
+                for k in ks:
+                    self.key_id[k] = eid
+            rows = [(s, keys[s], self.key_id[keys[s]], label_of.get(s)) for s in new]
+            self._store(rows)
+
+    # --------- Tables ----------
+
+    def canonical_name(self, entity_id):
+        return self.names.get(entity_id)
+
+    def canonicalize_frame(self, ents, col="entity", label_col="label"):
+        """Copie de `ents` avec entity_id et entity_canonical (lignes sans forme exploitable retirées)."""
+        out = ents.copy()
+        surfaces = out[col].astype(str).tolist()
+        labels = out[label_col].tolist() if label_col in out else None
+        ids = self.resolve(surfaces, Counter(surfaces), labels)
+        out["entity_id"] = ids
+        out = out[out["entity_id"].notna()].copy()
+        out["entity_id"] = out["entity_id"].astype(int)
+        out["entity_canonical"] = out["entity_id"].map(self.names)
+        return out
+
+    def alias_table(self):
+        """Toutes les formes connues : surface, entity_id, entity_canonical."""
+        import pandas as pd
+        rows = [(s, eid, self.names.get(eid)) for s, eid in self.surface_id.items()]
+        return pd.DataFrame(rows, columns=["surface", "entity_id", "entity_canonical"])
+
+    def close(self):
+        self.conn.close()
+
+
+def entity_counts(ents):
+    """Nombre de mentions par entité, compté sur les identifiants canoniques (Series indexée par nom)."""
+    names = ents.drop_duplicates("entity_id").set_index("entity_id")["entity_canonical"]
+    return ents["entity_id"].value_counts().rename(index=names).rename("count")
@@ -0,0 +1,147 @@
+"""
+Extraction d'entités nommées (spaCy) en flux, routée par langue.
+
+Par rapport à `nlp(texte)` appelé ligne par ligne avec les pipelines complets :
+  - seul le composant "ner" (et le tok2vec qu'il écoute, le cas échéant) est chargé :
+    tagger, parser, lemmatizer... sont exclus ;
+  - les documents sont groupés par langue (colonne `lang`) et chaque groupe passe dans
+    un seul `nlp.pipe(batch_size, n_process)` alimenté par un générateur ;
+  - les entités sont écrites dans le CSV au fil de l'eau, par blocs de `chunk_size`
+    documents : la mémoire ne dépend pas de la taille du corpus ;
+  - avec un InferenceCache, les textes déjà analysés sont relus depuis le disque
+    et seuls les nouveaux passent dans spaCy.
+
+Dans le CSV, les lignes sont groupées par langue (puis documents en cache avant les
+nouveaux), et non triées par global_index. La colonne doc_hash (sha1 du texte analysé)
+identifie le document d'un lancement à l'autre, contrairement à global_index (position).
+
+Usage :
+  ner = EntityExtractor({"fr": "fr_core_news_sm", "en": "en_core_web_sm"}, n_process=4, cache=InferenceCache())
+  ner.write_csv("outputs/forbes_entities.csv", df.index, df["texte_clean_bert"], df["lang"])
+  ner.write_by_source(df, "outputs/analysis_results")   # {source}_entities.csv pour chaque source
+"""
+
+import os, csv
+import spacy
+from inference_cache import text_hash
+
+MODELS = {"fr": "fr_core_news_sm", "en": "en_core_web_sm"}
+ENT_LABELS = ("PER", "ORG", "GPE", "LOC", "MISC", "PERSON")
+BATCH_SIZE = 64      # documents par lot dans nlp.pipe
+CHUNK_SIZE = 1000    # documents par écriture (CSV + cache)
+
+
+def load_ner(model_name):
+    """Pipeline spaCy réduit à la reconnaissance d'entités (et au tok2vec partagé si "ner" l'écoute)."""
+    nlp = spacy.load(model_name)
+    keep = {"ner"}
+    for name in ("tok2vec", "transformer"):
+        if name in nlp.pipe_names and "ner" in getattr(nlp.get_pipe(name), "listening_components", []):
+            keep.add(name)
+    nlp.select_pipes(enable=[p for p in nlp.pipe_names if p in keep])
+    return nlp
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class EntityExtractor:
+    """NER multi-langue : un pipeline réduit par langue, chargé à la première utilisation."""
+
+    def __init__(self, models=None, default_lang="fr", fallback_lang="en", batch_size=BATCH_SIZE,
+                 n_process=1, labels=ENT_LABELS, cache=None, chunk_size=CHUNK_SIZE):
+        self.models = dict(models or MODELS)
+        self.default_lang = default_lang      # documents sans langue connue (pas de colonne lang)
+        self.fallback_lang = fallback_lang    # langues détectées sans modèle (de, unknown...)
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.labels = set(labels) if labels else None
+        self.cache = cache
+        self.chunk_size = chunk_size
+        self._nlp = {}
+
+    def route(self, lang):
+        """Langue du modèle à utiliser : préfixe "fr" / "en"... sinon `fallback_lang` (anglais, comme avant)."""
+        code = str(lang or "").lower()[:2]
+        return code if code in self.models else self.fallback_lang
+
+    def nlp(self, lang):
+        if lang not in self._nlp:
+            self._nlp[lang] = load_ner(self.models[lang])
+        return self._nlp[lang]
+
+    def _cache_key(self, lang):
+        from inference_cache import model_revision
+        nlp = self.nlp(lang)
+        return dict(model=self.models[lang], revision=model_revision(nlp), task="ner",
+                    params={"pipes": nlp.pipe_names})
+
+    # --------- Flux ----------
+
+    def stream(self, doc_ids, texts, langs=None):
+        """Itère sur (doc_id, [(entité, label), ...]) : groupe de langue après groupe de langue."""
+        doc_ids, texts = list(doc_ids), [str(t) for t in texts]
+        langs = [self.default_lang] * len(texts) if langs is None else [self.route(l) for l in langs]
+        for lang in dict.fromkeys(langs):
+            positions = [i for i, l in enumerate(langs) if l == lang]
+            yield from self._stream_lang(lang, [(doc_ids[i], texts[i]) for i in positions])
+
+    def _stream_lang(self, lang, items):
+        nlp = self.nlp(lang)
+        key = self._cache_key(lang) if self.cache is not None else None
+        missing = items
+        if key is not None:
+            # documents déjà analysés : relus depuis le cache, bloc par bloc
+            missing = []
+            for chunk in _chunks(items, self.chunk_size):
+                found = self.cache.get_many([t for _, t in chunk], **key)
+                for (doc_id, text), ents in zip(chunk, found):
+                    if ents is None:
+                        missing.append((doc_id, text))
+                    else:
+                        yield doc_id, ents
+        docs = nlp.pipe(((t, doc_id) for doc_id, t in missing), as_tuples=True,
+                        batch_size=self.batch_size, n_process=self.n_process)
+        for chunk in _chunks(docs, self.chunk_size):
+            ents = [[(e.text, e.label_) for e in doc.ents] for doc, _ in chunk]
+            if key is not None:
+                self.cache.put_many([doc.text for doc, _ in chunk], ents, **key)
+            for (_, doc_id), e in zip(chunk, ents):
+                yield doc_id, e
+
+    # --------- Écriture CSV ----------
+
+    def write_csv(self, path, doc_ids, texts, langs=None):
+        """Écrit global_index, doc_hash, entity, label au fil de l'eau ; renvoie le nombre de lignes."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        doc_ids, texts = list(doc_ids), [str(t) for t in texts]
+        hash_of = {d: text_hash(t) for d, t in zip(doc_ids, texts)}
+        n = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["global_index", "doc_hash", "entity", "label"])
+            for doc_id, ents in self.stream(doc_ids, texts, langs):
+                rows = [(int(doc_id), hash_of[doc_id], text.strip(), label) for text, label in ents
+                        if self.labels is None or label in self.labels]
+                w.writerows(rows)
+                n += len(rows)
+        return n
+
+    def write_by_source(self, df, out_dir, text_col="texte_clean_bert", lang_col="lang", source_col="source"):
+        """Un fichier {source}_entities.csv par valeur de `source_col` ; renvoie {source: chemin}."""
+        paths = {}
+        for src, sub in df.groupby(source_col, sort=False):
+            path = os.path.join(out_dir, f"{str(src).lower()}_entities.csv")
+            langs = sub[lang_col] if lang_col in sub else None
+            n = self.write_csv(path, sub.index, sub[text_col].fillna(""), langs)
+            print(f"{src}: {n} entités -> {path}")
+            paths[src] = path
+        return paths
@@ -0,0 +1,219 @@
+"""
+Réseau de co-occurrence des entités (documents x entités en matrice creuse).
+
+  - chaque entité est internée en un identifiant entier (`ids`, `names`) ;
+  - incidence binaire X (documents x entités) au format CSR ;
+  - co-occurrences C = X.T @ X en un seul produit creux (diagonale = nb de documents
+    citant l'entité), mises à jour incrémentalement : l'ajout d'un lot de documents
+    ajoute Xlot.T @ Xlot, un document déjà vu est d'abord retiré ;
+  - les lignes de X des documents retirés ou remplacés sont vidées puis supprimées
+    (`compact`) à l'enregistrement ou dès qu'elles dépassent DEAD_ROWS_MAX des lignes ;
+  - poids des arêtes : nombre de documents communs et PMI = log(c_ij * N / (c_i * c_j)),
+    filtrés par `min_count` / `min_pmi` ;
+  - voisins d'une entité : une ligne de C (quelques millisecondes) ;
+  - export networkx / GraphML pour le tableau de bord, persistance npz + json ;
+  - `version` (ex. AliasIndex.version) enregistrée avec le graphe : un graphe construit
+    avec d'autres noms d'entités n'est pas rechargé, il est reconstruit.
+
+Les documents sont identifiés par une clé stable d'un lancement à l'autre (doc_hash des
+CSV d'entités), pas par leur position dans le corpus.
+
+Usage :
+  g = EntityGraph.load("outputs/entity_graph", version=aliases.version)   # vide si absent ou périmé
+  g.add_frame(pd.read_csv("outputs/analysis_results/forbes_entities.csv"))
+  g.neighbors("OMS", k=10)                        # DataFrame entity, count, pmi
+  g.write_graphml("outputs/analysis_results/entity_graph.graphml", min_count=2)
+  g.remove_documents(set(g.doc_rows) - set(current_hashes))     # articles retirés ou modifiés
+  g.save("outputs/entity_graph")
+"""
+
+import os, json
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+MIN_COUNT = 2     # documents communs minimum pour une arête
+MIN_PMI = 0.0     # PMI minimale pour une arête (0 = co-occurrence au moins aussi fréquente qu'au hasard)
+DEAD_ROWS_MAX = 0.25   # part de lignes vidées de X au-delà de laquelle on compacte
+
+
+class EntityGraph:
+    """Co-occurrences d'entités par document, mises à jour par lots."""
+
+    def __init__(self, version=None):
+        self.version = version       # version des noms d'entités (table d'alias)
+        self.ids = {}                # entité -> id
+        self.names = []              # id -> entité
+        self.doc_rows = {}           # document -> ligne de X
+        self.X = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self.C = sparse.csr_matrix((0, 0), dtype=np.int64)
+
+    @property
+    def n_docs(self):
+        return len(self.doc_rows)
+
+    def intern(self, entity):
+        j = self.ids.get(entity)
+        if j is None:
+            j = self.ids[entity] = len(self.names)
+            self.names.append(entity)
+        return j
+
+    # --------- Mises à jour ----------
+
+    def _resize(self):
+        n = len(self.names)
+        self.X.resize((self.X.shape[0], n))
+        self.C.resize((n, n))
+
+    def add_documents(self, doc_ids, entity_lists):
+        """Ajoute (ou remplace) des documents : `entity_lists[i]` = entités citées par `doc_ids[i]`.
+
+        Un document déjà présent voit sa contribution retirée de C et son ancienne ligne de X
+        vidée ; sa nouvelle ligne est ajoutée en bas de X.
+        """
+        doc_ids = list(doc_ids)
+        cols = [sorted({self.intern(e) for e in ents if isinstance(e, str) and e}) for ents in entity_lists]
+        self._resize()
+        n = len(self.names)
+
+        self._subtract([self.doc_rows[d] for d in doc_ids if d in self.doc_rows])
+        nnz = sum(len(c) for c in cols)
+        indptr = np.concatenate([[0], np.cumsum([len(c) for c in cols])]).astype(np.int64)
+        indices = np.fromiter((j for c in cols for j in c), dtype=np.int64, count=nnz)
+        new = sparse.csr_matrix((np.ones(nnz, dtype=np.int32), indices, indptr), shape=(len(cols), n))
+        base = self.X.shape[0]
+        for i, d in enumerate(doc_ids):
+            self.doc_rows[d] = base + i
+        self.X = sparse.vstack([self.X, new], format="csr")
+        self.C = (self.C + (new.T @ new).astype(np.int64)).tocsr()
+        self.C.eliminate_zeros()
+        return self._maybe_compact()
+
+    def _subtract(self, rows):
+        if rows:
+            old = self.X[rows]
+            self.C = (self.C - (old.T @ old).astype(np.int64)).tocsr()
+            self.C.eliminate_zeros()
+            self.X = _zero_rows(self.X, rows)
+
+    def remove_documents(self, doc_ids):
+        """Retire des documents (ceux absents du graphe sont ignorés)."""
+        doc_ids = [d for d in doc_ids if d in self.doc_rows]
+        self._subtract([self.doc_rows.pop(d) for d in doc_ids])
+        return self._maybe_compact()
+
+    def compact(self):
+        """Supprime de X les lignes vidées et renumérote `doc_rows` (C est inchangée)."""
+        if self.X.shape[0] != len(self.doc_rows):
+            docs = sorted(self.doc_rows, key=self.doc_rows.get)
+            self.X = self.X[np.fromiter((self.doc_rows[d] for d in docs), dtype=np.int64, count=len(docs))]
+            self.doc_rows = {d: i for i, d in enumerate(docs)}
+        return self
+
+    def _maybe_compact(self):
+        if self.X.shape[0] - len(self.doc_rows) > DEAD_ROWS_MAX * self.X.shape[0]:
+            self.compact()
+        return self
+
+    def add_frame(self, ents, doc_col="doc_hash", entity_col="entity"):
+        """Ajoute les documents d'une table d'entités (une ligne par mention, CSV de la NER)."""
+        ents = ents.dropna(subset=[entity_col])
+        groups = ents.groupby(doc_col, sort=False)[entity_col].agg(list)
+        return self.add_documents(groups.index.tolist(), groups.tolist())
+
+    # --------- Poids ----------
+
+    def counts(self):
+        """Nombre de documents citant chaque entité (Series indexée par entité)."""
+        return pd.Series(self.C.diagonal(), index=self.names, name="count")
+
+    def _pmi(self, rows, cols, c):
+        df = self.C.diagonal().astype(np.float64)
+        return np.log(c * max(self.n_docs, 1) / np.maximum(df[rows] * df[cols], 1e-12))
+
+    def edges(self, min_count=MIN_COUNT, min_pmi=MIN_PMI):
+        """Arêtes i < j : DataFrame source, target, count, pmi."""
+        U = sparse.triu(self.C, k=1).tocoo()
+        keep = U.data >= min_count
+        r, c, v = U.row[keep], U.col[keep], U.data[keep].astype(np.float64)
+        pmi = self._pmi(r, c, v)
+        keep = pmi >= min_pmi if min_pmi is not None else np.ones(len(pmi), dtype=bool)
+        names = np.asarray(self.names, dtype=object)
+        return pd.DataFrame({"source": names[r[keep]], "target": names[c[keep]],
+                             "count": v[keep].astype(np.int64), "pmi": pmi[keep]})
+
+    def neighbors(self, entity, k=10, by="pmi", min_count=MIN_COUNT):
+        """k voisins les plus liés à `entity` (par "pmi" ou "count")."""
+        j = self.ids.get(entity)
+        if j is None:
+            return pd.DataFrame(columns=["entity", "count", "pmi"])
+        row = self.C.getrow(j)
+        cols, vals = row.indices, row.data.astype(np.float64)
+        keep = (cols != j) & (vals >= min_count)
+        cols, vals = cols[keep], vals[keep]
+        pmi = self._pmi(np.full(len(cols), j), cols, vals)
+        score = pmi if by == "pmi" else vals
+        top = np.argsort(-score, kind="stable")[:k]
+        return pd.DataFrame({"entity": [self.names[i] for i in cols[top]],
+                             "count": vals[top].astype(np.int64), "pmi": pmi[top]})
+
+    # --------- Export ----------
+
+    def to_networkx(self, min_count=MIN_COUNT, min_pmi=MIN_PMI, max_nodes=None):
+        """Graphe networkx (nœuds : count ; arêtes : count, pmi), limité aux `max_nodes` entités les plus citées."""
+        import networkx as nx
+        e = self.edges(min_count, min_pmi)
+        counts = self.counts()
+        if max_nodes is not None:
+            kept = set(counts.nlargest(max_nodes).index)
+            e = e[e["source"].isin(kept) & e["target"].isin(kept)]
+        G = nx.Graph()
+        nodes = pd.unique(e[["source", "target"]].to_numpy().ravel())
+        G.add_nodes_from((n, {"count": int(counts[n])}) for n in nodes)
+        G.add_edges_from((s, t, {"count": int(c), "pmi": float(p)})
+                         for s, t, c, p in e.itertuples(index=False))
+        return G
+
+    def write_graphml(self, path, **kw):
+        import networkx as nx
+        G = self.to_networkx(**kw)
+        nx.write_graphml(G, path)
+        return G
+
+    # --------- Persistance ----------
+
+    def save(self, root):
+        self.compact()
+        os.makedirs(root, exist_ok=True)
+        sparse.save_npz(os.path.join(root, "incidence.npz"), self.X)
+        sparse.save_npz(os.path.join(root, "cooccurrence.npz"), self.C)
+        with open(os.path.join(root, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "names": self.names,
+                       "docs": [[d, r] for d, r in self.doc_rows.items()]}, f, ensure_ascii=False, default=str)
+
+    @classmethod
+    def load(cls, root, version=None):
+        """Graphe enregistré dans `root` ; graphe vide si absent ou construit avec une autre `version`."""
+        g = cls(version)
+        meta_path = os.path.join(root, "meta.json")
+        if not os.path.exists(meta_path):
+            return g
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if version is not None and meta.get("version") != version:
+            print(f"{root} : version {meta.get('version')} != {version}, graphe reconstruit")
+            return g
+        g.names = meta["names"]
+        g.ids = {e: j for j, e in enumerate(g.names)}
+        g.doc_rows = {d: r for d, r in meta["docs"]}
+        g.X = sparse.load_npz(os.path.join(root, "incidence.npz")).tocsr()
+        g.C = sparse.load_npz(os.path.join(root, "cooccurrence.npz")).tocsr()
+        return g
+
+
+def _zero_rows(X, rows):
+    """Copie de X (CSR) dont les lignes `rows` sont vidées."""
+    mask = np.ones(X.shape[0], dtype=X.dtype)
+    mask[rows] = 0
+    return (sparse.diags(mask, dtype=X.dtype) @ X).tocsr()
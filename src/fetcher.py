@@ -0,0 +1,131 @@
+"""
+Moteur de téléchargement concurrent (pool de threads borné) avec politesse par domaine.
+
+Chaque domaine dispose de son propre budget :
+  - nombre maximal de requêtes simultanées (max_in_flight),
+  - délai minimal entre deux débuts de requête (min_gap, + un peu d'aléa).
+
+Le débit global croît donc avec le nombre de domaines, au lieu d'être plafonné
+à ~1 page/s comme avec la boucle séquentielle + time.sleep de phase1_scrape.
+
+Usage :
+  from fetcher import HostThrottle, fetch_all
+  throttle = HostThrottle(max_in_flight=2, min_gap=1.0)
+  results = fetch_all(urls, parse_fn, throttle=throttle, max_workers=16)
+"""
+
+import time, random, threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from tqdm import tqdm
+
+
+def host_of(url):
+    """Domaine (netloc) d'une URL, en minuscules."""
+    try:
+        return urlparse(url).netloc.lower()
+    except Exception:
+        return ""
+
+# --------- Politesse par domaine ----------
+
+class HostThrottle:
+    """Budget de politesse par domaine : requêtes simultanées max + délai minimal.
+
+    `limits` permet de surcharger le budget d'un domaine précis :
+      {"www.who.int": (4, 0.5)}  -> 4 requêtes en vol, 0.5 s entre deux départs
+    """
+
+    def __init__(self, max_in_flight=2, min_gap=1.0, jitter=0.4, limits=None):
+        self.max_in_flight = max_in_flight
+        self.min_gap = min_gap
+        self.jitter = jitter
+        self.limits = dict(limits or {})
+        self._lock = threading.Lock()
+        self._sems = {}
+        self._next_start = defaultdict(float)
+
+    def _budget(self, host):
+        return self.limits.get(host, (self.max_in_flight, self.min_gap))
+
+    def acquire(self, url):
+        """Bloque jusqu'à ce qu'une requête vers ce domaine soit autorisée."""
+        host = host_of(url)
+        max_in_flight, min_gap = self._budget(host)
+        with self._lock:
+            sem = self._sems.get(host)
+            if sem is None:
+                sem = self._sems[host] = threading.BoundedSemaphore(max_in_flight)
+        sem.acquire()
+        # réserve le prochain créneau de départ pour ce domaine
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start[host])
+            self._next_start[host] = start + min_gap + random.random() * self.jitter
+        wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+
+    def release(self, url):
+        self._sems[host_of(url)].release()
+
+    @contextmanager
+    def slot(self, url):
+        self.acquire(url)
+        try:
+            yield
+        finally:
+            self.release(url)
+
+# --------- Ordonnancement ----------
+
+def interleave_by_host(urls):
+    """Alterne les URLs domaine par domaine (round-robin).
+
+    Évite que tous les workers du pool attendent le même domaine pendant que
+    les autres restent inactifs.
+    """
+    queues = defaultdict(deque)
+    for u in urls:
+        queues[host_of(u)].append(u)
+    out = []
+    while queues:
+        for host in list(queues):
+            out.append(queues[host].popleft())
+            if not queues[host]:
+                del queues[host]
+    return out
+
+def fetch_all(urls, fn, throttle=None, max_workers=16, desc=None):
+    """Applique `fn(url)` à toutes les URLs en parallèle, sous contrôle du throttle.
+
+    Retourne une liste de résultats alignée sur l'ordre de `urls`
+    (None si `fn` a levé une exception).
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+    throttle = throttle or HostThrottle()
+    position = {}
+    for i, u in enumerate(urls):
+        position.setdefault(u, []).append(i)
+    results = [None] * len(urls)
+
+    def _run(u):
+        with throttle.slot(u):
+            return fn(u)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_run, u): u for u in interleave_by_host(position)}
+        for fut in tqdm(as_completed(futures), total=len(futures), desc=desc):
+            u = futures[fut]
+            try:
+                res = fut.result()
+            except Exception as e:
+                print(f"[ERREUR] {u} -> {e}")
+                res = None
+            for i in position[u]:
+                results[i] = res
+    return results
@@ -0,0 +1,113 @@
+"""
+Session HTTP partagée : pool de connexions keep-alive + GET conditionnels + cache disque.
+
+- une seule requests.Session (connexions TCP/TLS réutilisées entre les threads du fetcher),
+- chaque réponse 200 est stockée sur disque (clé = sha1 de l'URL) avec son ETag / Last-Modified,
+- au passage suivant on envoie If-None-Match / If-Modified-Since : un 304 renvoie la copie locale.
+
+Les compteurs (hits / misses / octets économisés) sont disponibles via `stats()`.
+"""
+
+import os, json, hashlib, threading, time
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CachedSession:
+    """Session HTTP poolée avec cache disque et revalidation ETag / Last-Modified."""
+
+    def __init__(self, cache_dir, headers=None, pool_size=32):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self.hits = 0            # 304 : copie locale réutilisée
+        self.misses = 0          # 200 : page téléchargée
+        self.bytes_saved = 0     # octets non retéléchargés grâce aux 304
+        self.bytes_downloaded = 0
+
+    # --------- Stockage disque ----------
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + ".json", base + ".html"
+
+    def _load(self, url):
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None, None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, encoding="utf-8") as f:
+                body = f.read()
+            return meta, body
+        except Exception:
+            return None, None
+
+    def _store(self, url, response, body):
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        # écriture atomique (plusieurs threads peuvent viser la même URL)
+        for path, content in ((body_path, body), (meta_path, json.dumps(meta))):
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp, path)
+
+    # --------- Requêtes ----------
+
+    def get_text(self, url, headers=None, timeout=30):
+        """GET conditionnel : renvoie le HTML (depuis le réseau ou le cache en cas de 304)."""
+        meta, cached = self._load(url)
+        req_headers = dict(headers or {})
+        if meta:
+            if meta.get("etag"):
+                req_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                req_headers["If-Modified-Since"] = meta["last_modified"]
+
+        r = self.session.get(url, headers=req_headers, timeout=timeout)
+        if r.status_code == 304 and cached is not None:
+            with self._lock:
+                self.hits += 1
+                self.bytes_saved += len(cached.encode("utf-8"))
+            return cached
+
+        r.raise_for_status()
+        body = r.text
+        with self._lock:
+            self.misses += 1
+            self.bytes_downloaded += len(r.content)
+        if r.headers.get("ETag") or r.headers.get("Last-Modified"):
+            self._store(url, r, body)
+        return body
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_saved": self.bytes_saved,
+                "bytes_downloaded": self.bytes_downloaded,
+            }
+
+    def print_stats(self):
+        s = self.stats()
+        total = s["hits"] + s["misses"]
+        ratio = s["hits"] / total if total else 0.0
+        print(f"Cache HTTP → {s['hits']} hits (304) / {s['misses']} misses "
+              f"({ratio:.0%} de hits), {s['bytes_saved'] / 1e6:.1f} Mo économisés, "
+              f"{s['bytes_downloaded'] / 1e6:.1f} Mo téléchargés")
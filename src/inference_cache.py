@@ -0,0 +1,173 @@
+"""
+Cache disque partagé des résultats d'inférence (sentiment, KeyBERT, résumés BART, NER spaCy).
+
+Clé = (modèle, révision du modèle, tâche, paramètres, sha1 du texte d'entrée) :
+un texte inchangé n'est jamais repassé dans le même modèle ; changer de modèle,
+de révision ou de paramètres (top_n, stride, max_length...) invalide naturellement l'entrée.
+
+  outputs/inference_cache.sqlite   results(model, revision, task, params, text_hash,
+                                           value, size, last_access)
+
+Les valeurs sont sérialisées avec pickle (tuples, dicts, listes conservés tels quels).
+None signifie « pas de résultat » (ex. document en échec) : il n'est jamais enregistré,
+et une entrée None héritée d'une version antérieure est comptée comme absente.
+Éviction par taille : au-delà de `max_bytes`, les entrées les moins récemment lues
+sont supprimées jusqu'à revenir sous ~90 % du budget.
+
+Usage :
+  cache = InferenceCache()
+  preds = cache.cached_map(engine.predict, texts, model=name, revision=model_revision(engine.model),
+                           task="sentiment")   # seuls les textes absents du cache passent dans le modèle
+"""
+
+import os, sqlite3, hashlib, json, pickle, time
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs", "inference_cache.sqlite")
+MAX_BYTES = 2 * 1024 ** 3   # 2 Go de résultats au plus
+_BATCH = 500                # taille des requêtes IN (...) (limite de variables SQLite)
+
+
+def text_hash(text):
+    """Empreinte exacte du texte d'entrée (pas de normalisation : le modèle voit ce texte-là)."""
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+def model_revision(model):
+    """Révision d'un modèle chargé : commit HF (transformers / sentence-transformers) ou version spaCy."""
+    first = getattr(model, "_first_module", None)   # SentenceTransformer -> modèle transformers sous-jacent
+    if first is not None:
+        model = getattr(first(), "auto_model", model)
+    config = getattr(model, "config", None)
+    rev = getattr(config, "_commit_hash", None)
+    if rev:
+        return rev
+    meta = getattr(model, "meta", None)
+    if isinstance(meta, dict) and meta.get("version"):
+        return f"{meta.get('lang', '')}_{meta.get('name', '')}-{meta['version']}"
+    return ""
+
+
+class InferenceCache:
+    """Résultats de modèles indexés par (modèle, révision, tâche, paramètres, hash du texte)."""
+
+    def __init__(self, db_path=DEFAULT_PATH, max_bytes=MAX_BYTES):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                model       TEXT NOT NULL,
+                revision    TEXT NOT NULL,
+                task        TEXT NOT NULL,
+                params      TEXT NOT NULL,
+                text_hash   TEXT NOT NULL,
+                value       BLOB,
+                size        INTEGER,
+                last_access REAL,
+                PRIMARY KEY (model, revision, task, params, text_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_access ON results(last_access);
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def _params(params):
+        return json.dumps(params or {}, sort_keys=True, default=str)
+
+    # --------- Lecture / écriture ----------
+
+    def get_many(self, texts, model, revision="", task="", params=None):
+        """Valeurs en cache alignées sur `texts` (None si absente)."""
+        hashes = [text_hash(t) for t in texts]
+        key = (model, revision or "", task, self._params(params))
+        found = {}
+        uniq = list(dict.fromkeys(hashes))
+        for i in range(0, len(uniq), _BATCH):
+            part = uniq[i:i + _BATCH]
+            q = ("SELECT text_hash, value FROM results WHERE model = ? AND revision = ? AND task = ? "
+                 f"AND params = ? AND text_hash IN ({','.join('?' * len(part))})")
+            for h, value in self.conn.execute(q, (*key, *part)):
+                value = pickle.loads(value)
+                if value is not None:   # None enregistré par une version antérieure : à recalculer
+                    found[h] = value
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE results SET last_access = ? WHERE model = ? AND revision = ? AND task = ? "
+                    "AND params = ? AND text_hash = ?", [(now, *key, h) for h in found])
+        out = [found.get(h) for h in hashes]
+        n_hit = sum(h in found for h in hashes)
+        self.hits += n_hit
+        self.misses += len(hashes) - n_hit
+        return out
+
+    def put_many(self, texts, values, model, revision="", task="", params=None):
+        key = (model, revision or "", task, self._params(params))
+        now = time.time()
+        rows = []
+        for t, v in zip(texts, values):
+            if v is None:   # pas de résultat (échec) : le texte sera recalculé au prochain appel
+                continue
+            blob = pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL)
+            rows.append((*key, text_hash(t), blob, len(blob), now))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results(model, revision, task, params, text_hash, value, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.evict()
+
+    def cached_map(self, fn, texts, model, revision="", task="", params=None, batch_size=None):
+        """Comme `fn(texts)` (liste -> liste alignée), mais n'appelle `fn` que sur les textes absents.
+
+        Les doublons ne sont calculés qu'une fois ; `batch_size` découpe les manquants en
+        plusieurs appels (écrits au fil de l'eau : une interruption ne perd pas tout).
+        """
+        texts = [str(t) for t in texts]
+        out = self.get_many(texts, model, revision, task, params)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, out) if v is None))
+        if missing:
+            step = batch_size or len(missing)
+            computed = {}
+            for i in range(0, len(missing), step):
+                part = missing[i:i + step]
+                values = list(fn(part))
+                self.put_many(part, values, model, revision, task, params)
+                computed.update(zip(part, values))
+            out = [computed[t] if v is None else v for t, v in zip(texts, out)]
+        return out
+
+    # --------- Taille ----------
+
+    def size(self):
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def evict(self):
+        """Supprime les entrées les moins récemment lues tant que le cache dépasse `max_bytes`."""
+        total = self.size()
+        if total <= self.max_bytes:
+            return 0
+        target = total - int(0.9 * self.max_bytes)
+        freed, victims = 0, []
+        for rowid, size in self.conn.execute("SELECT rowid, size FROM results ORDER BY last_access"):
+            victims.append((rowid,))
+            freed += size
+            if freed >= target:
+                break
+        with self.conn:
+            self.conn.executemany("DELETE FROM results WHERE rowid = ?", victims)
+        return len(victims)
+
+    def stats(self):
+        n = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {"entries": n, "bytes": self.size(), "hits": self.hits, "misses": self.misses}
+
+    def print_stats(self):
+        s = self.stats()
+        print(f"Cache d'inférence : {s['hits']} hits / {s['misses']} misses, "
+              f"{s['entries']} entrées, {s['bytes'] / 1e6:.1f} Mo")
+
+    def close(self):
+        self.conn.close()
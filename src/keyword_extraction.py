@@ -0,0 +1,135 @@
+"""
+Mots-clés par document, en un passage sur les tableaux CSR (indptr / indices / data).
+
+  - topk_csr            : k plus grandes valeurs de chaque ligne d'une matrice creuse,
+                          noyau numba (parallèle) si disponible, sinon tri lexicographique numpy ;
+  - keywords_from_tfidf : top-k termes TF-IDF de chaque document -> "terme1, terme2, ...";
+  - keybert_keywords    : mots-clés façon KeyBERT (cosinus document / mots candidats) par lots :
+                          les embeddings des documents et des candidats viennent de magasins
+                          d'embeddings (embedding_store) distincts, seuls les textes jamais vus
+                          sont encodés ; le magasin des documents ne reçoit que des documents.
+
+Mêmes termes et mêmes scores que l'ancien `np.argsort(row.data)[::-1]` ligne par ligne ;
+à égalité de score, la dernière position de la ligne passe d'abord (l'ancien tri non stable
+ne fixait pas cet ordre).
+"""
+
+import os
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba optionnel, repli numpy vectorisé
+    njit = None
+
+ROW_BLOCK = 512   # documents par bloc pour le calcul des similarités KeyBERT
+CANDIDATE_DIR = "candidates"   # sous-dossier du magasin des documents pour les mots candidats
+
+
+def _topk_numpy(indptr, indices, data, k):
+    n = len(indptr) - 1
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    pos = np.arange(len(data)) - indptr[rows]
+    # clé principale : ligne ; puis valeur décroissante ; puis position décroissante
+    order = np.lexsort((-pos, -data, rows))
+    rank = np.arange(len(data)) - indptr[rows[order]]
+    keep = order[rank < k]
+    out_i = np.full((n, k), -1, dtype=np.int64)
+    out_v = np.zeros((n, k), dtype=np.float64)
+    out_i[rows[keep], rank[rank < k]] = indices[keep]
+    out_v[rows[keep], rank[rank < k]] = data[keep]
+    return out_i, out_v
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _topk_numba(indptr, indices, data, k):
+        n = len(indptr) - 1
+        out_i = np.full((n, k), -1, dtype=np.int64)
+        out_v = np.zeros((n, k), dtype=np.float64)
+        for r in prange(n):
+            filled = 0
+            # insertion dans un top-k trié, en parcourant la ligne depuis la fin :
+            # à égalité, l'élément déjà placé (position plus tardive) reste devant
+            for p in range(indptr[r + 1] - 1, indptr[r] - 1, -1):
+                v = data[p]
+                if filled == k and v <= out_v[r, k - 1]:
+                    continue
+                j = filled if filled < k else k - 1
+                while j > 0 and out_v[r, j - 1] < v:
+                    if j < k:
+                        out_v[r, j] = out_v[r, j - 1]
+                        out_i[r, j] = out_i[r, j - 1]
+                    j -= 1
+                out_v[r, j] = v
+                out_i[r, j] = indices[p]
+                if filled < k:
+                    filled += 1
+        return out_i, out_v
+
+def topk_csr(X, k):
+    """(colonnes, valeurs) des k plus grandes valeurs de chaque ligne ; -1 / 0 au-delà du nnz de la ligne."""
+    X = sparse.csr_matrix(X)
+    indptr = X.indptr.astype(np.int64)
+    indices = X.indices.astype(np.int64)
+    data = X.data.astype(np.float64)
+    if njit is not None:
+        return _topk_numba(indptr, indices, data, k)
+    return _topk_numpy(indptr, indices, data, k)
+
+def keywords_from_tfidf(X, feature_names, k=10, sep=", "):
+    """Pour chaque document, les k termes de plus fort TF-IDF joints par `sep`."""
+    feature_names = np.asarray(feature_names, dtype=object)
+    cols, _ = topk_csr(X, k)
+    return [sep.join(feature_names[row[row >= 0]]) for row in cols]
+
+# --------- Mode KeyBERT (embeddings) ----------
+
+def _unit_rows(X):
+    X = np.asarray(X, dtype=np.float32)
+    return X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+
+def keybert_keywords(texts, store, encode, top_n=5, ngram_range=(1, 1), stop_words="english",
+                     batch_size=256, candidate_store=None):
+    """Équivalent par lots de `KeyBERT(model).extract_keywords(doc, top_n=...)` pour chaque document.
+
+    `store` : EmbeddingStore des documents (même modèle) ; les mots candidats vont dans
+    `candidate_store` (par défaut <store.root>/candidates), pour que store.matrix(), l'index
+    ANN, etc. ne voient que des documents. `encode(liste) -> array` n'est appelé que sur
+    les documents et les mots candidats absents de leur magasin.
+    Renvoie, par document, [(mot, score arrondi à 4 décimales), ...] par score décroissant.
+    """
+    texts = [str(t) for t in texts]
+    try:
+        counts = CountVectorizer(ngram_range=ngram_range, stop_words=stop_words).fit(texts)
+    except ValueError:   # vocabulaire vide
+        return [[] for _ in texts]
+    C = counts.transform(texts).tocsr()
+    candidates = counts.get_feature_names_out()
+
+    if candidate_store is None:
+        from embedding_store import EmbeddingStore
+        candidate_store = EmbeddingStore(os.path.join(store.root, CANDIDATE_DIR), dtype=store.dtype.name)
+    doc_ids = np.asarray(store.encode_missing(texts, encode, batch_size=batch_size), dtype=object)
+    cand_ids = np.asarray(candidate_store.encode_missing(candidates.tolist(), encode, batch_size=batch_size),
+                          dtype=object)
+
+    # cosinus document / candidat, calculé uniquement sur les entrées non nulles de C
+    sims = np.empty(C.nnz, dtype=np.float64)
+    for start in range(0, C.shape[0], ROW_BLOCK):
+        block = C[start:start + ROW_BLOCK]
+        lo, hi = C.indptr[start], C.indptr[min(start + ROW_BLOCK, C.shape[0])]
+        cols, inverse = np.unique(block.indices, return_inverse=True)
+        if len(cols) == 0:
+            continue
+        D = _unit_rows(store.get(doc_ids[start:start + ROW_BLOCK]))
+        W = _unit_rows(candidate_store.get(cand_ids[cols]))
+        S = D @ W.T
+        local_rows = np.repeat(np.arange(block.shape[0]), np.diff(block.indptr))
+        sims[lo:hi] = S[local_rows, inverse]
+    scores = sparse.csr_matrix((sims, C.indices, C.indptr), shape=C.shape)
+
+    cols, vals = topk_csr(scores, top_n)
+    return [[(candidates[j], round(float(v), 4)) for j, v in zip(ci, vi) if j >= 0]
+            for ci, vi in zip(cols, vals)]
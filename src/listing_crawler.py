@@ -0,0 +1,213 @@
+"""
+Crawler de pages de listing : pagination + sitemaps (sitemap.xml) + pages d'archives.
+
+Chaque source est décrite par un dictionnaire de configuration :
+  {
+    "name": "OMS",
+    "listings": [...],          # pages de listing de départ (pagination suivie)
+    "sitemaps": [...],          # sitemap.xml ou index de sitemaps
+    "archive_template": "...",  # ex: "https://site/{year}/{month:02d}/" (une page par mois)
+    "domain": "who.int",        # les liens hors domaine sont ignorés
+    "article_pattern": r"...",  # regex : URL d'article
+    "exclude_pattern": r"...",  # regex : URLs à ne jamais considérer comme articles
+    "page_pattern": r"...",     # regex : liens de pagination à suivre
+  }
+
+Les pages d'un même niveau sont téléchargées en parallèle (fetcher.fetch_all).
+Une date limite (`cutoff`) arrête la descente : on ne suit plus la pagination
+d'une page dont tous les articles sont plus anciens, et les entrées de sitemap
+dont le <lastmod> est antérieur sont ignorées. En rafraîchissement incrémental,
+`known` (ex. CrawlState.known) arrête de même la pagination dès qu'une page ne
+liste plus aucun article inconnu : les pages suivantes ont déjà été parcourues.
+
+Les URLs de départ étant de simples paramètres, le crawler peut être pointé sur
+un serveur local (ex: `python -m http.server` servant des pages HTML sauvegardées),
+comme dans tests/test_listing_crawler.py (listings, pagination et sitemaps enregistrés).
+"""
+
+import re
+from datetime import date, datetime
+from urllib.parse import urljoin, urlparse
+from dateutil import parser as dateparser
+from lxml import etree, html as lxml_html
+from fetcher import HostThrottle, fetch_all
+
+DEFAULT_PAGE_PATTERN = r"[?&]page=\d+|/page/\d+/?$"
+
+
+def to_date(value):
+    """Convertit une chaîne / datetime / date en `date` (None si illisible)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return dateparser.parse(str(value)).date()
+    except Exception:
+        return None
+
+def _in_domain(url, domain):
+    try:
+        return not domain or domain in urlparse(url).netloc.lower()
+    except Exception:
+        return False
+
+def _strip_fragment(url):
+    return url.split("#", 1)[0]
+
+# --------- Pages de listing ----------
+
+def parse_listing(page_html, page_url, cfg):
+    """Extrait (liens d'articles, liens de pagination, dates visibles) d'une page de listing."""
+    try:
+        tree = lxml_html.fromstring(page_html)
+    except Exception:
+        return [], [], []
+    article_re = re.compile(cfg["article_pattern"])
+    exclude_re = re.compile(cfg["exclude_pattern"]) if cfg.get("exclude_pattern") else None
+    page_re = re.compile(cfg.get("page_pattern") or DEFAULT_PAGE_PATTERN)
+    domain = cfg.get("domain")
+
+    articles, pages = [], []
+    for a in tree.iter("a"):
+        href = a.get("href")
+        if not href or href.startswith(("javascript:", "mailto:")):
+            continue
+        url = _strip_fragment(urljoin(page_url, href))
+        if not _in_domain(url, domain):
+            continue
+        rel = (a.get("rel") or "").lower()
+        cls = (a.get("class") or "").lower()
+        if "next" in rel or "next" in cls or page_re.search(url):
+            pages.append(url)
+        elif article_re.search(url) and not (exclude_re and exclude_re.search(url)):
+            articles.append(url)
+    for link in tree.iter("link"):
+        if (link.get("rel") or "").lower() == "next" and link.get("href"):
+            pages.append(_strip_fragment(urljoin(page_url, link.get("href"))))
+
+    dates = [to_date(t.get("datetime") or t.text_content()) for t in tree.iter("time")]
+    dates = [d for d in dates if d is not None]
+    return articles, pages, dates
+
+def crawl_listings(cfg, fetch, throttle=None, cutoff=None, max_pages=500, max_workers=16, known=None):
+    """Parcours en largeur des pages de listing (pagination + archives), niveau par niveau.
+
+    `known(url)` -> bool : articles déjà vus lors d'un passage précédent ; la pagination
+    d'une page dont tous les articles sont connus n'est pas suivie.
+    """
+    cutoff = to_date(cutoff)
+    frontier = list(cfg.get("listings", [])) + archive_urls(cfg, cutoff)
+    visited, articles = set(), []
+    while frontier and len(visited) < max_pages:
+        batch = []
+        for u in frontier:
+            if u not in visited and len(visited) < max_pages:
+                visited.add(u)
+                batch.append(u)
+        pages = fetch_all(batch, fetch, throttle=throttle, max_workers=max_workers,
+                          desc=f"{cfg['name']} - listings")
+        frontier = []
+        for u, page_html in zip(batch, pages):
+            if not page_html:
+                continue
+            links, next_pages, dates = parse_listing(page_html, u, cfg)
+            articles.extend(links)
+            # page entièrement antérieure à la date limite : on n'avance plus
+            if cutoff and dates and max(dates) < cutoff:
+                continue
+            # rien de nouveau sur cette page : la suite a été vue au passage précédent
+            if known is not None and links and all(known(l) for l in links):
+                continue
+            frontier.extend(p for p in next_pages if p not in visited)
+    return articles
+
+def archive_urls(cfg, cutoff, today=None):
+    """Pages d'archives mensuelles de la date du jour jusqu'à la date limite (incluse)."""
+    template = cfg.get("archive_template")
+    if not template or cutoff is None:
+        return []
+    today = today or date.today()
+    year, month = today.year, today.month
+    urls = []
+    while (year, month) >= (cutoff.year, cutoff.month):
+        urls.append(template.format(year=year, month=month))
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return urls
+
+# --------- Sitemaps ----------
+
+def parse_sitemap(xml_text):
+    """Renvoie (sous-sitemaps, urls) sous forme de listes de (loc, lastmod)."""
+    try:
+        root = etree.fromstring(xml_text.encode("utf-8") if isinstance(xml_text, str) else xml_text)
+    except Exception:
+        return [], []
+    children, urls = [], []
+    for node in root:
+        tag = etree.QName(node).localname if isinstance(node.tag, str) else ""
+        loc = lastmod = None
+        for sub in node:
+            if not isinstance(sub.tag, str):
+                continue
+            name = etree.QName(sub).localname
+            if name == "loc":
+                loc = (sub.text or "").strip()
+            elif name == "lastmod":
+                lastmod = to_date((sub.text or "").strip())
+        if not loc:
+            continue
+        if tag == "sitemap":
+            children.append((loc, lastmod))
+        elif tag == "url":
+            urls.append((loc, lastmod))
+    return children, urls
+
+def crawl_sitemaps(cfg, fetch, throttle=None, cutoff=None, max_sitemaps=200, max_workers=16):
+    """Parcourt les sitemaps (index récursifs) et renvoie les URLs d'articles récentes."""
+    cutoff = to_date(cutoff)
+    article_re = re.compile(cfg["article_pattern"])
+    exclude_re = re.compile(cfg["exclude_pattern"]) if cfg.get("exclude_pattern") else None
+    frontier = list(cfg.get("sitemaps", []))
+    visited, articles = set(), []
+    while frontier and len(visited) < max_sitemaps:
+        batch = [u for u in dict.fromkeys(frontier) if u not in visited][: max_sitemaps - len(visited)]
+        visited.update(batch)
+        docs = fetch_all(batch, fetch, throttle=throttle, max_workers=max_workers,
+                         desc=f"{cfg['name']} - sitemaps")
+        frontier = []
+        for xml_text in docs:
+            if not xml_text:
+                continue
+            children, urls = parse_sitemap(xml_text)
+            for loc, lastmod in children:
+                if cutoff and lastmod and lastmod < cutoff:
+                    continue
+                frontier.append(loc)
+            for loc, lastmod in urls:
+                if cutoff and lastmod and lastmod < cutoff:
+                    continue
+                if not _in_domain(loc, cfg.get("domain")):
+                    continue
+                if article_re.search(loc) and not (exclude_re and exclude_re.search(loc)):
+                    articles.append(loc)
+    return articles
+
+# --------- Point d'entrée ----------
+
+def crawl_source(cfg, fetch, throttle=None, cutoff=None, max_links=None,
+                 max_pages=500, max_workers=16, known=None):
+    """Liste les URLs d'articles d'une source : sitemaps puis listings/archives, sans doublons.
+
+    `known` : voir crawl_listings (arrêt de la pagination sur les pages déjà vues).
+    """
+    throttle = throttle or HostThrottle()
+    links = crawl_sitemaps(cfg, fetch, throttle, cutoff, max_workers=max_workers)
+    links += crawl_listings(cfg, fetch, throttle, cutoff, max_pages=max_pages, max_workers=max_workers,
+                            known=known)
+    links = list(dict.fromkeys(links))
+    return links[:max_links] if max_links else links
@@ -0,0 +1,286 @@
+"""
+Détection des quasi-doublons (communiqués repris, republications légèrement modifiées).
+
+  1. shingles : k-grammes de mots (texte en minuscules), hachés en 32 bits
+     (hash de mot mis en cache + combinaison polynomiale vectorisée) ;
+  2. signature MinHash de `num_perm` fonctions de hachage (a * h + b sur 64 bits, 32 bits de
+     poids fort ; minimum par fonction) ;
+  3. index LSH : la signature est découpée en `bands` bandes de `rows` lignes, choisies
+     d'après le seuil de Jaccard ; deux documents sont candidats s'ils partagent une bande ;
+  4. vérification : Jaccard estimée (part de minima égaux) >= `threshold`.
+
+Chaque document est traité une fois (coût linéaire en nombre de documents) ; l'index est
+persisté dans SQLite et complété au fil des ingestions :
+
+  outputs/near_duplicates.sqlite   docs(doc_id, signature, dup_of, similarity, text_hash)
+                                   buckets(band, key, doc_id)   meta(key, value)
+
+Le hash de texte ne vaut que pour une même extraction : chaque étape qui indexe son propre
+texte a sa propre base : DEFAULT_PATH pour le scraping (texte extrait), `stage_path(étape)`
+(outputs/near_duplicates_<étape>.sqlite) pour les notebooks (texte nettoyé) ; sinon chaque étape verrait les textes de l'autre
+comme « modifiés » et ré-hacherait tout le corpus à chaque passage.
+
+Un quasi-doublon est rattaché au représentant de son groupe (le premier document ingéré).
+Un identifiant déjà indexé dont le texte a changé (hash différent, ex. article ré-extrait)
+est ré-haché et ré-évalué ; les documents qui lui étaient rattachés le restent.
+
+Usage :
+  nd = NearDuplicateIndex(stage_path("analyse"), threshold=0.8)
+  res = nd.add(df["url"], df["text"])         # [(doc_id, dup_of ou None, similarité), ...]
+  df = nd.dedup_frame(df, "url", "text")      # garde un représentant par groupe
+"""
+
+import os, re, json, sqlite3, hashlib, zlib
+import numpy as np
+import pandas as pd
+from parallel_preprocess import _map_chunks
+from inference_cache import text_hash
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs")
+DEFAULT_PATH = os.path.join(DEFAULT_DIR, "near_duplicates.sqlite")
+THRESHOLD = 0.8     # Jaccard (shingles) à partir de laquelle deux articles sont des quasi-doublons
+NUM_PERM = 128      # permutations MinHash (précision de l'estimation ~ 1/sqrt(NUM_PERM))
+SHINGLE = 5         # mots par shingle
+SEED = 1
+
+
+def stage_path(stage):
+    """Base de l'index propre à une étape (les doc_id peuvent coïncider, pas les textes hachés)."""
+    return os.path.join(DEFAULT_DIR, f"near_duplicates_{stage}.sqlite")
+
+
+_MASK32 = np.uint64(0xFFFFFFFF)
+_TOKEN = re.compile(r"\w+")
+
+
+def lsh_params(threshold, num_perm):
+    """(bands, rows) avec bands * rows = num_perm, dont le seuil (1/bands)^(1/rows) est le plus proche."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        err = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best is None or err < best[0]:
+            best = (err, bands, rows)
+    return best[1], best[2]
+
+
+class _WordHashes(dict):
+    """Hash crc32 (non nul) des mots, calculé à la première rencontre."""
+
+    def __missing__(self, word):
+        h = self[word] = zlib.crc32(word.encode("utf-8")) | 1
+        return h
+
+
+class MinHasher:
+    """Signatures MinHash de textes (shingles de `shingle` mots)."""
+
+    def __init__(self, num_perm=NUM_PERM, shingle=SHINGLE, seed=SEED):
+        self.num_perm, self.shingle = num_perm, shingle
+        rng = np.random.default_rng(seed)
+        # hachage multiplicatif (a impair, débordement 64 bits, 32 bits de poids fort) : pas de modulo
+        self.a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self._word_hash = _WordHashes()
+
+    def shingles(self, text):
+        """Hash 32 bits des shingles distincts d'un texte."""
+        toks = _TOKEN.findall(str(text).lower())
+        h = np.fromiter(map(self._word_hash.__getitem__, toks), dtype=np.uint64, count=len(toks))
+        k = min(self.shingle, len(h))
+        if k == 0:
+            return h
+        n = len(h) - k + 1
+        acc = np.zeros(n, dtype=np.uint64)
+        for j in range(k):   # combinaison polynomiale (débordement 64 bits voulu)
+            acc = acc * np.uint64(1_000_003) + h[j:j + n]
+        return np.unique(acc & _MASK32)
+
+    def signature(self, text):
+        s = self.shingles(text)
+        if len(s) == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        sig = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, len(s), 2048):   # bloc (num_perm x 2048) pour borner la mémoire
+            block = s[start:start + 2048]
+            np.minimum(sig, (self.a[:, None] * block[None, :] + self.b[:, None]).min(axis=1), out=sig)
+        return (sig >> np.uint64(32)).astype(np.uint32)
+
+    def __call__(self, texts):
+        """Signatures d'un bloc de textes (tâche picklable pour _map_chunks)."""
+        return [self.signature(t) for t in texts]
+
+
+class NearDuplicateIndex:
+    """Index MinHash-LSH persistant : documents ajoutés par lots, quasi-doublons signalés à l'ajout."""
+
+    def __init__(self, db_path=DEFAULT_PATH, threshold=THRESHOLD, num_perm=NUM_PERM, shingle=SHINGLE, seed=SEED):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle, seed)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id     TEXT PRIMARY KEY,
+                signature  BLOB NOT NULL,
+                dup_of     TEXT,
+                similarity REAL,
+                text_hash  TEXT
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                band   INTEGER NOT NULL,
+                key    INTEGER NOT NULL,
+                doc_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_buckets ON buckets(band, key);
+            CREATE INDEX IF NOT EXISTS idx_buckets_doc ON buckets(doc_id);
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        if "text_hash" not in [r[1] for r in self.conn.execute("PRAGMA table_info(docs)")]:
+            self.conn.execute("ALTER TABLE docs ADD COLUMN text_hash TEXT")   # index d'avant les hash
+        self.conn.commit()
+        params = {"num_perm": num_perm, "shingle": shingle, "seed": seed}
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'params'").fetchone()
+        if row and json.loads(row[0]) != params:
+            raise ValueError(f"{db_path} construit avec {row[0]} : utiliser les mêmes paramètres ou un autre fichier")
+
+        self.status = {}      # doc_id -> (dup_of, similarité)
+        self.sigs = {}        # doc_id -> signature
+        self.hashes = {}      # doc_id -> hash du texte indexé (None : index d'avant les hash)
+        for doc_id, blob, dup_of, sim, h in self.conn.execute(
+                "SELECT doc_id, signature, dup_of, similarity, text_hash FROM docs"):
+            self.sigs[doc_id] = np.frombuffer(blob, dtype=np.uint32)
+            self.status[doc_id] = (dup_of, sim)
+            self.hashes[doc_id] = h
+        layout = self.conn.execute("SELECT value FROM meta WHERE key = 'bands'").fetchone()
+        if layout is None or json.loads(layout[0]) != [self.bands, self.rows]:
+            self._rebuild_buckets()   # seuil modifié : nouvelles bandes à partir des signatures
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+                                  [("params", json.dumps(params)), ("bands", json.dumps([self.bands, self.rows]))])
+        self.buckets = {}
+        for band, key, doc_id in self.conn.execute("SELECT band, key, doc_id FROM buckets"):
+            self.buckets.setdefault((band, key), []).append(doc_id)
+
+    def __len__(self):
+        return len(self.sigs)
+
+    # --------- LSH ----------
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [int.from_bytes(hashlib.blake2b(sig[i * r:(i + 1) * r].tobytes(), digest_size=8).digest(),
+                               "little", signed=True) for i in range(self.bands)]
+
+    def _rebuild_buckets(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM buckets")
+            self.conn.executemany("INSERT INTO buckets(band, key, doc_id) VALUES (?, ?, ?)",
+                                  [(b, k, d) for d, sig in self.sigs.items() if self.status[d][1] != 1.0
+                                   for b, k in enumerate(self._band_keys(sig))])
+
+    def _best_match(self, sig, keys):
+        """(doc_id, Jaccard estimée) du candidat LSH le plus proche, (None, 0.0) sans candidat."""
+        found = list(dict.fromkeys(d for b, k in enumerate(keys) for d in self.buckets.get((b, k), ())))
+        if not found:
+            return None, 0.0
+        sims = (np.vstack([self.sigs[d] for d in found]) == sig).mean(axis=1)
+        i = int(sims.argmax())
+        return found[i], float(sims[i])
+
+    def query(self, text):
+        """(doc_id, similarité) du document indexé le plus proche au-dessus du seuil, sinon (None, 0.0)."""
+        sig = self.hasher.signature(text)
+        best, sim = self._best_match(sig, self._band_keys(sig))
+        return (best, sim) if sim >= self.threshold else (None, 0.0)
+
+    # --------- Ajout ----------
+
+    def _unindex(self, doc_id):
+        """Retire des seaux en mémoire un document dont le texte a changé."""
+        for b, k in enumerate(self._band_keys(self.sigs[doc_id])):
+            members = self.buckets.get((b, k), [])
+            if doc_id in members:
+                members.remove(doc_id)
+
+    def add(self, doc_ids, texts, n_jobs=1):
+        """Indexe les documents nouveaux ou modifiés ; renvoie (doc_id, dup_of, similarité) pour chacun.
+
+        dup_of = représentant du groupe (None si le document est lui-même représentant).
+        Un identifiant déjà indexé avec le même texte n'est pas recalculé : son statut enregistré
+        est renvoyé ; si son texte a changé, il est ré-haché et ré-évalué.
+        Les signatures sont calculées en parallèle si `n_jobs` != 1.
+        """
+        doc_ids = [str(d) for d in doc_ids]
+        texts = list(texts)
+        hashes = [text_hash(t) for t in texts]
+        first = {}
+        for i, d in enumerate(doc_ids):
+            if d not in self.status or self.hashes[d] not in (None, hashes[i]):
+                first.setdefault(d, i)
+            elif self.hashes[d] is None:
+                self.hashes[d] = hashes[i]   # index d'avant les hash : le texte courant fait foi
+                self.conn.execute("UPDATE docs SET text_hash = ? WHERE doc_id = ?", (hashes[i], d))
+        todo = list(first.values())
+        sigs = dict(zip(todo, _map_chunks(self.hasher, [texts[i] for i in todo], n_jobs, None)))
+
+        out, doc_rows, bucket_rows, changed = [], [], [], []
+        for i, doc_id in enumerate(doc_ids):
+            if first.get(doc_id) != i:
+                out.append((doc_id, *self.status[doc_id]))
+                continue
+            if doc_id in self.status:
+                self._unindex(doc_id)
+                changed.append((doc_id,))
+            sig = sigs[i]
+            keys = self._band_keys(sig)
+            best, sim = self._best_match(sig, keys)
+            dup_of = None
+            if best is not None and sim >= self.threshold:
+                dup_of = self.status[best][0] or best
+            if dup_of is None or dup_of == doc_id:   # représentant modifié, proche de ses variantes
+                dup_of, sim = None, None
+            self.sigs[doc_id] = sig
+            self.status[doc_id] = (dup_of, sim)
+            self.hashes[doc_id] = hashes[i]
+            # les quasi-doublons sont indexés aussi (une variante suivante peut s'en rapprocher),
+            # sauf les copies exactes : elles n'apportent rien et gonfleraient les seaux
+            if sim != 1.0:
+                for b, k in enumerate(keys):
+                    self.buckets.setdefault((b, k), []).append(doc_id)
+                    bucket_rows.append((b, k, doc_id))
+            doc_rows.append((doc_id, sig.tobytes(), dup_of, sim, hashes[i]))
+            out.append((doc_id, dup_of, sim))
+        with self.conn:
+            self.conn.executemany("DELETE FROM buckets WHERE doc_id = ?", changed)
+            self.conn.executemany("INSERT OR REPLACE INTO docs(doc_id, signature, dup_of, similarity, text_hash) "
+                                  "VALUES (?, ?, ?, ?, ?)", doc_rows)
+            self.conn.executemany("INSERT INTO buckets(band, key, doc_id) VALUES (?, ?, ?)", bucket_rows)
+        return out
+
+    def dedup_frame(self, df, id_col, text_col, drop=True, n_jobs=1):
+        """Ajoute dup_of / dup_similarity à `df` ; avec `drop`, ne garde qu'un article par groupe."""
+        ids = df[id_col] if id_col is not None else df.index.to_series()
+        res = self.add(ids.astype(str).tolist(), df[text_col].fillna("").astype(str).tolist(), n_jobs)
+        out = df.copy()
+        out["dup_of"] = [r[1] for r in res]
+        out["dup_similarity"] = [r[2] for r in res]
+        if drop:
+            # un article par groupe : le représentant, ou la première variante s'il est absent de `df`
+            group = np.asarray([r[1] or r[0] for r in res], dtype=object)
+            is_rep = group == np.asarray([r[0] for r in res], dtype=object)
+            order = np.argsort(~is_rep, kind="stable")       # représentants d'abord
+            keep = np.zeros(len(out), dtype=bool)
+            keep[order] = ~pd.Series(group[order]).duplicated().to_numpy()
+            out = out[keep].drop(columns=["dup_of", "dup_similarity"])
+        return out
+
+    def close(self):
+        self.conn.close()
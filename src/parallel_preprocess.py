@@ -0,0 +1,137 @@
+"""
+Prétraitement parallèle multi-cœurs (phase 2 et notebook d'analyse).
+
+- normalize_parallel      : TextNormalizer (stemming) par blocs dans un pool de processus ;
+- clean_html_many         : clean_html_only par blocs dans un pool de processus ;
+- preprocess_for_tfidf_many : lemmatisation spaCy en flux, par langue, via
+                              nlp.pipe(n_process=..., batch_size=...).
+
+Les sorties sont identiques au chemin série (`.apply` ligne par ligne) : mêmes fonctions,
+mêmes modèles, seul l'ordonnancement change. Les résultats restent alignés sur l'entrée.
+"""
+
+import os, re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from bs4 import BeautifulSoup
+from text_normalizer import get_normalizer
+
+MIN_PARALLEL = 200   # en dessous, le coût de lancement des processus n'est pas rentable
+
+
+def _chunks(items, n):
+    return [items[i:i + n] for i in range(0, len(items), n)]
+
+def _chunk_size(n_items, n_jobs):
+    # ~4 blocs par worker : équilibre la charge sans multiplier les allers-retours
+    return max(1, -(-n_items // (4 * n_jobs)))
+
+def _map_chunks(fn, items, n_jobs, chunk_size):
+    """Applique `fn(bloc) -> liste` sur des blocs en parallèle, résultat à plat et aligné."""
+    items = list(items)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(items) < MIN_PARALLEL:
+        return fn(items)
+    chunk_size = chunk_size or _chunk_size(len(items), n_jobs)
+    out = []
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        for part in pool.map(fn, _chunks(items, chunk_size)):
+            out.extend(part)
+    return out
+
+# --------- Normalisation (stemming) ----------
+
+class _NormalizeChunk:
+    """Tâche picklable : normalise un bloc avec le normaliseur du processus."""
+
+    def __init__(self, lang, min_tok):
+        self.lang, self.min_tok = lang, min_tok
+
+    def __call__(self, texts):
+        return get_normalizer(self.lang, self.min_tok).normalize_many(texts)
+
+def normalize_parallel(texts, lang="french", min_tok=2, n_jobs=None, chunk_size=None):
+    """Équivalent parallèle de `[normalize_text(t) for t in texts]`."""
+    return _map_chunks(_NormalizeChunk(lang, min_tok), texts, n_jobs, chunk_size)
+
+# --------- Nettoyage HTML (notebook) ----------
+
+def clean_html_only(text):
+    """Nettoyage léger : retire script/style/URLs, conserve phrases intactes."""
+    soup = BeautifulSoup(str(text), "html.parser")
+    for s in soup(["script","style"]):
+        s.decompose()
+    out = soup.get_text(separator=" ")
+    out = re.sub(r"https?://\S+|www\.\S+|\S+@\S+", " ", out)
+    out = out.replace("’", "'").replace("‘","'")
+    out = re.sub(r"\s+", " ", out).strip()
+    return out
+
+def _clean_chunk(texts):
+    return [clean_html_only(t) for t in texts]
+
+def clean_html_many(texts, n_jobs=None, chunk_size=None):
+    """Équivalent parallèle de `texts.apply(clean_html_only)`."""
+    return _map_chunks(_clean_chunk, texts, n_jobs, chunk_size)
+
+# --------- Lemmatisation spaCy (TF-IDF / LDA) ----------
+
+SPACY_MODELS = {"fr": "fr_core_news_sm", "en": "en_core_web_sm"}
+
+@lru_cache(maxsize=None)
+def load_nlp(lang):
+    """Modèle spaCy sans parser ni NER (seuls tagger/lemmatizer servent ici)."""
+    import spacy
+    return spacy.load(SPACY_MODELS[lang], disable=["parser","ner"])
+
+def _lang_key(lang_hint):
+    return "fr" if str(lang_hint).startswith("fr") else "en"
+
+def _prepare_for_nlp(cleaned):
+    text = cleaned.lower()
+    # keep letters & accents & apostrophes and spaces
+    return re.sub(r"[^a-z0-9àâäçéèêëîïôöùûüÿœæ'\s-]", " ", text)
+
+def _lemmas(doc, min_tok):
+    toks = []
+    for t in doc:
+        if t.is_stop or t.is_punct or t.is_space or t.like_num:
+            continue
+        lemma = t.lemma_.lower().strip()
+        if len(lemma) < min_tok:
+            continue
+        toks.append(lemma)
+    return " ".join(toks)
+
+def preprocess_for_tfidf(text, lang_hint='fr', min_tok=2):
+    """Nettoyage plus agressif pour TF-IDF / LDA : lowercase, remove stopwords, lemmatisation."""
+    if not isinstance(text, str):
+        text = str(text or "")
+    doc = load_nlp(_lang_key(lang_hint))(_prepare_for_nlp(clean_html_only(text)))
+    return _lemmas(doc, min_tok)
+
+def preprocess_for_tfidf_many(texts, langs, min_tok=2, n_process=None, batch_size=64,
+                              cleaned=None):
+    """Équivalent en flux de `preprocess_for_tfidf` ligne par ligne.
+
+    Les documents sont regroupés par langue puis envoyés à `nlp.pipe(n_process, batch_size)`.
+    `cleaned` (optionnel) : résultats déjà calculés de clean_html_only sur les mêmes textes,
+    pour éviter un second passage HTML.
+    """
+    texts = [t if isinstance(t, str) else str(t or "") for t in texts]
+    langs = list(langs)
+    n_process = n_process or os.cpu_count() or 1
+    if cleaned is None:
+        cleaned = clean_html_many(texts, n_jobs=n_process)
+    prepared = [_prepare_for_nlp(c) for c in cleaned]
+
+    out = [""] * len(texts)
+    groups = {}
+    for i, lang in enumerate(langs):
+        groups.setdefault(_lang_key(lang), []).append(i)
+    for key, idx in groups.items():
+        n_proc = n_process if len(idx) >= MIN_PARALLEL else 1
+        docs = load_nlp(key).pipe((prepared[i] for i in idx), n_process=n_proc, batch_size=batch_size)
+        for i, doc in zip(idx, docs):
+            out[i] = _lemmas(doc, min_tok)
+    return out
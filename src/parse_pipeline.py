@@ -0,0 +1,121 @@
+"""
+Pipeline en deux étages : téléchargement (threads) -> archive disque -> parsing (processus).
+
+  1. les workers de fetch (fetcher.fetch_all) ajoutent le HTML brut à l'archive
+     (warc_archive.WarcArchive) et ne passent qu'une petite clé dans une file bornée ;
+  2. un ProcessPoolExecutor de parseurs relit le HTML depuis le disque et applique
+     article_parser.parse_article.
+
+La file bornée + le nombre limité de tâches de parsing en vol assurent la contre-pression :
+la mémoire reste plate quelle que soit la taille du crawl. Si l'étage parsing échoue,
+un événement d'arrêt libère les fetchers en attente de place dans la file et leur fait
+sauter les URLs restantes (pas de thread bloqué indéfiniment). L'archive permet de
+re-parser tout le corpus avec de nouvelles règles sans rien retélécharger (reparse_store).
+"""
+
+import os, threading, queue
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from tqdm import tqdm
+from fetcher import fetch_all
+from article_parser import parse_article
+from warc_archive import read_record
+
+_DONE = object()
+
+
+# --------- Étage parsing (processus) ----------
+
+def _parse_stored(root, key, url, source):
+    """Tâche exécutée dans un processus parseur : relit la page archivée et l'extrait."""
+    return parse_article(read_record(root, key)[1], url, source)
+
+def _parse_stream(items, root, n_parsers, max_pending, desc, total=None):
+    """Consomme (url, source, key) et parse en parallèle, avec au plus `max_pending` tâches en vol."""
+    results = {}
+    pending = {}
+    with ProcessPoolExecutor(max_workers=n_parsers) as pool, tqdm(total=total, desc=desc) as bar:
+        def _drain(block):
+            done, _ = wait(pending, return_when=FIRST_COMPLETED) if block else (
+                [f for f in pending if f.done()], None)
+            for fut in done:
+                url = pending.pop(fut)
+                try:
+                    results[url] = fut.result()
+                except Exception as e:
+                    print(f"[ERREUR parsing] {url} -> {e}")
+                    results[url] = None
+                bar.update(1)
+
+        for url, source, key in items:
+            while len(pending) >= max_pending:
+                _drain(block=True)
+            pending[pool.submit(_parse_stored, root, key, url, source)] = url
+            _drain(block=False)
+        while pending:
+            _drain(block=True)
+    return results
+
+# --------- Orchestration ----------
+
+def fetch_and_parse(jobs, fetch, store, throttle=None, max_workers=16,
+                    n_parsers=None, queue_size=256, max_pending=None):
+    """Télécharge et parse `jobs` = [(url, source), ...] en deux étages découplés.
+
+    Renvoie la liste des enregistrements (ou None) alignée sur `jobs`.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    n_parsers = n_parsers or os.cpu_count() or 1
+    max_pending = max_pending or 4 * n_parsers
+    source_of = dict(jobs)
+    handoff = queue.Queue(maxsize=queue_size)   # bornée : bloque les fetchers si le parsing traîne
+    stop = threading.Event()                     # parsing interrompu : plus personne ne lit la file
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                handoff.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _fetch_one(url):
+        if stop.is_set():
+            return False
+        html = fetch(url)
+        if html:
+            return _put((url, source_of[url], store.put(url, source_of[url], html)))
+        return False
+
+    def _fetch_stage():
+        try:
+            fetch_all(list(source_of), _fetch_one, throttle=throttle,
+                      max_workers=max_workers, desc="Téléchargement")
+        finally:
+            _put(_DONE)
+
+    def _queued():
+        while True:
+            item = handoff.get()
+            if item is _DONE:
+                return
+            yield item
+
+    fetcher_thread = threading.Thread(target=_fetch_stage, daemon=True)
+    fetcher_thread.start()
+    try:
+        results = _parse_stream(_queued(), store.root, n_parsers, max_pending, desc="Parsing")
+    finally:
+        stop.set()   # sans effet si tout a été consommé ; sinon débloque les fetchers
+    fetcher_thread.join()
+    return [results.get(u) for u, _ in jobs]
+
+def reparse_store(store, sources=None, n_parsers=None, max_pending=None):
+    """Re-parse les dernières captures de l'archive (nouvelles règles d'extraction, aucun téléchargement)."""
+    entries = [e for e in store.entries() if sources is None or e[1] in sources]
+    n_parsers = n_parsers or os.cpu_count() or 1
+    results = _parse_stream(entries, store.root, n_parsers, max_pending or 4 * n_parsers,
+                            desc="Re-parsing", total=len(entries))
+    return [results[u] for u, _, _ in entries if results.get(u)]
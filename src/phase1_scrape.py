@@ -3,38 +3,102 @@ Phase 1 — Scraping OMS & Forbes Afrique
 Objectif : collecter des articles récents sur la santé (OMS) et l'innovation (Forbes Afrique).
 
 Sortie principale :
-  outputs/raw_articles_oms_forbes.csv  (colonnes: source,title,date,url,text)
+  outputs/raw_articles_oms_forbes.csv  (colonnes: source,url,title,date,text)
+  -> les nouveaux articles sont ajoutés à la fin du fichier (scraping incrémental)
+
+État de crawl :
+  outputs/crawl_state.sqlite  (frontière + URLs vues + hash de contenu, cf. crawl_state.py)
+  outputs/near_duplicates.sqlite  (signatures MinHash / LSH des articles, cf. near_duplicates.py)
+
+Pages brutes :
+  outputs/warc/  (toutes les réponses, segments compressés + index, cf. warc_archive.py)
 
 Usage :
   pip install -r requirements.txt
   python phase1_scrape.py
+  python phase1_scrape.py --reparse   # ré-extrait le corpus depuis l'archive, sans réseau
 """
 
-import os, re, time, random
+import os, sys, time, random
 from urllib.parse import urljoin, urlparse
-from dateutil import parser as dateparser
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-from tqdm import tqdm
+from fetcher import HostThrottle
+from http_cache import CachedSession
+from crawl_state import CrawlState, content_hash
+from listing_crawler import crawl_source
+from article_parser import parse_article, clean_text
+from parse_pipeline import fetch_and_parse, reparse_store
+from warc_archive import WarcArchive
+from near_duplicates import NearDuplicateIndex
 
 # --------- Config de base ----------
 HEADERS = {"User-Agent": "TextMiningStudentProject/1.0 (+https://example.org)"}
-MAX_ARTICLES_PER_SOURCE = 20          # <-- augmente/diminue si nécessaire
+MAX_ARTICLES_PER_SOURCE = 2000        # <-- augmente/diminue si nécessaire
+DATE_CUTOFF = "2024-01-01"            # on ne remonte pas les listings/sitemaps avant cette date
+MAX_LISTING_PAGES = 300               # pages de listing/archives max par source
+
+# Politesse par domaine (téléchargement concurrent, cf. fetcher.py)
+MAX_WORKERS = 16                      # threads de téléchargement au total
+MAX_IN_FLIGHT_PER_HOST = 2            # requêtes simultanées max par domaine
+MIN_GAP_PER_HOST = 0.8                # délai minimal (s) entre deux requêtes sur un domaine
+HOST_LIMITS = {}                      # surcharges par domaine, ex: {"www.who.int": (4, 0.5)}
+N_PARSERS = None                      # processus de parsing (None = nombre de cœurs)
+
 OUTPUT_DIR = "outputs"
 OUTPUT_CSV = os.path.join(OUTPUT_DIR, "raw_articles_oms_forbes.csv")
+OUTPUT_COLUMNS = ["source", "url", "title", "date", "text"]
+HTTP_CACHE_DIR = os.path.join(OUTPUT_DIR, "http_cache")   # cache disque des pages (ETag / Last-Modified)
+CRAWL_DB = os.path.join(OUTPUT_DIR, "crawl_state.sqlite") # frontière + URLs déjà vues
+WARC_DIR = os.path.join(OUTPUT_DIR, "warc")               # archive des réponses brutes (replay)
+NEAR_DUP_DB = os.path.join(OUTPUT_DIR, "near_duplicates.sqlite")  # index des quasi-doublons
+NEAR_DUP_THRESHOLD = 0.8              # Jaccard (shingles de 5 mots) au-delà de laquelle deux articles sont fusionnés
+NEAR_DUP_DROP = True                  # False : quasi-doublons seulement enregistrés dans l'index, pas retirés
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# session partagée : connexions keep-alive réutilisées + GET conditionnels
+SESSION = CachedSession(HTTP_CACHE_DIR, headers=HEADERS, pool_size=32)
+# archive en ajout seul de toutes les pages téléchargées (listings, sitemaps, articles)
+ARCHIVE = WarcArchive(WARC_DIR)
+# budget de politesse partagé par les listings et les articles
+THROTTLE = HostThrottle(MAX_IN_FLIGHT_PER_HOST, MIN_GAP_PER_HOST, limits=HOST_LIMITS)
+
+# --------- Sources : listings, sitemaps, archives (cf. listing_crawler.py) ----------
+
+OMS_SOURCE = {
+    "name": "OMS",
+    "listings": ["https://www.who.int/fr/news"],
+    "sitemaps": ["https://www.who.int/sitemap.xml"],
+    "domain": "who.int",
+    # heuristique (comme avant) : liens contenant '/fr/' et '/news' ; les pages de rubrique
+    # (/fr/news, /fr/news-room, /fr/news-room/fact-sheets...) ne sont pas des articles
+    "article_pattern": r"^(?=.*/fr/)(?=.*/news)",
+    "exclude_pattern": r"/news(-room)?(/[^/?#]+)?/?(\?.*)?$",
+    "page_pattern": r"/fr/news.*[?&]page=\d+",
+}
+
+FORBES_SOURCE = {
+    "name": "Forbes",
+    "listings": ["https://www.forbesafrique.com/"],
+    "sitemaps": ["https://www.forbesafrique.com/sitemap.xml"],
+    "archive_template": "https://www.forbesafrique.com/{year}/{month:02d}/",
+    "domain": "forbesafrique.com",
+    # Heuristiques d'articles : année/mois dans l'URL, 'article' dans le slug...
+    "article_pattern": r"/\d{4}/\d{2}/|(?i:article)|/202",
+    "exclude_pattern": r"/\d{4}/\d{2}/?$|/page/\d+/?$|/(category|tag|author)/",
+}
+
 # --------- Utilitaires HTTP ----------
 
 def get_html(url, headers=HEADERS, timeout=30, retries=2, backoff=1.3):
-    """Télécharge le HTML avec quelques tentatives et un backoff exponentiel simple."""
+    """Télécharge le HTML avec quelques tentatives et un backoff exponentiel simple.
+
+    Passe par la session partagée : une page inchangée depuis le dernier passage
+    (réponse 304) est relue depuis le cache disque.
+    """
     for attempt in range(retries + 1):
         try:
-            r = requests.get(url, headers=headers, timeout=timeout)
-            r.raise_for_status()
-            return r.text
+            return SESSION.get_text(url, headers=headers, timeout=timeout)
         except Exception as e:
             if attempt < retries:
                 # on patiente un peu avant de réessayer (respect du site)
@@ -43,6 +107,13 @@ def get_html(url, headers=HEADERS, timeout=30, retries=2, backoff=1.3):
                 print(f"[ERREUR] {url} -> {e}")
                 return None
 
+def get_listing_html(url):
+    """get_html + archivage de la page (listings et sitemaps), si elle a changé depuis la dernière capture."""
+    html = get_html(url)
+    if html:
+        ARCHIVE.put(url, "listing", html, skip_unchanged=True)
+    return html
+
 def absolutize(base_url, href):
     """Transforme un lien relatif en lien absolu."""
     return urljoin(base_url, href) if href else None
@@ -54,144 +125,111 @@ def is_same_domain(url, base_domain):
     except Exception:
         return False
 
-def clean_text(s: str) -> str:
-    """Nettoyage léger : trim et espaces multiples."""
-    return re.sub(r"\s+", " ", (s or "")).strip()
-
 # --------- OMS : liste + parsing ----------
 
-def list_oms_articles(max_links=MAX_ARTICLES_PER_SOURCE):
-    """Récupère des liens plausibles d'articles OMS (FR) depuis la page News."""
-    base = "https://www.who.int"
-    listing = "https://www.who.int/fr/news"
-    html = get_html(listing)
-    if not html:
-        return []
-    soup = BeautifulSoup(html, "lxml")
-    links = []
-    for a in soup.find_all("a", href=True):
-        href = a.get("href")
-        # heuristique: liens FR + 'news'
-        if href and ("/fr/" in href) and ("/news" in href):
-            url_abs = absolutize(base, href)
-            if url_abs and url_abs not in links:
-                links.append(url_abs)
+def list_oms_articles(max_links=MAX_ARTICLES_PER_SOURCE, state=None, cutoff=DATE_CUTOFF):
+    """Récupère des liens plausibles d'articles OMS (FR) : pages News paginées + sitemap.
+
+    Si `state` (CrawlState) est fourni, seuls les liens jamais vus sont renvoyés
+    (et ajoutés à la frontière), et la pagination s'arrête à la première page
+    sans article nouveau.
+    """
+    links = crawl_source(OMS_SOURCE, get_listing_html, throttle=THROTTLE, cutoff=cutoff,
+                         max_pages=MAX_LISTING_PAGES, max_workers=MAX_WORKERS,
+                         known=state.known if state is not None else None)
+    if state is not None:
+        links = state.enqueue(links, "OMS")
     return links[:max_links]
 
 def parse_oms_article(url):
-    """Extrait (title, date, text) d'un article OMS."""
+    """Extrait (title, date, text) d'un article OMS (règles "OMS" de article_parser)."""
     html = get_html(url)
     if not html:
         return None
-    soup = BeautifulSoup(html, "lxml")
-
-    # titre
-    title_tag = soup.find(["h1", "title"])
-    title = clean_text(title_tag.get_text(" ", strip=True)) if title_tag else ""
-
-    # date (time[datetime] puis meta article:published_time)
-    date_iso = None
-    t = soup.find("time")
-    if t and t.get("datetime"):
-        date_iso = t.get("datetime")
-    if not date_iso:
-        meta = soup.find("meta", {"property": "article:published_time"})
-        if meta and meta.get("content"):
-            date_iso = meta.get("content")
-    try:
-        date_str = dateparser.parse(date_iso).isoformat() if date_iso else None
-    except Exception:
-        date_str = None
-
-    # texte (concat des <p> non trop courts)
-    paragraphs = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
-    paragraphs = [clean_text(p) for p in paragraphs if len(p.split()) >= 5]
-    text = "\n".join(paragraphs)
-
-    return {"source": "OMS", "url": url, "title": title, "date": date_str, "text": text}
+    return parse_article(html, url, "OMS")
 
 # --------- Forbes Afrique : liste + parsing ----------
 
-def list_forbes_articles(max_links=MAX_ARTICLES_PER_SOURCE):
-    """Récupère des liens plausibles d'articles Forbes Afrique depuis la homepage."""
-    start = "https://www.forbesafrique.com/"
-    domain = "forbesafrique.com"
-    html = get_html(start)
-    if not html:
-        return []
-    soup = BeautifulSoup(html, "lxml")
-
-    links = []
-    for a in soup.find_all("a", href=True):
-        href = a.get("href")
-        url_abs = absolutize(start, href)
-        if url_abs and is_same_domain(url_abs, domain):
-            # Heuristiques d'articles : année/mois dans l'URL, 'article' dans le slug...
-            if re.search(r"/\d{4}/\d{2}/", url_abs) or ("article" in url_abs.lower()) or ("/202" in url_abs):
-                if url_abs not in links:
-                    links.append(url_abs)
+def list_forbes_articles(max_links=MAX_ARTICLES_PER_SOURCE, state=None, cutoff=DATE_CUTOFF):
+    """Récupère des liens plausibles d'articles Forbes Afrique : homepage, archives mensuelles, sitemap.
+
+    Même logique incrémentale que list_oms_articles si `state` est fourni.
+    """
+    links = crawl_source(FORBES_SOURCE, get_listing_html, throttle=THROTTLE, cutoff=cutoff,
+                         max_pages=MAX_LISTING_PAGES, max_workers=MAX_WORKERS,
+                         known=state.known if state is not None else None)
+    if state is not None:
+        links = state.enqueue(links, "Forbes")
     return links[:max_links]
 
 def parse_forbes_article(url):
-    """Extrait (title, date, text) d'un article Forbes Afrique."""
+    """Extrait (title, date, text) d'un article Forbes Afrique (règles "Forbes" de article_parser)."""
     html = get_html(url)
     if not html:
         return None
-    soup = BeautifulSoup(html, "lxml")
-
-    title_tag = soup.find("h1") or soup.find("title")
-    title = clean_text(title_tag.get_text(" ", strip=True)) if title_tag else ""
-
-    # date via <time> ou meta
-    date_iso = None
-    t = soup.find("time")
-    if t and (t.get("datetime") or t.get_text(strip=True)):
-        date_iso = t.get("datetime") or t.get_text(strip=True)
-    if not date_iso:
-        meta = soup.find("meta", {"property": "article:published_time"})
-        if meta and meta.get("content"):
-            date_iso = meta.get("content")
-    try:
-        date_str = dateparser.parse(date_iso).isoformat() if date_iso else None
-    except Exception:
-        date_str = None
-
-    paragraphs = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
-    paragraphs = [clean_text(p) for p in paragraphs if len(p.split()) >= 5]
-    text = "\n".join(paragraphs)
-
-    return {"source": "Forbes", "url": url, "title": title, "date": date_str, "text": text}
+    return parse_article(html, url, "Forbes")
 
 # --------- Orchestration ----------
 
-def main():
-    rows = []
-
-    # 1) collecter les liens
-    oms_links = list_oms_articles(MAX_ARTICLES_PER_SOURCE)
-    print(f"OMS → {len(oms_links)} liens")
-
-    forbes_links = list_forbes_articles(MAX_ARTICLES_PER_SOURCE)
-    print(f"Forbes → {len(forbes_links)} liens")
-
-    # 2) parser OMS
-    for u in tqdm(oms_links, desc="OMS - Extraction"):
-        row = parse_oms_article(u)
-        time.sleep(0.8 + random.random() * 0.4)  # respect du site
-        if row and row.get("text"):
-            rows.append(row)
+def seed_state_from_corpus(state, csv_path=OUTPUT_CSV):
+    """Premier passage avec état vide : marque comme vus les articles déjà dans le corpus."""
+    if state.counts() or not os.path.exists(csv_path):
+        return
+    old = pd.read_csv(csv_path)
+    for src, sub in old.groupby("source"):
+        state.enqueue(sub["url"].astype(str).tolist(), src)
+    for u, txt in zip(old["url"].astype(str), old["text"].fillna("")):
+        state.mark_done(u, content_hash(txt))
+    print(f"État de crawl initialisé depuis {csv_path} ({len(old)} articles)")
+
+def drop_near_duplicates(df):
+    """Reprises / republications légèrement modifiées : un article par groupe (index persistant)."""
+    index = NearDuplicateIndex(NEAR_DUP_DB, threshold=NEAR_DUP_THRESHOLD)
+    out = index.dedup_frame(df, "url", "text", drop=NEAR_DUP_DROP, n_jobs=N_PARSERS)
+    n_dup = len(df) - len(out) if NEAR_DUP_DROP else int(out["dup_of"].notna().sum())
+    print(f"Quasi-doublons (Jaccard ≥ {NEAR_DUP_THRESHOLD}) : {n_dup} {'retirés' if NEAR_DUP_DROP else 'signalés'}")
+    index.close()
+    return out.reset_index(drop=True)
 
-    # 3) parser Forbes
-    for u in tqdm(forbes_links, desc="Forbes - Extraction"):
-        row = parse_forbes_article(u)
-        time.sleep(0.8 + random.random() * 0.4)
-        if row and row.get("text"):
-            rows.append(row)
+def main():
+    state = CrawlState(CRAWL_DB)
+    seed_state_from_corpus(state)
+
+    # 1) collecter les liens : seuls les liens jamais vus entrent dans la frontière
+    new_oms = list_oms_articles(MAX_ARTICLES_PER_SOURCE, state=state)
+    new_forbes = list_forbes_articles(MAX_ARTICLES_PER_SOURCE, state=state)
+    oms_links = state.pending("OMS", limit=MAX_ARTICLES_PER_SOURCE)
+    forbes_links = state.pending("Forbes", limit=MAX_ARTICLES_PER_SOURCE)
+    print(f"OMS → {len(new_oms)} nouveaux liens, {len(oms_links)} à traiter")
+    print(f"Forbes → {len(new_forbes)} nouveaux liens, {len(forbes_links)} à traiter")
+
+    # 2) + 3) télécharger (threads, politesse par domaine) puis parser (processus)
+    jobs = [(u, "OMS") for u in oms_links] + [(u, "Forbes") for u in forbes_links]
+    urls = [u for u, _ in jobs]
+    results = fetch_and_parse(jobs, get_html, ARCHIVE, throttle=THROTTLE,
+                              max_workers=MAX_WORKERS, n_parsers=N_PARSERS)
+
+    # on écarte les textes déjà présents dans le corpus (même contenu, autre URL)
+    rows, done, seen = [], [], set()
+    for u, row in zip(urls, results):
+        if not row or not row.get("text"):
+            state.mark_failed(u)
+            continue
+        h = content_hash(row["text"])
+        done.append((u, h))
+        if h in seen or state.seen_content(h):
+            continue
+        seen.add(h)
+        rows.append(row)
 
     # 4) consolidation
     df = pd.DataFrame(rows)
     if df.empty:
-        print("⚠️ Aucun article valide n'a été extrait.")
+        print("⚠️ Aucun nouvel article valide n'a été extrait.")
+        for u, h in done:
+            state.mark_done(u, h)
+        state.close()
+        SESSION.print_stats()
         return
 
     # nettoyage léger + filtrage
@@ -199,10 +237,33 @@ def main():
     df["text"] = df["text"].fillna("").map(clean_text)
     df = df[df["text"].str.len() > 100]
     df = df.drop_duplicates(subset=["url"]).reset_index(drop=True)
-
-    # 5) export
+    df = drop_near_duplicates(df)
+
+    # 5) export incrémental : ajout en fin de corpus
+    exists = os.path.exists(OUTPUT_CSV)
+    df[OUTPUT_COLUMNS].to_csv(OUTPUT_CSV, mode="a" if exists else "w", header=not exists,
+                              index=False, encoding="utf-8")
+    for u, h in done:
+        state.mark_done(u, h)
+    print(f"✅ Exporté: {OUTPUT_CSV} (+{len(df)} articles) — état: {state.counts()}")
+    state.close()
+    SESSION.print_stats()
+
+def reparse():
+    """Reconstruit le corpus depuis l'archive (ex: après modification de article_parser)."""
+    rows = reparse_store(ARCHIVE, sources=("OMS", "Forbes"), n_parsers=N_PARSERS)
+    rows = [r for r in rows if r.get("text")]
+    df = pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+    df["title"] = df["title"].fillna("").map(clean_text)
+    df["text"] = df["text"].fillna("").map(clean_text)
+    df = df[df["text"].str.len() > 100]
+    df = df.drop_duplicates(subset=["url"]).reset_index(drop=True)
+    df = drop_near_duplicates(df)
     df.to_csv(OUTPUT_CSV, index=False, encoding="utf-8")
-    print(f"✅ Exporté: {OUTPUT_CSV} ({len(df)} articles)")
+    print(f"✅ Ré-extrait depuis {WARC_DIR}: {OUTPUT_CSV} ({len(df)} articles)")
 
 if __name__ == "__main__":
-    main()
+    if "--reparse" in sys.argv:
+        reparse()
+    else:
+        main()
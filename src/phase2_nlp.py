@@ -6,114 +6,128 @@ Sorties :
   outputs/tfidf_top_terms.csv
   outputs/sentiment_scores.csv
   outputs/summary.txt
+  outputs/article_summaries.csv   (si ARTICLE_SUMMARIES)
 """
 
 import os, re, json
 import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from nltk.corpus import stopwords
-from nltk.stem import SnowballStemmer
 import nltk
-
-# Télécharger les ressources NLTK si nécessaire
-nltk.download("stopwords", quiet=True)
-nltk.download("punkt", quiet=True)
-nltk.download("vader_lexicon", quiet=True)
-
 from nltk.sentiment import SentimentIntensityAnalyzer
+from text_normalizer import get_normalizer
+from parallel_preprocess import normalize_parallel
+from textrank import summarize_groups, summarize_articles
+from streaming_tfidf import StreamingTfidf, read_text_chunks, build_tfidf_shards, top_terms_frame
 
 INPUT_CSV  = "outputs/raw_articles_oms_forbes.csv"
 OUT_CLEAN  = "outputs/cleaned_texts.csv"
 OUT_TFIDF  = "outputs/tfidf_top_terms.csv"
 OUT_SENT   = "outputs/sentiment_scores.csv"
 OUT_SUM    = "outputs/summary.txt"
+OUT_ART_SUM = "outputs/article_summaries.csv"
+TFIDF_DIR  = "outputs/tfidf"       # fragments CSR tfidf-XXXXX.npz (mode flux)
 
 LANG = "french"       # corpus majoritairement FR (peut mélanger un peu d'EN)
 MIN_TOK = 2
-
-os.makedirs("outputs", exist_ok=True)
+N_JOBS = None         # processus pour le prétraitement (None = nombre de cœurs)
+TFIDF_MODE = "auto"   # "memoire" (TfidfVectorizer, exact) | "flux" (hachage + IDF incrémental, hors mémoire)
+STREAMING_MIN_DOCS = 200_000   # en mode auto, flux à partir de ce nombre de documents
+ARTICLE_SUMMARIES = False      # True : résumé extractif de chaque article -> OUT_ART_SUM
 
 # --------- Nettoyage / normalisation ----------
 
 def normalize_text(s, lang=LANG, min_tok=MIN_TOK):
-    """Nettoyage simplifié + stopwords + stemming Snowball (FR)."""
-    if not isinstance(s, str):
-        s = str(s or "")
-    s = s.lower()
-    s = re.sub(r"https?://\S+", " ", s)            # URLs
-    s = re.sub(r"[^a-zàâäçéèêëîïôöùûüÿœæ\s-]", " ", s)  # garder lettres + accents + espaces
-    s = re.sub(r"\s+", " ", s).strip()
-    toks = s.split()
-    sw = set(stopwords.words(lang)) if lang in stopwords.fileids() else set()
-    toks = [t for t in toks if (t not in sw and len(t) >= min_tok)]
-    stem = SnowballStemmer(lang) if lang in ["french","english","spanish","german","italian"] else None
-    if stem:
-        toks = [stem.stem(t) for t in toks]
-    return " ".join(toks)
+    """Nettoyage simplifié + stopwords + stemming Snowball (FR), cf. text_normalizer.TextNormalizer."""
+    return get_normalizer(lang, min_tok)(s)
 
 # --------- Chargement ---------
 
-df = pd.read_csv(INPUT_CSV)
-assert {"source","title","text"}.issubset(df.columns), "Colonnes manquantes dans le CSV d'entrée."
+def load_and_clean():
+    df = pd.read_csv(INPUT_CSV)
+    assert {"source","title","text"}.issubset(df.columns), "Colonnes manquantes dans le CSV d'entrée."
 
-# Nettoyage
-df["clean_text"] = df["text"].astype(str).apply(normalize_text)
-df = df[df["clean_text"].str.len() > 0].reset_index(drop=True)
-df.to_csv(OUT_CLEAN, index=False)
-print(f"✅ {OUT_CLEAN} sauvegardé ({len(df)} lignes)")
+    # Nettoyage (par blocs, sur tous les cœurs)
+    df["clean_text"] = normalize_parallel(df["text"].astype(str).tolist(), LANG, MIN_TOK, n_jobs=N_JOBS)
+    df = df[df["clean_text"].str.len() > 0].reset_index(drop=True)
+    df.to_csv(OUT_CLEAN, index=False)
+    print(f"✅ {OUT_CLEAN} sauvegardé ({len(df)} lignes)")
+    return df
 
 # --------- TF-IDF (top termes) ----------
 
-# On prend un TF-IDF 1-2 grams pour capter quelques expressions
-vec = TfidfVectorizer(max_df=0.9, min_df=2, ngram_range=(1,2))
-X = vec.fit_transform(df["clean_text"].values)
-vocab = np.array(vec.get_feature_names_out())
-
-# termes les plus importants (moyenne TF-IDF)
-means = X.mean(axis=0).A1
-top_idx = np.argsort(means)[::-1][:50]
-top_terms = pd.DataFrame({
-    "term": vocab[top_idx],
-    "tfidf_mean": means[top_idx]
-})
-top_terms.to_csv(OUT_TFIDF, index=False)
-print(f"✅ {OUT_TFIDF} (top 50 TF-IDF)")
+def tfidf_top_terms(df):
+    # On prend un TF-IDF 1-2 grams pour capter quelques expressions
+    if TFIDF_MODE == "flux" or (TFIDF_MODE == "auto" and len(df) >= STREAMING_MIN_DOCS):
+        # documents relus par blocs depuis OUT_CLEAN : aucun vocabulaire en mémoire,
+        # matrice écrite en fragments .npz, moyennes accumulées bloc par bloc
+        vec = StreamingTfidf(ngram_range=(1,2), min_df=2, max_df=0.9)
+        chunks = lambda: read_text_chunks(OUT_CLEAN, "clean_text")
+        stats = build_tfidf_shards(vec, chunks, TFIDF_DIR)
+        top_terms = top_terms_frame(vec, stats, chunks, k=50)
+        print(f"TF-IDF en flux : {stats.n_docs} documents, {len(stats.shards)} fragments dans {TFIDF_DIR}")
+    else:
+        vec = TfidfVectorizer(max_df=0.9, min_df=2, ngram_range=(1,2))
+        X = vec.fit_transform(df["clean_text"].values)
+        vocab = np.array(vec.get_feature_names_out())
+
+        # termes les plus importants (moyenne TF-IDF)
+        means = X.mean(axis=0).A1
+        top_idx = np.argsort(means)[::-1][:50]
+        top_terms = pd.DataFrame({
+            "term": vocab[top_idx],
+            "tfidf_mean": means[top_idx]
+        })
+    top_terms.to_csv(OUT_TFIDF, index=False)
+    print(f"✅ {OUT_TFIDF} (top 50 TF-IDF)")
 
 # --------- Sentiment (baseline VADER) ----------
-sia = SentimentIntensityAnalyzer()
-sent = df["clean_text"].apply(lambda s: sia.polarity_scores(s))
-sent_df = pd.DataFrame(list(sent))
-sent_df = pd.concat([df[["source","title"]], sent_df], axis=1)
-sent_df.to_csv(OUT_SENT, index=False)
-print(f"✅ {OUT_SENT} (scores VADER: neg/neu/pos/compound)")
-
-# --------- Résumé extractif (type TextRank simplifié) ----------
-
-def textrank_summary(paragraphs, top_k=5):
-    """Résumé extractif par centralité : TF-IDF + similarité cosinus + score de centralité."""
-    docs = [p for p in paragraphs if isinstance(p, str) and len(p.split()) > 3]
-    if not docs:
-        return ""
-    v = TfidfVectorizer(max_df=0.95, min_df=2, ngram_range=(1,2))
-    M = v.fit_transform(docs)
-    sim = cosine_similarity(M)
-    # score = somme des similarités (on ignore la diagonale)
-    scores = sim.sum(axis=1) - np.diag(sim)
-    best = np.argsort(scores)[::-1][:top_k]
-    best_sorted = sorted(best)  # conserver l'ordre d'apparition
-    return "\n\n".join(docs[i] for i in best_sorted)
-
-# résumé par source, à partire du texte brut pour garder les phrases intactes
-summaries = []
-for src, sub in df.groupby("source"):
-    paras = sub["text"].astype(str).tolist()
-    s = textrank_summary(paras, top_k=5)
-    summaries.append(f"=== {src} ===\n{s}")
-
-full_summary = "\n\n".join(summaries)
-with open(OUT_SUM, "w", encoding="utf-8") as f:
-    f.write(full_summary)
-
-print(f"✅ {OUT_SUM} (résumé extractif multi-source)")
+
+def vader_sentiment(df):
+    sia = SentimentIntensityAnalyzer()
+    sent = df["clean_text"].apply(lambda s: sia.polarity_scores(s))
+    sent_df = pd.DataFrame(list(sent))
+    sent_df = pd.concat([df[["source","title"]], sent_df], axis=1)
+    sent_df.to_csv(OUT_SENT, index=False)
+    print(f"✅ {OUT_SENT} (scores VADER: neg/neu/pos/compound)")
+
+# --------- Résumé extractif (TextRank) ----------
+# graphe kNN creux + PageRank (textrank.py) : mémoire bornée, une source par processus
+
+def textrank_summaries(df):
+    # résumé par source, à partire du texte brut pour garder les phrases intactes
+    groups = {src: sub["text"].astype(str).tolist() for src, sub in df.groupby("source")}
+    results = summarize_groups(groups, top_k=5, n_jobs=N_JOBS)
+    summaries = [f"=== {src} ===\n{s}" for src, s in results.items()]
+
+    full_summary = "\n\n".join(summaries)
+    with open(OUT_SUM, "w", encoding="utf-8") as f:
+        f.write(full_summary)
+
+    print(f"✅ {OUT_SUM} (résumé extractif multi-source)")
+
+    # résumé extractif article par article (optionnel)
+    if ARTICLE_SUMMARIES:
+        art = df[["source","title"]].copy()
+        art["summary"] = summarize_articles(df["text"].astype(str).tolist(), top_k=3, n_jobs=N_JOBS)
+        art.to_csv(OUT_ART_SUM, index=False)
+        print(f"✅ {OUT_ART_SUM} (résumés par article)")
+
+# --------- Pipeline ----------
+
+# les étapes lancent des pools de processus : sous spawn / forkserver, chaque worker réimporte
+# ce script, d'où la garde __main__ (comme phase1_scrape.py)
+def main():
+    # Télécharger les ressources NLTK si nécessaire
+    nltk.download("stopwords", quiet=True)
+    nltk.download("punkt", quiet=True)
+    nltk.download("vader_lexicon", quiet=True)
+    os.makedirs("outputs", exist_ok=True)
+
+    df = load_and_clean()
+    tfidf_top_terms(df)
+    vader_sentiment(df)
+    textrank_summaries(df)
+
+if __name__ == "__main__":
+    main()
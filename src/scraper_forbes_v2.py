@@ -1,228 +1,363 @@
 import pandas as pd
-import time
+import re
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+import requests
+from lxml import etree, html as lxml_html
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-import re
 
-def scraper_forbes_afrique(nb_articles=30):
-    """
-    Scrape les articles du site Forbes Afrique en utilisant Selenium.
-    
-    Paramètres:
-    - nb_articles: Nombre d'articles à récupérer (par défaut 30)
-    
-    Retour:
-    - DataFrame contenant les colonnes: source, titre, date, lien, texte
-    """
-    
-    articles_data = []
-    driver = None
-    
+BASE_URL = "https://forbesafrique.com/"
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+# Flux "sous-jacents" du site (WordPress) : API JSON puis RSS
+WP_POSTS_API = BASE_URL + "wp-json/wp/v2/posts"
+RSS_FEED = BASE_URL + "feed/"
+
+# Sélecteur du contenu d'un article (pages HTML et rendu navigateur)
+SELECTEUR_CONTENU = "main, article, .content, .post-content, [class*='content'], [class*='article']"
+XPATH_PARAGRAPHES = ("//article//p | //*[contains(@class,'entry-content')]//p"
+                     " | //*[contains(@class,'post-content')]//p | //main//p")
+
+N_WORKERS_HTTP = 8        # téléchargements HTTP simultanés (mode rapide)
+N_NAVIGATEURS = 3         # instances Chrome du pool (mode navigateur)
+TIMEOUT_ATTENTE = 15      # secondes max pour les attentes explicites
+
+# dates au format affiché par le site ("12 mars 2024"), quelle que soit la source (API, RSS, page)
+MOIS = ["janvier", "février", "mars", "avril", "mai", "juin", "juillet", "août",
+        "septembre", "octobre", "novembre", "décembre"]
+
+
+def _texte_depuis_html(fragment):
+    """Texte complet (paragraphes) d'une page ou d'un fragment HTML."""
+    if not fragment:
+        return ""
     try:
-        # Initialiser le navigateur Chrome avec les options appropriées
-        print("Initialisation du navigateur Chrome...")
-        chrome_options = Options()
-        chrome_options.add_argument('--headless=new')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--disable-web-resources')
-        chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--disable-plugins')
-        chrome_options.add_argument('--disable-images')
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        
-        driver = webdriver.Chrome(options=chrome_options)
-        
-        # Accéder au site
-        print("Accès au site Forbes Afrique...")
-        driver.get("https://forbesafrique.com/")
-        
-        # Attendre le chargement de la page
-        time.sleep(3)
-        
-        # Accepter les cookies si présent
-        try:
-            accept_button = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Accepter')]"))
-            )
-            accept_button.click()
-            print("Cookies acceptés")
-            time.sleep(1)
-        except:
-            print("Pas de popup de cookies trouvée")
-        
-        # Faire défiler la page pour charger les articles
-        print("Chargement des articles...")
-        scroll_count = 0
-        max_scrolls = 10
-        
-        while scroll_count < max_scrolls:
-            # Faire défiler vers le bas
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            scroll_count += 1
-            print(f"Scroll {scroll_count}/{max_scrolls}")
-        
-        # Chercher les articles avec différentes stratégies
-        print("\nRecherche des articles...")
-        
-        # Stratégie 1: Chercher les liens dans les articles
-        article_links = []
-        
-        # Chercher tous les liens
-        all_links = driver.find_elements(By.TAG_NAME, "a")
-        print(f"Total de liens trouvés: {len(all_links)}")
-        
-        for link in all_links:
-            try:
-                href = link.get_attribute('href')
-                text = link.text.strip()
-                
-                # Vérifier si c'est un lien d'article valide
-                if href and text and len(text) > 10 and not href.startswith('javascript'):
-                    if '/article' in href or '/news' in href or '/blog' in href or 'forbesafrique.com' in href:
-                        article_links.append({
-                            'url': href,
-                            'titre': text,
-                            'element': link
-                        })
-            except:
-                pass
-        
-        print(f"Articles trouvés: {len(article_links)}")
-        
-        # Extraire les informations des articles
-        seen_urls = set()
-        
-        for i, article in enumerate(article_links):
-            if len(articles_data) >= nb_articles:
-                break
-            
+        tree = lxml_html.fromstring(fragment)
+    except Exception:
+        return ""
+    paragraphes = tree.xpath(XPATH_PARAGRAPHES) or tree.xpath("//p")
+    lignes = [re.sub(r"\s+", " ", p.text_content()).strip() for p in paragraphes]
+    return "\n".join(l for l in lignes if l)
+
+
+def _date_affichee(dt):
+    """datetime -> "12 mars 2024" (indépendant de la locale), "N/A" si absente."""
+    return f"{dt.day} {MOIS[dt.month - 1]} {dt.year}" if dt else "N/A"
+
+
+def _texte_simple(fragment):
+    """Texte brut d'un petit fragment HTML (titres de l'API JSON)."""
+    if not fragment or not fragment.strip():
+        return ""
+    return lxml_html.fromstring(fragment).text_content().strip()
+
+
+# --------- Mode rapide : flux JSON / RSS + requêtes HTTP ----------
+
+def lister_articles_api(session, nb_articles):
+    """Liste les articles via l'API JSON WordPress (titre, date, lien, contenu complet)."""
+    articles = []
+    page = 1
+    # per_page constant : WordPress décale de (page - 1) * per_page, l'excédent est coupé à la fin
+    per_page = min(100, nb_articles)
+    while len(articles) < nb_articles:
+        r = session.get(WP_POSTS_API, params={
+            "per_page": per_page,
+            "page": page,
+            "_fields": "link,title,date,content",
+        }, timeout=30)
+        if r.status_code != 200:
+            break
+        posts = r.json()
+        if not posts:
+            break
+        for post in posts:
             try:
-                url = article['url']
-                titre = article['titre']
-                
-                # Éviter les doublons
-                if url in seen_urls:
-                    continue
-                seen_urls.add(url)
-                
-                # Chercher la date
+                date_str = _date_affichee(datetime.fromisoformat(post["date"]))
+            except Exception:
+                date_str = "N/A"
+            articles.append({
+                'source': "Forbes Afrique",
+                'titre': _texte_simple(post.get("title", {}).get("rendered", "")),
+                'date': date_str,
+                'lien': post["link"],
+                'texte': _texte_depuis_html(post.get("content", {}).get("rendered", "")),
+            })
+        page += 1
+    return articles[:nb_articles]
+
+def lister_articles_rss(session, nb_articles):
+    """Liste les articles via le flux RSS (le texte est complété ensuite si absent)."""
+    r = session.get(RSS_FEED, timeout=30)
+    r.raise_for_status()
+    root = etree.fromstring(r.content)
+    ns = {"content": "http://purl.org/rss/1.0/modules/content/"}
+    articles = []
+    for item in root.iter("item"):
+        pub = item.findtext("pubDate")
+        try:
+            date_str = _date_affichee(parsedate_to_datetime(pub)) if pub else "N/A"
+        except Exception:
+            date_str = "N/A"
+        articles.append({
+            'source': "Forbes Afrique",
+            'titre': (item.findtext("title") or "").strip(),
+            'date': date_str,
+            'lien': (item.findtext("link") or "").strip(),
+            'texte': _texte_depuis_html(item.findtext("content:encoded", namespaces=ns)),
+        })
+        if len(articles) >= nb_articles:
+            break
+    return articles
+
+def lister_articles_html(session, nb_articles):
+    """Dernier recours sans navigateur : liens d'articles du HTML statique de la homepage."""
+    r = session.get(BASE_URL, timeout=30)
+    r.raise_for_status()
+    tree = lxml_html.fromstring(r.text)
+    tree.make_links_absolute(BASE_URL)
+    articles, vus = [], set()
+    for a in tree.iter("a"):
+        href, titre = a.get("href"), a.text_content().strip()
+        if not href or href in vus or len(titre) <= 10 or 'forbesafrique.com' not in href:
+            continue
+        if re.search(r"/\d{4}/\d{2}/.+", href) or '/article' in href:
+            vus.add(href)
+            articles.append({'source': "Forbes Afrique", 'titre': titre, 'date': "N/A",
+                             'lien': href, 'texte': ""})
+        if len(articles) >= nb_articles:
+            break
+    return articles
+
+def completer_textes_http(session, articles, n_workers=N_WORKERS_HTTP):
+    """Télécharge en parallèle les pages des articles sans texte et en extrait le texte complet."""
+    a_completer = [a for a in articles if not a['texte']]
+
+    def _un(article):
+        try:
+            r = session.get(article['lien'], timeout=30)
+            r.raise_for_status()
+            article['texte'] = _texte_depuis_html(r.text)
+        except Exception as e:
+            print(f"  Erreur HTTP {article['lien']}: {e}")
+
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        list(pool.map(_un, a_completer))
+    return articles
+
+def scraper_forbes_rapide(nb_articles=30):
+    """Mode rapide : API JSON puis RSS puis HTML statique, textes complétés en HTTP parallèle."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    for lister in (lister_articles_api, lister_articles_rss, lister_articles_html):
+        try:
+            articles = lister(session, nb_articles)
+        except Exception as e:
+            print(f"{lister.__name__} indisponible: {e}")
+            continue
+        if articles:
+            print(f"{len(articles)} articles listés via {lister.__name__}")
+            return completer_textes_http(session, articles)
+    return []
+
+
+# --------- Mode navigateur (repli) : pool de Chrome + attentes explicites ----------
+
+def _creer_navigateur():
+    chrome_options = Options()
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--disable-web-resources')
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-plugins')
+    chrome_options.add_argument('--disable-images')
+    chrome_options.add_argument(f"user-agent={HEADERS['User-Agent']}")
+    # on n'attend pas les ressources secondaires : les attentes explicites suffisent
+    chrome_options.page_load_strategy = 'eager'
+    return webdriver.Chrome(options=chrome_options)
+
+def lister_articles_navigateur(driver, nb_articles, max_scrolls=10):
+    """Liste les articles de la homepage rendue (défilement tant que la page s'allonge)."""
+    driver.get(BASE_URL)
+    WebDriverWait(driver, TIMEOUT_ATTENTE).until(EC.presence_of_element_located((By.TAG_NAME, "a")))
+
+    # Accepter les cookies si présent
+    try:
+        accept_button = WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Accepter')]"))
+        )
+        accept_button.click()
+        print("Cookies acceptés")
+    except Exception:
+        print("Pas de popup de cookies trouvée")
+
+    # Faire défiler : on attend que la hauteur change au lieu d'un sleep fixe
+    for scroll_count in range(max_scrolls):
+        hauteur = driver.execute_script("return document.body.scrollHeight")
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        try:
+            WebDriverWait(driver, 5).until(
+                lambda d: d.execute_script("return document.body.scrollHeight") > hauteur)
+        except Exception:
+            break  # plus rien à charger
+        print(f"Scroll {scroll_count + 1}/{max_scrolls}")
+
+    articles, vus = [], set()
+    for link in driver.find_elements(By.TAG_NAME, "a"):
+        try:
+            href = link.get_attribute('href')
+            titre = link.text.strip()
+            if not href or not titre or len(titre) <= 10 or href.startswith('javascript') or href in vus:
+                continue
+            if '/article' in href or '/news' in href or '/blog' in href or 'forbesafrique.com' in href:
                 try:
-                    parent = article['element'].find_element(By.XPATH, "./ancestor::div[1]")
-                    parent_text = parent.text
+                    parent_text = link.find_element(By.XPATH, "./ancestor::div[1]").text
                     date_match = re.search(r'(\d{1,2}\s+\w+\s+\d{4})', parent_text)
                     date_str = date_match.group(1) if date_match else "N/A"
-                except:
+                except Exception:
                     date_str = "N/A"
-                
-                source = "Forbes Afrique"
-                
-                print(f"Scraping article {len(articles_data)+1}: {titre[:60]}...")
-                
-                # Accéder à l'article
+                vus.add(href)
+                articles.append({'source': "Forbes Afrique", 'titre': titre, 'date': date_str,
+                                 'lien': href, 'texte': ""})
+        except Exception:
+            pass
+        if len(articles) >= nb_articles:
+            break
+    return articles
+
+def completer_textes_navigateur(articles, n_navigateurs=N_NAVIGATEURS, pool=None):
+    """Rend en parallèle les articles encore sans texte avec un petit pool de navigateurs."""
+    a_completer = [a for a in articles if not a['texte']]
+    if not a_completer:
+        return articles
+    pool = pool if pool is not None else queue.Queue()
+    crees = []
+    verrou = threading.Lock()
+
+    def _un(article):
+        try:
+            driver = pool.get_nowait()
+        except queue.Empty:
+            driver = _creer_navigateur()
+            with verrou:
+                crees.append(driver)
+        try:
+            driver.get(article['lien'])
+            contenu = WebDriverWait(driver, TIMEOUT_ATTENTE).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, SELECTEUR_CONTENU)))
+            article['texte'] = _texte_depuis_html(driver.page_source) or contenu.text
+        except Exception as e:
+            print(f"  Erreur: {e}")
+            article['texte'] = "Erreur lors de la récupération du texte"
+        finally:
+            pool.put(driver)
+
+    try:
+        with ThreadPoolExecutor(max_workers=n_navigateurs) as executor:
+            list(executor.map(_un, a_completer))
+    finally:
+        for driver in crees:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    return articles
+
+def scraper_forbes_navigateur(nb_articles=30, articles=None):
+    """Mode navigateur : liste via Chrome si besoin, puis rend les articles sans texte."""
+    if articles is None:
+        driver = None
+        try:
+            print("Initialisation du navigateur Chrome...")
+            driver = _creer_navigateur()
+            print("Accès au site Forbes Afrique...")
+            articles = lister_articles_navigateur(driver, nb_articles)
+            print(f"Articles trouvés: {len(articles)}")
+        finally:
+            if driver:
                 try:
-                    driver.execute_script("window.open(arguments[0]);", url)
-                    driver.switch_to.window(driver.window_handles[-1])
-                    time.sleep(2)
-                    
-                    # Chercher le contenu
-                    try:
-                        contenu = driver.find_element(By.CSS_SELECTOR, "main, article, .content, .post-content, [class*='content'], [class*='article']")
-                        texte = contenu.text
-                    except:
-                        texte = "Texte non disponible"
-                    
-                    texte = texte[:1000] if len(texte) > 1000 else texte
-                    
-                    # Fermer l'onglet
-                    driver.close()
-                    driver.switch_to.window(driver.window_handles[0])
-                    
-                except Exception as e:
-                    print(f"  Erreur: {e}")
-                    if len(driver.window_handles) > 1:
-                        try:
-                            driver.close()
-                            driver.switch_to.window(driver.window_handles[0])
-                        except:
-                            pass
-                    texte = "Erreur lors de la récupération du texte"
-                
-                # Ajouter les données
-                articles_data.append({
-                    'source': source,
-                    'titre': titre,
-                    'date': date_str,
-                    'lien': url,
-                    'texte': texte
-                })
-                
-                print(f"  ✓ Article ajouté ({len(articles_data)}/{nb_articles})")
-                
-            except Exception as e:
-                print(f"  ✗ Erreur: {e}")
-                continue
-        
-        # Créer le DataFrame
-        df = pd.DataFrame(articles_data)
-        return df
-    
+                    driver.quit()
+                    print("Navigateur fermé")
+                except Exception:
+                    pass
+    return completer_textes_navigateur(articles)
+
+
+def scraper_forbes_afrique(nb_articles=30, mode="auto"):
+    """
+    Scrape les articles du site Forbes Afrique.
+
+    Paramètres:
+    - nb_articles: Nombre d'articles à récupérer (par défaut 30)
+    - mode: "rapide" (flux JSON/RSS + HTTP), "navigateur" (Selenium)
+            ou "auto" (rapide, navigateur seulement pour ce qui manque)
+
+    Retour:
+    - DataFrame contenant les colonnes: source, titre, date, lien, texte (texte complet)
+    """
+    try:
+        articles = []
+        if mode in ("auto", "rapide"):
+            articles = scraper_forbes_rapide(nb_articles)
+        if mode == "navigateur" or (mode == "auto" and not articles):
+            articles = scraper_forbes_navigateur(nb_articles)
+        elif mode == "auto" and any(not a['texte'] for a in articles):
+            articles = scraper_forbes_navigateur(nb_articles, articles=articles)
+        for a in articles:
+            a['texte'] = a['texte'] or "Texte non disponible"
+        return pd.DataFrame(articles[:nb_articles], columns=['source', 'titre', 'date', 'lien', 'texte'])
+
     except Exception as e:
         print(f"Erreur: {e}")
         import traceback
         traceback.print_exc()
         return pd.DataFrame()
-    
-    finally:
-        # Fermer le navigateur
-        if driver:
-            try:
-                driver.quit()
-                print("Navigateur fermé")
-            except:
-                pass
 
 
 def main():
     """Fonction principale"""
-    
+
     print("=" * 80)
-    print("SCRAPER DES ARTICLES FORBES AFRIQUE - AVEC SELENIUM")
+    print("SCRAPER DES ARTICLES FORBES AFRIQUE - FLUX JSON/RSS (SELENIUM EN REPLI)")
     print("=" * 80)
-    
+
     # Scraper 30 articles
     df = scraper_forbes_afrique(nb_articles=30)
-    
+
     if not df.empty:
         print("\n" + "=" * 80)
         print(f"RÉSULTAT: {len(df)} articles récupérés")
         print("=" * 80)
-        
+
         # Afficher les premières lignes
         print("\nAperçu des données:")
         print(df.head())
-        
+
         # Afficher les informations du DataFrame
         print("\nInformations du DataFrame:")
         print(df.info())
-        
+
         # Afficher les colonnes
         print("\nColonnes:")
         print(df.columns.tolist())
-        
+
         # Sauvegarder en CSV
         df.to_csv('articles_forbes.csv', index=False, encoding='utf-8')
         print("\n✓ Données sauvegardées dans 'articles_forbes.csv'")
-        
+
         # Sauvegarder en Excel
         df.to_excel('articles_forbes.xlsx', index=False, engine='openpyxl')
         print("✓ Données sauvegardées dans 'articles_forbes.xlsx'")
-        
+
         return df
     else:
         print("Aucun article n'a pu être récupéré.")
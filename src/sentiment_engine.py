@@ -0,0 +1,105 @@
+"""
+Moteur d'inférence de sentiment par lots (transformers, CPU ou GPU).
+
+Par rapport à `pipeline(...)(texte)` appelé document par document :
+  - tokenisation de tout le corpus en un appel (tokenizer rapide),
+  - tri des documents par longueur en tokens (les lots ont des longueurs voisines),
+  - padding dynamique : chaque lot n'est complété qu'à la longueur de son plus long élément,
+  - taille de lot configurable et contrôle des threads intra-op de torch.
+
+Le résultat est le même que celui du pipeline "sentiment-analysis" : pour chaque texte,
+le label de plus forte probabilité (softmax) et son score, dans l'ordre d'entrée.
+
+Documents longs (`predict_long`) : chaque document est découpé en fenêtres glissantes de
+la taille du modèle ; toutes les fenêtres du corpus passent dans un seul flux de lots,
+puis les probabilités sont moyennées par document, pondérées par la longueur des fenêtres.
+
+Usage :
+  engine = SentimentEngine("nlptown/bert-base-multilingual-uncased-sentiment", batch_size=32)
+  preds = engine.predict(texts)     # [{"label": "5 stars", "score": 0.61}, ...]
+  preds = engine.predict_long(texts, stride=64)   # article entier, sans troncature
+  print(engine.last_rate, "docs/s")
+"""
+
+import time
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+
+class SentimentEngine:
+    """Classifieur de séquences avec lots triés par longueur et padding dynamique."""
+
+    def __init__(self, model_name, batch_size=32, max_length=512, num_threads=None, device="cpu"):
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.device = torch.device(device)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name).to(self.device).eval()
+        self.max_length = min(max_length, self.tokenizer.model_max_length)
+        self.id2label = self.model.config.id2label
+        self.last_rate = 0.0   # docs/s du dernier appel à predict
+
+    def encode(self, texts):
+        """Tokenise sans padding (listes d'ids) ; le padding est fait lot par lot."""
+        return self.tokenizer(list(texts), truncation=True, max_length=self.max_length)
+
+    def predict_encoded(self, enc):
+        """Probabilités (n, n_labels) pour un encodage sans padding, dans l'ordre d'entrée."""
+        n = len(enc["input_ids"])
+        probs = np.zeros((n, len(self.id2label)), dtype=np.float32)
+        if n == 0:
+            return probs
+        lengths = np.fromiter((len(ids) for ids in enc["input_ids"]), dtype=np.int64, count=n)
+        order = np.argsort(lengths, kind="stable")
+        keys = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in enc]
+        with torch.inference_mode():
+            for start in range(0, n, self.batch_size):
+                idx = order[start:start + self.batch_size]
+                batch = self.tokenizer.pad({k: [enc[k][i] for i in idx] for k in keys},
+                                           return_tensors="pt")
+                batch = {k: v.to(self.device) for k, v in batch.items()}
+                logits = self.model(**batch).logits
+                probs[idx] = torch.softmax(logits.float(), dim=-1).cpu().numpy()
+        return probs
+
+    def predict(self, texts):
+        """Label + score (comme le pipeline sentiment-analysis) pour chaque texte."""
+        t0 = time.perf_counter()
+        probs = self.predict_encoded(self.encode(texts))
+        best = probs.argmax(axis=1) if len(probs) else []
+        out = [{"label": self.id2label[int(j)], "score": float(probs[i, j])} for i, j in enumerate(best)]
+        elapsed = time.perf_counter() - t0
+        self.last_rate = len(out) / elapsed if elapsed > 0 else 0.0
+        return out
+
+    def predict_long(self, texts, stride=64):
+        """Sentiment de documents entiers : fenêtres glissantes + agrégation pondérée par longueur.
+
+        `stride` = nombre de tokens de recouvrement entre deux fenêtres consécutives.
+        Chaque prédiction contient aussi `n_windows`.
+        """
+        t0 = time.perf_counter()
+        texts = list(texts)
+        enc = self.tokenizer(texts, truncation=True, max_length=self.max_length, stride=stride,
+                             return_overflowing_tokens=True)
+        doc_of = np.asarray(enc.pop("overflow_to_sample_mapping"), dtype=np.int64)
+        probs = self.predict_encoded(enc)
+        # poids = nombre de tokens réels de la fenêtre
+        weights = np.fromiter((len(ids) for ids in enc["input_ids"]), dtype=np.float64, count=len(doc_of))
+
+        n_labels = len(self.id2label)
+        agg = np.zeros((len(texts), n_labels), dtype=np.float64)
+        np.add.at(agg, doc_of, probs * weights[:, None])
+        total = np.bincount(doc_of, weights=weights, minlength=len(texts))
+        n_windows = np.bincount(doc_of, minlength=len(texts))
+        agg /= np.maximum(total, 1e-12)[:, None]
+
+        best = agg.argmax(axis=1)
+        out = [{"label": self.id2label[int(j)], "score": float(agg[i, j]), "n_windows": int(n_windows[i])}
+               for i, j in enumerate(best)]
+        elapsed = time.perf_counter() - t0
+        self.last_rate = len(out) / elapsed if elapsed > 0 else 0.0
+        return out
@@ -0,0 +1,242 @@
+"""
+TF-IDF hors mémoire : HashingVectorizer + IDF accumulé par blocs.
+
+Aucun dictionnaire de vocabulaire : chaque n-gramme est haché dans `n_features` colonnes,
+la mémoire reste bornée (quelques vecteurs de taille n_features) quelle que soit la taille
+du corpus. Deux passages sur les documents, lus par blocs depuis le disque :
+
+  1. partial_fit  : fréquences documentaires (DF) et fréquences totales par colonne ;
+  2. transform    : TF-IDF (IDF lissé + normalisation L2, comme TfidfVectorizer),
+                    écrit en fragments CSR  outputs/tfidf/tfidf-00000.npz, ...
+                    tout en accumulant les sommes par colonne (moyenne TF-IDF)
+                    et par classe (chi²) ;
+
+puis les noms des seules colonnes retenues (top termes, chi²) sont retrouvés en relisant
+les documents jusqu'à les avoir tous rencontrés (recover_terms).
+
+À collisions de hachage près, les valeurs sont celles de TfidfVectorizer avec les mêmes
+paramètres (min_df, max_df, max_features, ngram_range). Deux n-grammes de même colonne
+partagent leurs fréquences : sur un petit corpus, préférer TfidfVectorizer (résultat exact).
+
+Usage :
+  vec = StreamingTfidf(ngram_range=(1, 2), min_df=2, max_df=0.9)
+  chunks = lambda: read_text_chunks("outputs/cleaned_texts.csv", "clean_text", label_col="source")
+  stats = build_tfidf_shards(vec, chunks, "outputs/tfidf")
+  top = top_terms_frame(vec, stats, chunks, k=50)          # term, tfidf_mean
+  chi = chi2_terms_frame(vec, stats, chunks, k=30)         # term, chi2, p_value
+  X = load_shards("outputs/tfidf")                          # CSR complet si la mémoire le permet
+"""
+
+import os, glob, json
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.stats import chi2 as chi2_dist
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+
+N_FEATURES = 2 ** 22   # colonnes de hachage (~4M) : ~0,6 % de collisions pour 50k n-grammes, état ~50 Mo
+CHUNK_SIZE = 20_000    # documents lus par bloc
+
+
+class StreamingTfidf:
+    """TF-IDF par hachage, ajusté bloc par bloc (partial_fit) puis appliqué bloc par bloc (transform)."""
+
+    def __init__(self, n_features=N_FEATURES, ngram_range=(1, 1), min_df=1, max_df=1.0,
+                 max_features=None, lowercase=True, token_pattern=r"(?u)\b\w\w+\b"):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.min_df, self.max_df, self.max_features = min_df, max_df, max_features
+        self.hasher = HashingVectorizer(n_features=n_features, ngram_range=ngram_range, lowercase=lowercase,
+                                        token_pattern=token_pattern, alternate_sign=False, norm=None)
+        self.doc_freq = np.zeros(n_features, dtype=np.int32)
+        self.term_freq = np.zeros(n_features, dtype=np.float64)
+        self.n_docs = 0
+        self._idf = None
+
+    # --------- Passage 1 : DF ----------
+
+    def partial_fit(self, texts):
+        counts = self.hasher.transform(texts)
+        self.doc_freq += np.bincount(counts.indices, minlength=self.n_features).astype(np.int32)
+        self.term_freq += np.asarray(counts.sum(axis=0)).ravel()
+        self.n_docs += counts.shape[0]
+        self._idf = None
+        return self
+
+    def kept_columns(self):
+        """Masque des colonnes conservées (min_df / max_df / max_features, comme TfidfVectorizer)."""
+        n = self.n_docs
+        max_count = self.max_df if isinstance(self.max_df, (int, np.integer)) else self.max_df * n
+        min_count = self.min_df if isinstance(self.min_df, (int, np.integer)) else self.min_df * n
+        keep = (self.doc_freq > 0) & (self.doc_freq >= min_count) & (self.doc_freq <= max_count)
+        if self.max_features is not None and keep.sum() > self.max_features:
+            cols = np.flatnonzero(keep)
+            best = cols[np.argsort(-self.term_freq[cols], kind="stable")[:self.max_features]]
+            keep = np.zeros_like(keep)
+            keep[best] = True
+        return keep
+
+    @property
+    def idf_(self):
+        """IDF lissé ln((1+n)/(1+df)) + 1 ; 0 pour les colonnes écartées."""
+        if self._idf is None:
+            idf = np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1.0
+            idf[~self.kept_columns()] = 0.0
+            self._idf = idf
+        return self._idf
+
+    # --------- Passage 2 : TF-IDF ----------
+
+    def transform(self, texts):
+        X = self.hasher.transform(texts).astype(np.float64)
+        X.data *= self.idf_[X.indices]
+        X.eliminate_zeros()
+        return normalize(X, norm="l2", copy=False)
+
+    def fit_transform(self, texts, chunk_size=CHUNK_SIZE):
+        """Chemin en mémoire (petits corpus / notebooks) : mêmes deux passages, par blocs."""
+        texts = list(texts)
+        for start in range(0, len(texts), chunk_size):
+            self.partial_fit(texts[start:start + chunk_size])
+        return sparse.vstack([self.transform(texts[s:s + chunk_size])
+                              for s in range(0, len(texts), chunk_size)], format="csr")
+
+    def bucket(self, term):
+        return abs(murmurhash3_32(term, seed=0)) % self.n_features
+
+    # --------- Persistance ----------
+
+    def save(self, path):
+        np.savez(path, doc_freq=self.doc_freq, term_freq=self.term_freq, n_docs=self.n_docs,
+                 params=json.dumps({"n_features": self.n_features, "ngram_range": list(self.ngram_range),
+                                    "min_df": self.min_df, "max_df": self.max_df,
+                                    "max_features": self.max_features}))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        params = json.loads(str(data["params"]))
+        params["ngram_range"] = tuple(params["ngram_range"])
+        vec = cls(**params)
+        vec.doc_freq, vec.term_freq, vec.n_docs = data["doc_freq"], data["term_freq"], int(data["n_docs"])
+        return vec
+
+
+class TermStats:
+    """Sommes TF-IDF par colonne (global et par classe), accumulées bloc par bloc."""
+
+    def __init__(self, n_features):
+        self.n_docs = 0
+        self.col_sum = np.zeros(n_features, dtype=np.float64)
+        self.class_sum = {}
+        self.class_count = {}
+        self.shards = []
+
+    def update(self, X, labels=None):
+        self.n_docs += X.shape[0]
+        self.col_sum += np.asarray(X.sum(axis=0)).ravel()
+        if labels is None:
+            return
+        labels = np.asarray(labels)
+        for c in np.unique(labels):
+            rows = labels == c
+            if c not in self.class_sum:
+                self.class_sum[c] = np.zeros_like(self.col_sum)
+                self.class_count[c] = 0
+            self.class_sum[c] += np.asarray(X[rows].sum(axis=0)).ravel()
+            self.class_count[c] += int(rows.sum())
+
+    def means(self):
+        return self.col_sum / max(self.n_docs, 1)
+
+    def chi2(self):
+        """(chi², p-valeurs) par colonne, identiques à sklearn.feature_selection.chi2(X, labels)."""
+        classes = sorted(self.class_sum)
+        observed = np.vstack([self.class_sum[c] for c in classes])
+        class_prob = np.array([self.class_count[c] for c in classes], dtype=np.float64) / self.n_docs
+        expected = np.outer(class_prob, self.col_sum)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            score = ((observed - expected) ** 2 / expected).sum(axis=0)
+        return score, chi2_dist.sf(score, len(classes) - 1)
+
+# --------- Lecture par blocs / fragments CSR ----------
+
+def read_text_chunks(path, text_col, label_col=None, chunksize=CHUNK_SIZE):
+    """Itère sur (textes, labels) d'un CSV lu par blocs (labels = None sans `label_col`)."""
+    cols = [text_col] + ([label_col] if label_col else [])
+    for chunk in pd.read_csv(path, usecols=cols, chunksize=chunksize):
+        texts = chunk[text_col].fillna("").astype(str).tolist()
+        yield texts, (chunk[label_col].astype(str).tolist() if label_col else None)
+
+def list_chunks(texts, labels=None, chunksize=CHUNK_SIZE):
+    """Équivalent de read_text_chunks pour des textes déjà en mémoire (notebooks)."""
+    texts = [str(t) for t in texts]
+    labels = list(labels) if labels is not None else None
+    for start in range(0, len(texts), chunksize):
+        yield texts[start:start + chunksize], (labels[start:start + chunksize] if labels is not None else None)
+
+def build_tfidf_shards(vec, make_chunks, out_dir):
+    """Deux passages sur `make_chunks()` : DF puis fragments CSR tfidf-XXXXX.npz + statistiques."""
+    os.makedirs(out_dir, exist_ok=True)
+    for old in glob.glob(os.path.join(out_dir, "tfidf-*.npz")):
+        os.remove(old)
+    for texts, _ in make_chunks():
+        vec.partial_fit(texts)
+    vec.save(os.path.join(out_dir, "state.npz"))
+
+    stats = TermStats(vec.n_features)
+    for k, (texts, labels) in enumerate(make_chunks()):
+        X = vec.transform(texts)
+        path = os.path.join(out_dir, f"tfidf-{k:05d}.npz")
+        sparse.save_npz(path, X)
+        stats.shards.append(path)
+        stats.update(X, labels)
+    return stats
+
+def load_shards(out_dir):
+    """Matrice CSR complète (n_docs, n_features) à partir des fragments, dans l'ordre des documents."""
+    paths = sorted(glob.glob(os.path.join(out_dir, "tfidf-*.npz")))
+    return sparse.vstack([sparse.load_npz(p) for p in paths], format="csr")
+
+# --------- Noms des colonnes retenues ----------
+
+def recover_terms(vec, make_chunks, cols):
+    """{colonne: n-gramme} pour `cols`, en relisant les documents jusqu'à tous les trouver.
+
+    En cas de collision, le premier n-gramme rencontré donne son nom à la colonne.
+    """
+    wanted = np.unique(np.asarray(cols, dtype=np.int64))
+    wanted_set = set(wanted.tolist())
+    analyzer = vec.hasher.build_analyzer()
+    names = {}
+    for texts, _ in make_chunks():
+        # seuls les documents contenant une colonne recherchée sont analysés
+        hits = vec.hasher.transform(texts)[:, wanted].getnnz(axis=1)
+        for i in np.flatnonzero(hits):
+            for term in analyzer(texts[i]):
+                c = vec.bucket(term)
+                if c in wanted_set and c not in names:
+                    names[c] = term
+            if len(names) == len(wanted_set):
+                return names
+    return names
+
+def top_terms_frame(vec, stats, make_chunks, k=50):
+    """Termes de plus forte moyenne TF-IDF (colonnes : term, tfidf_mean)."""
+    means = stats.means()
+    top = np.argsort(means)[::-1][:k]
+    top = top[means[top] > 0]
+    names = recover_terms(vec, make_chunks, top)
+    return pd.DataFrame({"term": [names.get(int(c), f"#{c}") for c in top], "tfidf_mean": means[top]})
+
+def chi2_terms_frame(vec, stats, make_chunks, k=30):
+    """Termes les plus discriminants entre classes (colonnes : term, chi2, p_value)."""
+    score, pval = stats.chi2()
+    score = np.where(vec.kept_columns(), np.nan_to_num(score, nan=-1.0), -1.0)
+    top = np.argsort(score)[::-1][:k]
+    top = top[score[top] >= 0]
+    names = recover_terms(vec, make_chunks, top)
+    return pd.DataFrame({"term": [names.get(int(c), f"#{c}") for c in top],
+                         "chi2": score[top], "p_value": pval[top]})
@@ -0,0 +1,145 @@
+"""
+Résumés abstractifs par lots (BART / T5, transformers), en temps borné.
+
+Par rapport à `summarizer(t, max_length=60, min_length=20)` appelé article par article :
+  - pré-filtre extractif : au-delà de `prefilter_words` mots, seules les phrases les mieux
+    classées par TextRank (textrank.py) sont conservées, dans leur ordre d'apparition ;
+    le coût du modèle par article est ainsi borné ;
+  - découpage en blocs de `max_input_tokens` tokens des textes encore trop longs pour
+    l'encodeur (le pipeline échoue ou tronque sinon) ; les résumés des blocs sont concaténés ;
+  - tous les blocs du corpus passent dans un seul flux de lots triés par longueur,
+    avec padding dynamique (comme SentimentEngine) ;
+  - `cached_summaries` : résultats persistés par hash du texte (inference_cache.py),
+    traitement par tranches avec un budget de temps optionnel -> relancer le job reprend
+    là où il s'était arrêté.
+
+Les paramètres de génération non précisés (num_beams, length_penalty, no_repeat_ngram_size...)
+sont ceux de la generation_config du modèle, comme pour le pipeline "summarization".
+
+Usage :
+  engine = SummarizationEngine("facebook/bart-large-cnn", batch_size=8)
+  summaries = engine.summarize(texts)
+  summaries = cached_summaries(engine, texts, InferenceCache(), time_budget=3600)  # None = pas encore fait
+"""
+
+import time
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from textrank import TextRank, split_sentences
+
+PREFILTER_WORDS = 400    # au-delà, pré-filtre extractif (TextRank sur les phrases de l'article)
+MAX_INPUT_TOKENS = 1024  # taille d'un bloc d'entrée (bart-large-cnn : 1024 positions)
+
+
+def extractive_prefilter(text, max_words=PREFILTER_WORDS):
+    """Phrases les plus centrales de `text`, dans l'ordre d'origine, jusqu'à ~`max_words` mots."""
+    text = str(text)
+    if not max_words or len(text.split()) <= max_words:
+        return text
+    sents = split_sentences(text)
+    if len(sents) < 2:
+        return " ".join(text.split()[:max_words])
+    scores = TextRank(min_df=1, max_df=1.0).fit(sents).rank(sents)
+    keep, n_words = [], 0
+    for i in np.argsort(-scores, kind="stable"):
+        w = len(sents[i].split())
+        if keep and n_words + w > max_words:
+            continue
+        keep.append(i)
+        n_words += w
+        if n_words >= max_words:
+            break
+    return " ".join(sents[i] for i in sorted(keep))
+
+
+class SummarizationEngine:
+    """Modèle seq2seq de résumé avec pré-filtre, découpage et lots triés par longueur."""
+
+    def __init__(self, model_name, batch_size=8, max_length=60, min_length=20,
+                 max_input_tokens=MAX_INPUT_TOKENS, prefilter_words=PREFILTER_WORDS,
+                 num_threads=None, device="cpu", **generate_kwargs):
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.device = torch.device(device)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name).to(self.device).eval()
+        self.max_input_tokens = min(max_input_tokens, self.tokenizer.model_max_length)
+        self.prefilter_words = prefilter_words
+        self.generate_kwargs = dict(generate_kwargs, max_length=max_length, min_length=min_length)
+        self.last_rate = 0.0   # docs/s du dernier appel à summarize
+
+    @property
+    def params(self):
+        """Paramètres qui changent le résultat (clé du cache d'inférence)."""
+        return dict(self.generate_kwargs, max_input_tokens=self.max_input_tokens,
+                    prefilter_words=self.prefilter_words)
+
+    def encode(self, texts):
+        """Blocs de `max_input_tokens` tokens (sans padding) et document d'origine de chaque bloc."""
+        enc = self.tokenizer(list(texts), truncation=True, max_length=self.max_input_tokens,
+                             return_overflowing_tokens=True)
+        doc_of = np.asarray(enc.pop("overflow_to_sample_mapping"), dtype=np.int64)
+        return enc, doc_of
+
+    def generate_encoded(self, enc):
+        """Résumé de chaque bloc, dans l'ordre d'entrée (lots triés par longueur)."""
+        n = len(enc["input_ids"])
+        out = [""] * n
+        lengths = np.fromiter((len(ids) for ids in enc["input_ids"]), dtype=np.int64, count=n)
+        order = np.argsort(lengths, kind="stable")[::-1]   # les plus longs d'abord : erreur mémoire au plus tôt
+        with torch.inference_mode():
+            for start in range(0, n, self.batch_size):
+                idx = order[start:start + self.batch_size]
+                batch = self.tokenizer.pad({k: [enc[k][i] for i in idx] for k in ("input_ids", "attention_mask")},
+                                           return_tensors="pt")
+                batch = {k: v.to(self.device) for k, v in batch.items()}
+                ids = self.model.generate(**batch, **self.generate_kwargs)
+                for i, s in zip(idx, self.tokenizer.batch_decode(ids, skip_special_tokens=True)):
+                    out[i] = s.strip()
+        return out
+
+    def summarize(self, texts):
+        """Résumé de chaque texte (chaîne vide pour un texte vide)."""
+        t0 = time.perf_counter()
+        texts = [str(t) for t in texts]
+        todo = [i for i, t in enumerate(texts) if t.strip()]
+        out = [""] * len(texts)
+        if todo:
+            enc, doc_of = self.encode(extractive_prefilter(texts[i], self.prefilter_words) for i in todo)
+            parts = self.generate_encoded(enc)
+            for j, s in zip(doc_of, parts):
+                i = todo[j]
+                out[i] = f"{out[i]} {s}".strip()
+        elapsed = time.perf_counter() - t0
+        self.last_rate = len(texts) / elapsed if elapsed > 0 else 0.0
+        return out
+
+
+def cached_summaries(engine, texts, cache, chunk_size=64, time_budget=None):
+    """Résumés alignés sur `texts`, lus dans le cache ou calculés par tranches de `chunk_size`.
+
+    Chaque tranche est écrite dans le cache dès qu'elle est calculée. Si `time_budget` (secondes)
+    est dépassé, les textes restants valent None : une nouvelle exécution les reprend.
+    """
+    from inference_cache import model_revision
+    texts = [str(t) for t in texts]
+    key = dict(model=engine.model_name, revision=model_revision(engine.model),
+               task="summarization", params=engine.params)
+    out = cache.get_many(texts, **key)
+    missing = list(dict.fromkeys(t for t, v in zip(texts, out) if v is None))
+    # tranches de longueurs voisines : moins de padding dans chaque lot
+    missing.sort(key=lambda t: len(t.split()))
+    t0 = time.perf_counter()
+    computed = {}
+    for start in range(0, len(missing), chunk_size):
+        if time_budget is not None and time.perf_counter() - t0 > time_budget:
+            print(f"Budget de temps atteint : {len(missing) - start} textes restants (relancer pour reprendre)")
+            break
+        part = missing[start:start + chunk_size]
+        values = engine.summarize(part)
+        cache.put_many(part, values, **key)
+        computed.update(zip(part, values))
+    return [computed.get(t) if v is None else v for t, v in zip(texts, out)]
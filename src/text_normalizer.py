@@ -0,0 +1,61 @@
+"""
+Normaliseur de texte réutilisable (phase 2) : regex précompilées, stopwords figés,
+cache LRU des racines Snowball et API batch.
+
+Sortie strictement identique à l'ancien `normalize_text` de phase2_nlp :
+  minuscules -> suppression des URLs et des caractères non alphabétiques
+  -> stopwords + longueur minimale -> stemming Snowball.
+
+Usage :
+  norm = TextNormalizer("french")
+  norm("Un texte")                 # un document
+  norm.normalize_many(df["text"])  # une colonne / un itérable de textes
+"""
+
+import re
+from functools import lru_cache
+from nltk.corpus import stopwords
+from nltk.stem import SnowballStemmer
+
+STEM_LANGS = ["french", "english", "spanish", "german", "italian"]
+
+# URL ou caractère hors lettres/accents/espaces/tiret, en une seule passe :
+# l'alternative URL commence par une lettre, elle ne peut donc jamais être
+# entamée par l'alternative "caractère", d'où l'équivalence avec deux re.sub successifs.
+_NOISE = re.compile(r"https?://\S+|[^a-zàâäçéèêëîïôöùûüÿœæ\s-]")
+
+
+class TextNormalizer:
+    """Nettoyage simplifié + stopwords + stemming Snowball, avec ressources chargées une fois."""
+
+    def __init__(self, lang="french", min_tok=2, cache_size=200_000):
+        self.lang = lang
+        self.min_tok = min_tok
+        self.stopwords = frozenset(stopwords.words(lang)) if lang in stopwords.fileids() else frozenset()
+        stemmer = SnowballStemmer(lang) if lang in STEM_LANGS else None
+        # les mêmes tokens reviennent des milliers de fois : on ne stemme chaque forme qu'une fois
+        self.stem = lru_cache(maxsize=cache_size)(stemmer.stem) if stemmer else None
+
+    def __call__(self, s):
+        if not isinstance(s, str):
+            s = str(s or "")
+        toks = _NOISE.sub(" ", s.lower()).split()
+        sw, min_tok = self.stopwords, self.min_tok
+        toks = [t for t in toks if (t not in sw and len(t) >= min_tok)]
+        if self.stem is not None:
+            stem = self.stem
+            toks = [stem(t) for t in toks]
+        return " ".join(toks)
+
+    def normalize_many(self, texts):
+        """Normalise une colonne / un itérable de textes ; renvoie une liste alignée."""
+        return [self(s) for s in texts]
+
+    def cache_info(self):
+        return self.stem.cache_info() if self.stem is not None else None
+
+
+@lru_cache(maxsize=None)
+def get_normalizer(lang="french", min_tok=2):
+    """Normaliseur partagé par (langue, longueur minimale)."""
+    return TextNormalizer(lang, min_tok)
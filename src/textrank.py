@@ -0,0 +1,143 @@
+"""
+Résumé extractif TextRank à mémoire bornée (phase 2).
+
+  1. un seul TfidfVectorizer ajusté sur tout le corpus (vocabulaire partagé entre sources) ;
+  2. graphe de similarité creux : pour chaque paragraphe, ses `knn` plus proches voisins
+     (cosinus >= `threshold`), calculés par blocs de lignes -> jamais de matrice n x n dense ;
+  3. PageRank par itération de puissance sur la matrice creuse (nœuds sans arête : saut uniforme) ;
+  4. les `top_k` paragraphes les mieux classés, dans leur ordre d'apparition.
+
+Les sources (et, en option, les articles découpés en phrases) sont résumées en parallèle
+dans un pool de processus.
+
+Usage :
+  tr = TextRank().fit(all_paragraphs)
+  tr.summarize(paragraphs_of_source, top_k=5)
+  summarize_groups({"OMS": [...], "Forbes": [...]}, top_k=5, n_jobs=4)
+  summarize_articles(df["text"], top_k=3, n_jobs=4)
+"""
+
+import os, re
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from keyword_extraction import topk_csr
+from parallel_preprocess import _map_chunks
+
+KNN = 10            # voisins conservés par paragraphe
+THRESHOLD = 0.05    # cosinus minimal pour une arête
+DAMPING = 0.85
+ROW_BLOCK = 256     # lignes par bloc pour le produit creux M @ M.T
+
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _is_paragraph(p):
+    return isinstance(p, str) and len(p.split()) > 3
+
+def knn_graph(M, knn=KNN, threshold=THRESHOLD, block=ROW_BLOCK):
+    """Graphe symétrique creux des `knn` voisins les plus similaires (M normalisée L2 : produit = cosinus)."""
+    M = sparse.csr_matrix(M)
+    n = M.shape[0]
+    rows, cols, vals = [], [], []
+    MT = M.T.tocsc()
+    for start in range(0, n, block):
+        S = (M[start:start + block] @ MT).tocoo()
+        keep = (S.data >= threshold) & (S.row + start != S.col)   # pas de boucle sur soi-même
+        S = sparse.csr_matrix((S.data[keep], (S.row[keep], S.col[keep])), shape=S.shape)
+        idx, sim = topk_csr(S, knn)
+        r = np.repeat(np.arange(start, start + S.shape[0]), idx.shape[1])
+        valid = idx.ravel() >= 0
+        rows.append(r[valid])
+        cols.append(idx.ravel()[valid])
+        vals.append(sim.ravel()[valid])
+    W = sparse.csr_matrix((np.concatenate(vals) if vals else [], (np.concatenate(rows) if rows else [],
+                          np.concatenate(cols) if cols else [])), shape=(n, n))
+    return W.maximum(W.T)
+
+def pagerank(W, damping=DAMPING, tol=1e-8, max_iter=200):
+    """PageRank pondéré par itération de puissance ; les nœuds sans arête redistribuent uniformément."""
+    n = W.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    out_deg = np.asarray(W.sum(axis=1)).ravel()
+    dangling = out_deg == 0
+    inv = np.divide(1.0, out_deg, out=np.zeros(n), where=~dangling)
+    P_T = (sparse.diags(inv) @ W).T.tocsr()
+    r = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        new = damping * (P_T @ r + r[dangling].sum() / n) + (1 - damping) / n
+        if np.abs(new - r).sum() < tol:
+            return new
+        r = new
+    return r
+
+
+class TextRank:
+    """TextRank sur graphe kNN creux, avec un vocabulaire TF-IDF partagé par toutes les sources."""
+
+    def __init__(self, knn=KNN, threshold=THRESHOLD, damping=DAMPING,
+                 ngram_range=(1, 2), min_df=2, max_df=0.95):
+        self.knn, self.threshold, self.damping = knn, threshold, damping
+        self.vec_params = dict(ngram_range=ngram_range, min_df=min_df, max_df=max_df)
+        self.vec = None
+
+    def fit(self, texts):
+        docs = [p for p in texts if _is_paragraph(p)]
+        try:
+            self.vec = TfidfVectorizer(**self.vec_params).fit(docs)
+        except ValueError:   # corpus trop petit pour min_df / max_df : tous les termes
+            self.vec = TfidfVectorizer(ngram_range=self.vec_params["ngram_range"]).fit(docs or [""])
+        return self
+
+    def rank(self, docs):
+        M = self.vec.transform(docs)
+        return pagerank(knn_graph(M, self.knn, self.threshold), self.damping)
+
+    def summarize(self, paragraphs, top_k=5):
+        docs = [p for p in paragraphs if _is_paragraph(p)]
+        if not docs:
+            return ""
+        if self.vec is None:
+            self.fit(docs)
+        scores = self.rank(docs)
+        best = np.argsort(scores, kind="stable")[::-1][:top_k]
+        return "\n\n".join(docs[i] for i in sorted(best))   # conserver l'ordre d'apparition
+
+    def __call__(self, item):
+        paragraphs, top_k = item
+        return self.summarize(paragraphs, top_k)
+
+# --------- Parallélisme ----------
+
+def summarize_groups(groups, top_k=5, n_jobs=None, model=None):
+    """{groupe: paragraphes} -> {groupe: résumé}, un processus par groupe."""
+    groups = {g: list(p) for g, p in groups.items()}
+    if model is None:
+        model = TextRank().fit([p for ps in groups.values() for p in ps])
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(groups)) or 1
+    items = [(ps, top_k) for ps in groups.values()]
+    if n_jobs == 1:
+        return dict(zip(groups, map(model, items)))
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return dict(zip(groups, pool.map(model, items)))
+
+def split_sentences(text):
+    return [s.strip() for s in _SENT_SPLIT.split(str(text)) if s.strip()]
+
+class _ArticleChunk:
+    """Tâche picklable : résume chaque article d'un bloc à partir de ses phrases."""
+
+    def __init__(self, model, top_k):
+        self.model, self.top_k = model, top_k
+
+    def __call__(self, texts):
+        return [self.model.summarize(split_sentences(t), self.top_k) for t in texts]
+
+def summarize_articles(texts, top_k=3, n_jobs=None, model=None):
+    """Résumé extractif de chaque article (phrases les plus centrales), par blocs en parallèle."""
+    texts = [str(t) for t in texts]
+    if model is None:
+        model = TextRank(min_df=1, max_df=1.0).fit([s for t in texts for s in split_sentences(t)])
+    return _map_chunks(_ArticleChunk(model, top_k), texts, n_jobs, None)
@@ -0,0 +1,192 @@
+"""
+Archive brute des réponses HTTP, façon WARC : segments compressés en ajout seul + index SQLite.
+
+  outputs/warc/seg-00000.warc.gz   (ou .warc.zst si `zstandard` est installé et codec="zstd")
+  outputs/warc/index.sqlite        records(url, source, fetched_at, segment, offset, length, status, digest)
+
+Chaque enregistrement est un membre gzip (ou une trame zstd) indépendant : un en-tête
+"WARC/1.0" + le corps. On peut donc relire un enregistrement isolé par (segment, offset, length)
+ou relire tout un segment séquentiellement, à la vitesse du disque (replay).
+
+La clé d'un enregistrement est la chaîne "segment:offset:length" ; elle suffit à un processus
+parseur pour relire la page sans ouvrir l'index.
+
+`digest` (sha1 du corps) permet de ne pas ré-archiver une page inchangée depuis sa dernière
+capture (put(..., skip_unchanged=True), ex. pages de listing relues à chaque passage).
+"""
+
+import os, gzip, hashlib, sqlite3, threading, time
+from datetime import datetime, timezone
+
+try:
+    import zstandard
+except ImportError:  # zstd optionnel, gzip par défaut
+    zstandard = None
+
+SEGMENT_SIZE = 256 * 1024 * 1024   # on ouvre un nouveau segment au-delà de 256 Mo
+_EXT = {"gzip": ".warc.gz", "zstd": ".warc.zst"}
+
+
+def _compress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+def _decompress(data, segment):
+    if segment.endswith(".zst"):
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+def _encode_record(url, body, source, status, fetched_at):
+    payload = body.encode("utf-8")
+    header = (
+        "WARC/1.0\r\n"
+        "WARC-Type: response\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        f"WARC-Date: {datetime.fromtimestamp(fetched_at, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+        f"X-Source: {source or ''}\r\n"
+        f"X-Status: {status}\r\n"
+        "Content-Type: text/html; charset=utf-8\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        "\r\n"
+    ).encode("utf-8")
+    return header + payload
+
+def _decode_record(raw):
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    headers = {}
+    for line in head.decode("utf-8").split("\r\n")[1:]:
+        k, _, v = line.partition(": ")
+        headers[k] = v
+    return headers, payload.decode("utf-8")
+
+
+def read_record(root, key):
+    """Relit un enregistrement à partir de sa clé "segment:offset:length" -> (en-têtes, corps)."""
+    segment, offset, length = key.rsplit(":", 2)
+    with open(os.path.join(root, segment), "rb") as f:
+        f.seek(int(offset))
+        raw = f.read(int(length))
+    return _decode_record(_decompress(raw, segment))
+
+
+class WarcArchive:
+    """Archive en ajout seul des pages téléchargées, indexée par URL et date de fetch."""
+
+    def __init__(self, root, codec="gzip", segment_size=SEGMENT_SIZE):
+        if codec == "zstd" and zstandard is None:
+            print("zstandard non installé : archive en gzip")
+            codec = "gzip"
+        self.root = root
+        self.codec = codec
+        self.segment_size = segment_size
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS records (
+                url        TEXT NOT NULL,
+                source     TEXT,
+                fetched_at REAL NOT NULL,
+                segment    TEXT NOT NULL,
+                offset     INTEGER NOT NULL,
+                length     INTEGER NOT NULL,
+                status     INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_records_url ON records(url, fetched_at);
+        """)
+        # index antérieur sans empreinte : colonne ajoutée, anciennes captures ré-archivées une fois
+        cols = [r[1] for r in self.conn.execute("PRAGMA table_info(records)")]
+        if "digest" not in cols:
+            self.conn.execute("ALTER TABLE records ADD COLUMN digest TEXT")
+        self.conn.commit()
+        self._segment = self._current_segment()
+
+    # --------- Écriture ----------
+
+    def _current_segment(self):
+        segs = sorted(f for f in os.listdir(self.root) if f.startswith("seg-") and ".warc" in f)
+        if segs and segs[-1].endswith(_EXT[self.codec]) and \
+                os.path.getsize(os.path.join(self.root, segs[-1])) < self.segment_size:
+            return segs[-1]
+        return f"seg-{len(segs):05d}{_EXT[self.codec]}"
+
+    def put(self, url, source, body, status=200, fetched_at=None, skip_unchanged=False):
+        """Ajoute une réponse à l'archive ; renvoie sa clé "segment:offset:length".
+
+        Avec `skip_unchanged`, un corps identique à la dernière capture de l'URL n'est pas
+        réécrit : on renvoie la clé de cette capture.
+        """
+        fetched_at = fetched_at or time.time()
+        digest = hashlib.sha1(body.encode("utf-8")).hexdigest()
+        if skip_unchanged:
+            with self._lock:
+                row = self.conn.execute(
+                    "SELECT segment, offset, length, digest FROM records WHERE url = ? "
+                    "ORDER BY fetched_at DESC LIMIT 1", (url,)).fetchone()
+            if row and row[3] == digest:
+                return f"{row[0]}:{row[1]}:{row[2]}"
+        blob = _compress(_encode_record(url, body, source, status, fetched_at), self.codec)
+        with self._lock:
+            path = os.path.join(self.root, self._segment)
+            if os.path.exists(path) and os.path.getsize(path) >= self.segment_size:
+                n = int(self._segment[4:9]) + 1
+                self._segment = f"seg-{n:05d}{_EXT[self.codec]}"
+                path = os.path.join(self.root, self._segment)
+            segment = self._segment   # clé construite sous le verrou (un autre put peut changer de segment)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(blob)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO records(url, source, fetched_at, segment, offset, length, status, digest) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (url, source, fetched_at, segment, offset, len(blob), status, digest))
+            return f"{segment}:{offset}:{len(blob)}"
+
+    # --------- Lecture ----------
+
+    def get(self, key):
+        return read_record(self.root, key)[1]
+
+    def lookup(self, url, before=None):
+        """Dernière capture d'une URL (éventuellement antérieure à `before`, timestamp)."""
+        q = "SELECT segment, offset, length FROM records WHERE url = ?"
+        args = [url]
+        if before is not None:
+            q += " AND fetched_at <= ?"
+            args.append(before)
+        with self._lock:
+            row = self.conn.execute(q + " ORDER BY fetched_at DESC LIMIT 1", args).fetchone()
+        return self.get(f"{row[0]}:{row[1]}:{row[2]}") if row else None
+
+    def entries(self, source=None):
+        """(url, source, clé) de la capture la plus récente de chaque URL, dans l'ordre du disque."""
+        q = ("SELECT r.url, r.source, r.segment, r.offset, r.length FROM records r "
+             "JOIN (SELECT url, MAX(fetched_at) AS t FROM records GROUP BY url) last "
+             "ON r.url = last.url AND r.fetched_at = last.t")
+        args = []
+        if source is not None:
+            q += " WHERE r.source = ?"
+            args.append(source)
+        with self._lock:
+            rows = self.conn.execute(q + " ORDER BY r.segment, r.offset", args).fetchall()
+        return [(u, src, f"{seg}:{off}:{ln}") for u, src, seg, off, ln in rows]
+
+    def replay(self, source=None):
+        """Relit séquentiellement les dernières captures : génère (url, source, html)."""
+        handles = {}
+        try:
+            for url, src, key in self.entries(source):
+                segment, offset, length = key.rsplit(":", 2)
+                f = handles.get(segment)
+                if f is None:
+                    f = handles[segment] = open(os.path.join(self.root, segment), "rb")
+                f.seek(int(offset))
+                yield url, src, _decode_record(_decompress(f.read(int(length)), segment))[1]
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def close(self):
+        self.conn.close()
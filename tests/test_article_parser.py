@@ -0,0 +1,26 @@
+import os
+from article_parser import parse_article
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_page_with_xml_encoding_declaration():
+    html = read_fixture("xml_declaration.html")
+    titles = {"OMS": "Paludisme : nouvelles recommandations",     # premier <h1> ou <title>
+              "Forbes": "Paludisme : l’OMS publie de nouvelles recommandations"}
+    for source, title in titles.items():
+        art = parse_article(html, "https://example.org/paludisme", source)
+        assert art is not None
+        assert art["title"] == title
+        assert art["date"].startswith("2024-03-12")
+        assert art["text"].splitlines() == [
+            "L’Organisation mondiale de la Santé recommande un second vaccin contre le paludisme.",
+            "Les pays d’Afrique subsaharienne recevront les premières doses dès cette année.",
+        ]
+    # même page en octets : la déclaration est laissée à lxml
+    assert parse_article(html.encode("utf-8"), "u", "OMS")["title"].startswith("Paludisme")
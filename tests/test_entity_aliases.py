@@ -0,0 +1,51 @@
+from entity_aliases import AliasIndex
+
+
+def make_index(tmp_path, seeds=None):
+    return AliasIndex(str(tmp_path / "aliases.sqlite"), seeds=seeds)
+
+
+def test_short_acronym_does_not_absorb_person_names(tmp_path):
+    idx = make_index(tmp_path)
+    ids = idx.resolve(["PM", "Premier ministre", "Pierre Martin", "Paul Mba"],
+                      labels=["ORG", "MISC", "PER", "PER"])
+    assert len(set(ids)) == 4
+    ids = idx.resolve(["MS", "Macky Sall", "Marie Sy"], labels=["ORG", "PER", "PER"])
+    assert len(set(ids)) == 3
+
+
+def test_acronym_needs_org_labels(tmp_path):
+    idx = make_index(tmp_path)
+    ids = idx.resolve(["BGM", "Bernard Gilles Moreau"], labels=["ORG", "PER"])
+    assert ids[0] != ids[1]
+    # sans label, pas de résolution par sigle
+    ids = idx.resolve(["FBM", "Fonds belge mutualiste"])
+    assert ids[0] != ids[1]
+
+
+def test_unique_org_long_form_is_linked(tmp_path):
+    idx = make_index(tmp_path)
+    ids = idx.resolve(["ONUSIDA", "CNLS", "Comité national de lutte sida"],
+                      labels=["ORG", "ORG", "ORG"])
+    assert ids[1] == ids[2] and ids[0] != ids[1]
+
+
+def test_ambiguous_acronym_links_nothing(tmp_path):
+    idx = make_index(tmp_path)
+    ids = idx.resolve(["PDS", "Parti démocratique sénégalais", "Programme décennal santé"],
+                      labels=["ORG", "ORG", "ORG"])
+    assert len(set(ids)) == 3
+
+
+def test_known_acronym_does_not_chain_later_long_forms(tmp_path):
+    path = str(tmp_path / "aliases.sqlite")
+    idx = AliasIndex(path, seeds=None)
+    pds, parti = idx.resolve(["PDS", "Parti démocratique sénégalais"], labels=["ORG", "ORG"])
+    assert pds == parti
+    idx.close()
+    # relance : la table persistée (labels compris) rend "PDS" ambigu pour une nouvelle forme longue
+    idx = AliasIndex(path, seeds=None)
+    (prog,) = idx.resolve(["Programme décennal santé"], labels=["ORG"])
+    assert prog != pds
+    (person,) = idx.resolve(["Paul Diouf Sarr"], labels=["PER"])
+    assert person != pds
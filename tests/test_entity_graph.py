@@ -0,0 +1,42 @@
+import pandas as pd
+import entity_graph
+from entity_graph import EntityGraph
+
+ENTS = pd.DataFrame({"doc_hash": ["a", "a", "b", "b", "c", "c", "c"],
+                     "entity": ["X", "Y", "X", "Y", "X", "Z", "Y"]})
+
+
+def test_removed_documents_match_rebuild():
+    g = EntityGraph().add_frame(ENTS)
+    g.remove_documents({"c", "absent"})
+    ref = EntityGraph().add_frame(ENTS[ENTS["doc_hash"] != "c"])
+    assert g.n_docs == ref.n_docs == 2
+    assert g.edges(min_count=1).values.tolist() == ref.edges(min_count=1).values.tolist()
+    assert (g.counts()[ref.names] == ref.counts()).all()
+
+
+def test_load_rebuilds_on_version_change(tmp_path):
+    EntityGraph("v1").add_frame(ENTS).save(str(tmp_path))
+    assert EntityGraph.load(str(tmp_path), version="v1").n_docs == 3
+    assert EntityGraph.load(str(tmp_path), version="v2").n_docs == 0
+
+
+def test_dead_rows_are_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(entity_graph, "DEAD_ROWS_MAX", 1.0)   # pas de compactage automatique
+    g = EntityGraph().add_frame(ENTS)
+    g.add_documents(["a"], [["X", "Z"]])     # "a" remplacé : son ancienne ligne est vidée
+    g.remove_documents({"b"})
+    assert g.X.shape[0] == 4
+    g.save(str(tmp_path))
+    assert g.X.shape[0] == g.n_docs == 2
+    loaded = EntityGraph.load(str(tmp_path))
+    for h in (g, loaded):
+        assert sorted(h.doc_rows.values()) == [0, 1]
+        assert {h.names[j] for j in h.X[h.doc_rows["a"]].indices} == {"X", "Z"}
+        assert {h.names[j] for j in h.X[h.doc_rows["c"]].indices} == {"X", "Y", "Z"}
+        assert h.counts().to_dict() == {"X": 2, "Y": 1, "Z": 2}
+
+def test_compacts_past_dead_rows_threshold():
+    g = EntityGraph().add_frame(ENTS)
+    g.remove_documents({"a"})                # 1 ligne vidée sur 3 > DEAD_ROWS_MAX
+    assert g.X.shape[0] == g.n_docs == 2
@@ -0,0 +1,26 @@
+import os, pickle
+from inference_cache import InferenceCache, text_hash
+
+
+def test_none_results_are_not_cached(tmp_path):
+    cache = InferenceCache(os.path.join(str(tmp_path), "cache.sqlite"))
+    calls = []
+    def fn(texts):
+        calls.append(list(texts))
+        return [None if t == "échec" else len(t) for t in texts]
+    assert cache.cached_map(fn, ["a", "échec", "bb"], model="m") == [1, None, 2]
+    assert cache.cached_map(fn, ["a", "échec", "bb"], model="m") == [1, None, 2]
+    assert calls == [["a", "échec", "bb"], ["échec"]]   # seul le document en échec est retenté
+    assert cache.stats()["entries"] == 2 and cache.hits == 2
+
+
+def test_legacy_none_entry_is_a_miss(tmp_path):
+    cache = InferenceCache(os.path.join(str(tmp_path), "cache.sqlite"))
+    blob = pickle.dumps(None)
+    with cache.conn:
+        cache.conn.execute("INSERT INTO results VALUES ('m', '', '', '{}', ?, ?, ?, 0)",
+                           (text_hash("ancien"), blob, len(blob)))
+    assert cache.get_many(["ancien"], model="m") == [None]
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.cached_map(lambda ts: [len(t) for t in ts], ["ancien"], model="m") == [6]
+    assert cache.get_many(["ancien"], model="m") == [6]
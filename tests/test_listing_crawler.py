@@ -0,0 +1,113 @@
+import functools, importlib, os, re, shutil, threading, urllib.request
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fetcher import HostThrottle
+from listing_crawler import crawl_listings, crawl_source
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "crawler")
+CUTOFF = "2024-01-01"
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    """Pages statiques ; `?page=N` sert page-N.html du dossier demandé."""
+
+    def translate_path(self, path):
+        path, _, query = path.partition("?")
+        fs_path = super().translate_path(path)
+        m = re.search(r"(?:^|&)page=(\d+)", query)
+        return os.path.join(fs_path, f"page-{m.group(1)}.html") if m else fs_path
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def site(tmp_path_factory):
+    root = tmp_path_factory.mktemp("site")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_Handler, directory=str(root)))
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    shutil.copytree(FIXTURES, root, dirs_exist_ok=True)
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            if name.endswith(".xml"):   # sitemaps : URLs absolues du serveur local
+                path = os.path.join(dirpath, name)
+                with open(path, encoding="utf-8") as f:
+                    xml = f.read().replace("{base}", base)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(xml)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield base
+    server.shutdown()
+
+
+@pytest.fixture(scope="module")
+def sources(tmp_path_factory):
+    # phase1_scrape crée ses dossiers de sortie (cache HTTP, WARC) à l'import
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("phase1"))
+    try:
+        phase1 = importlib.import_module("phase1_scrape")
+    finally:
+        os.chdir(cwd)
+    return phase1.OMS_SOURCE, phase1.FORBES_SOURCE
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=10) as r:
+        return r.read().decode("utf-8")
+
+
+def crawl(cfg):
+    return crawl_source(cfg, fetch, throttle=HostThrottle(4, 0.0, jitter=0.0), cutoff=CUTOFF,
+                        max_workers=4)
+
+
+def test_oms_listing_pagination_and_sitemaps(site, sources):
+    oms, _ = sources
+    cfg = dict(oms, listings=[f"{site}/fr/news"], sitemaps=[f"{site}/sitemap.xml"], domain="127.0.0.1")
+    links = crawl(cfg)
+    expected = [
+        # sitemap récent (sitemap 2023 et entrées antérieures à la date limite ignorés)
+        "/fr/news/item/20-03-2024-vaccination",
+        "/fr/news/item/01-03-2024-paludisme",
+        # listing paginé ; la page 3 est entièrement antérieure : pas de page 4
+        "/fr/news/item/15-02-2024-rougeole",
+        "/fr/news-room/fact-sheets/detail/tuberculose",
+        "/fr/news/item/10-01-2024-cholera",
+        "/fr/news/item/05-12-2023-dengue",
+    ]
+    assert sorted(links) == sorted(site + p for p in expected)
+    # pages de rubrique, pagination, autres langues et autres domaines exclus
+    assert not [u for u in links if re.search(r"news(-room)?(/(fact-sheets|events))?/?$|page=", u)]
+
+
+def test_forbes_article_pattern_ignores_case(site, sources):
+    _, forbes = sources
+    cfg = dict(forbes, listings=[f"{site}/forbes/"], sitemaps=[f"{site}/forbes/sitemap.xml"],
+               archive_template=None, domain="127.0.0.1")
+    links = crawl(cfg)
+    expected = ["/forbes/ARTICLE-Sante-Abidjan", "/forbes/Article-Innovation-Dakar",
+                "/forbes/2024/03/fintech-lagos/"]
+    assert sorted(links) == sorted(site + p for p in expected)
+
+
+def test_known_articles_stop_pagination(site, sources):
+    oms, _ = sources
+    cfg = dict(oms, listings=[f"{site}/fr/news"], sitemaps=[], domain="127.0.0.1")
+    fetched = []
+    def fetch_logged(url):
+        fetched.append(url)
+        return fetch(url)
+    # premier passage : toute la pagination jusqu'à la date limite
+    first = crawl_listings(cfg, fetch_logged, throttle=HostThrottle(4, 0.0, jitter=0.0), cutoff=CUTOFF,
+                           known=lambda u: False)
+    assert len(fetched) == 3 and site + "/fr/news/item/10-01-2024-cholera" in first
+    # passage suivant : la première page ne liste que des articles connus, on s'arrête là
+    seen = set(first)
+    fetched.clear()
+    again = crawl_listings(cfg, fetch_logged, throttle=HostThrottle(4, 0.0, jitter=0.0), cutoff=CUTOFF,
+                           known=seen.__contains__)
+    assert fetched == [f"{site}/fr/news"]
+    assert set(again) <= seen
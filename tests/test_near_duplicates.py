@@ -0,0 +1,29 @@
+import pandas as pd
+from near_duplicates import NearDuplicateIndex
+
+BASE = " ".join(f"mot{i}" for i in range(200))
+VARIANT = BASE + " fin"
+OTHER = " ".join(f"autre{i}" for i in range(200))
+
+
+def test_dedup_frame_keeps_representative(tmp_path):
+    nd = NearDuplicateIndex(str(tmp_path / "nd.sqlite"))
+    nd.add(["a", "b"], [BASE, VARIANT])
+    df = pd.DataFrame({"id": ["b", "a", "c"], "text": [VARIANT, BASE, OTHER]})
+    assert nd.dedup_frame(df, "id", "text")["id"].tolist() == ["a", "c"]
+    # représentant absent : la première variante est gardée
+    df = pd.DataFrame({"id": ["b", "c"], "text": [VARIANT, OTHER]})
+    assert nd.dedup_frame(df, "id", "text")["id"].tolist() == ["b", "c"]
+
+
+def test_changed_text_is_rehashed(tmp_path):
+    path = str(tmp_path / "nd.sqlite")
+    nd = NearDuplicateIndex(path)
+    assert nd.add(["a", "b"], [BASE, VARIANT])[1] == ("b", "a", nd.status["b"][1])
+    assert nd.add(["b"], [OTHER]) == [("b", None, None)]
+    nd.close()
+    # état persisté : "b" n'est plus rattaché, et son nouveau texte sert aux requêtes
+    nd = NearDuplicateIndex(path)
+    assert nd.status["b"] == (None, None)
+    assert nd.query(OTHER)[0] == "b"
+    assert nd.add(["c"], [VARIANT])[0][1] == "a"
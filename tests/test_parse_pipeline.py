@@ -0,0 +1,24 @@
+import threading
+import pytest
+import parse_pipeline
+from fetcher import HostThrottle
+from warc_archive import WarcArchive
+
+
+def test_parse_failure_releases_fetchers(tmp_path, monkeypatch):
+    def failing_stream(items, *args, **kwargs):
+        next(iter(items))   # un seul élément lu, puis l'étage parsing échoue
+        raise RuntimeError("parseur cassé")
+    monkeypatch.setattr(parse_pipeline, "_parse_stream", failing_stream)
+    store = WarcArchive(str(tmp_path / "warc"))
+    jobs = [(f"http://exemple.test/{i}", "OMS") for i in range(20)]
+    before = set(threading.enumerate())
+    with pytest.raises(RuntimeError):
+        parse_pipeline.fetch_and_parse(jobs, lambda u: "<html></html>", store,
+                                       throttle=HostThrottle(4, 0.0, jitter=0.0),
+                                       max_workers=4, queue_size=1)
+    # les threads de fetch ne restent pas bloqués sur la file pleine (hors moniteur tqdm)
+    started = [t for t in threading.enumerate() if t not in before and t.name != "tqdm_monitor"]
+    for t in started:
+        t.join(timeout=5)
+    assert not [t for t in started if t.is_alive()]
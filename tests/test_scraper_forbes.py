@@ -0,0 +1,44 @@
+from scraper_forbes_v2 import lister_articles_api
+
+N_POSTS = 320
+
+
+class _Response:
+    def __init__(self, status_code, posts):
+        self.status_code = status_code
+        self._posts = posts
+
+    def json(self):
+        return self._posts
+
+
+class _WordPress:
+    """API posts WordPress simulée : page n = posts [(n - 1) * per_page, n * per_page)."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(dict(params))
+        per_page, page = params["per_page"], params["page"]
+        start = (page - 1) * per_page
+        if start >= N_POSTS:
+            return _Response(400, {"code": "rest_post_invalid_page_number"})
+        posts = [{"link": f"https://forbesafrique.com/post-{i}", "date": "2024-03-05T09:00:00",
+                  "title": {"rendered": f"Titre {i}"}, "content": {"rendered": f"<p>Texte {i}</p>"}}
+                 for i in range(start, min(start + per_page, N_POSTS))]
+        return _Response(200, posts)
+
+
+def test_api_listing_not_a_multiple_of_page_size():
+    session = _WordPress()
+    articles = lister_articles_api(session, 150)
+    links = [a["lien"] for a in articles]
+    assert links == [f"https://forbesafrique.com/post-{i}" for i in range(150)]
+    assert {c["per_page"] for c in session.calls} == {100}
+    assert articles[0]["date"] == "5 mars 2024"
+
+
+def test_api_listing_stops_at_last_page():
+    articles = lister_articles_api(_WordPress(), 1000)
+    assert len({a["lien"] for a in articles}) == len(articles) == N_POSTS